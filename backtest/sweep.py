@@ -0,0 +1,162 @@
+"""
+Parameter sweeps: run many backtests of one strategy config across a process
+pool, with the bar matrix placed in shared memory once instead of being
+pickled to every worker.
+
+    python -m backtest.sweep sweep.yaml --workers 8 --output results.csv
+
+A sweep spec names the bars, a base strategy config, a ranking metric and
+either a grid or a random search:
+
+    bars: prices.csv
+    metric: sharpe
+    starting_cash: 100000
+    strategy: {type: constant_percentage, ..., rebalance_interval_minutes: 60}
+    grid:
+      cash_percentage: [0.1, 0.2]
+      rebalance_interval_minutes: [30, 60, 240]
+    # or
+    random:
+      samples: 50
+      seed: 1
+      params:
+        cash_percentage: {uniform: [0.05, 0.5]}
+        rebalance_interval_minutes: {choice: [15, 30, 60]}
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtest.engine import Backtest
+from data.bars import Bars
+from utils.config import parse_config, register_plugins
+
+# Per-worker view of the shared bars, set by _attach_bars
+_bars = None
+_segments = None
+
+
+def grid_params(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_params(spec):
+    rng = random.Random(spec.get('seed'))
+    samples = []
+    for _ in range(spec['samples']):
+        params = {}
+        for name, distribution in spec['params'].items():
+            if 'uniform' in distribution:
+                params[name] = rng.uniform(*distribution['uniform'])
+            elif 'choice' in distribution:
+                params[name] = rng.choice(distribution['choice'])
+            else:
+                raise ValueError(f"Unsupported distribution for {name}: {distribution}")
+        samples.append(params)
+    return samples
+
+
+def sweep_params(spec):
+    if 'grid' in spec:
+        return grid_params(spec['grid'])
+    if 'random' in spec:
+        return random_params(spec['random'])
+    raise ValueError("Sweep spec needs a 'grid' or 'random' section")
+
+
+class SharedBars:
+    """Owns shared memory copies of a Bars' timestamps and closes."""
+
+    def __init__(self, bars):
+        self.symbols = bars.symbols
+        self.shape = bars.closes.shape
+        self.closes = shared_memory.SharedMemory(create=True, size=bars.closes.nbytes)
+        self.timestamps = shared_memory.SharedMemory(create=True, size=max(bars.timestamps.nbytes, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self.closes.buf)[:] = bars.closes
+        np.ndarray(len(bars), dtype='datetime64[s]', buffer=self.timestamps.buf)[:] = bars.timestamps
+
+    def handle(self):
+        return self.closes.name, self.timestamps.name, self.shape, self.symbols
+
+    def close(self):
+        for segment in (self.closes, self.timestamps):
+            segment.close()
+            segment.unlink()
+
+
+def _attach_bars(closes_name, timestamps_name, shape, symbols):
+    global _bars, _segments
+    closes = shared_memory.SharedMemory(name=closes_name)
+    timestamps = shared_memory.SharedMemory(name=timestamps_name)
+    # Keep the segments referenced for as long as the views are in use
+    _segments = (closes, timestamps)
+    _bars = Bars(
+        np.ndarray(shape[0], dtype='datetime64[s]', buffer=timestamps.buf),
+        symbols,
+        np.ndarray(shape, dtype=np.float64, buffer=closes.buf),
+    )
+
+
+def _run_one(strategy_config, params, starting_cash):
+    config = dict(strategy_config)
+    config.update(params)
+    return params, Backtest(_bars, config, starting_cash=starting_cash).run().metrics()
+
+
+def run_sweep(bars, strategy_config, param_sets, metric='sharpe', starting_cash=100000.0, workers=None):
+    """Backtest every parameter set in parallel; return [(params, metrics)] best first."""
+    shared = SharedBars(bars)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach_bars, initargs=shared.handle()) as executor:
+            futures = [executor.submit(_run_one, strategy_config, params, starting_cash) for params in param_sets]
+            results = [future.result() for future in futures]
+    finally:
+        shared.close()
+    return sorted(results, key=lambda result: result[1][metric], reverse=metric != 'max_drawdown')
+
+
+def format_results(results, metric):
+    names = sorted({name for params, _ in results for name in params})
+    header = ['rank'] + names + [metric, 'total_return', 'max_drawdown', 'trades']
+    rows = []
+    for rank, (params, metrics) in enumerate(results, start=1):
+        rows.append([rank] + [params.get(name) for name in names] + [metrics[metric], metrics['total_return'], metrics['max_drawdown'], metrics['trades']])
+    return header, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('spec')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', help='write the ranked table to this CSV')
+    args = parser.parse_args()
+
+    spec = parse_config(args.spec)
+    register_plugins(spec)
+    metric = spec.get('metric', 'sharpe')
+    results = run_sweep(
+        Bars.from_csv(spec['bars']),
+        spec['strategy'],
+        sweep_params(spec),
+        metric=metric,
+        starting_cash=spec.get('starting_cash', 100000.0),
+        workers=args.workers,
+    )
+    header, rows = format_results(results, metric)
+    print('\t'.join(header))
+    for row in rows:
+        print('\t'.join(f"{value:.4f}" if isinstance(value, float) else str(value) for value in row))
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Backtest ConstantPercentageStrategy over a synthetic year of minute bars.
+
+    python -m benchmarks.bench_backtest
+"""
+import time
+import numpy as np
+from backtest.engine import Backtest
+from data.bars import Bars
+
+MINUTES_PER_YEAR = 252 * 390
+SYMBOLS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA']
+
+
+def synthetic_bars(minutes=MINUTES_PER_YEAR, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = np.datetime64('2023-01-03T14:30') + np.arange(minutes).astype('timedelta64[m]')
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, (minutes, len(SYMBOLS))), axis=0))
+    return Bars(timestamps, SYMBOLS, closes)
+
+
+def main():
+    bars = synthetic_bars()
+    print(f"{'interval min':>12} {'bars':>8} {'seconds':>8} {'trades':>7} {'return':>8}")
+    for interval in (240, 60, 15):
+        config = {
+            'type': 'constant_percentage',
+            'stock_allocations': {symbol: 1 / len(SYMBOLS) for symbol in SYMBOLS},
+            'cash_percentage': 0.1,
+            'rebalance_interval_minutes': interval,
+            'starting_capital': 100000,
+        }
+        start = time.perf_counter()
+        metrics = Backtest(bars, config, starting_cash=100000).run().metrics()
+        print(f"{interval:>12} {len(bars):>8} {time.perf_counter() - start:>8.2f} {metrics['trades']:>7} {metrics['total_return']:>8.2%}")
+
+
+if __name__ == '__main__':
+    main()
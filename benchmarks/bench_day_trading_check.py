@@ -0,0 +1,95 @@
+"""
+Time the day trading check as the trades table grows: the old full load of
+matching rows without indexes, the indexed EXISTS lookup, and the in-memory
+answer BaseBroker.has_bought_today gives after its first lookup of the day.
+
+    python -m benchmarks.bench_day_trading_check
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.sql import and_
+from brokers.simulated_broker import SimulatedBroker
+from data.price_feed import RandomWalkPriceFeed
+from database.models import Trade, drop_then_init_db
+
+SIZES = (10_000, 100_000, 1_000_000, 3_000_000)
+SYMBOLS = [f"SYM{i}" for i in range(500)]
+BROKERS = ['Tradier', 'Tastytrade', 'Simulated']
+INDEX = 'ix_trades_broker_symbol_order_type_timestamp'
+CHECKS = 1000
+
+
+def add_trades(engine, count, rng):
+    start = datetime.now() - timedelta(days=365)
+    rows = [
+        {
+            'symbol': rng.choice(SYMBOLS),
+            'quantity': 1,
+            'price': 100.0,
+            'executed_price': 100.0,
+            'order_type': rng.choice(('buy', 'sell')),
+            'status': 'filled',
+            # Spread over the past year; today's trades are a small slice
+            'timestamp': start + timedelta(seconds=rng.randrange(365 * 86400)),
+            'broker': rng.choice(BROKERS),
+            'strategy': 'bench',
+        }
+        for _ in range(count)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(Trade), rows)
+
+
+def full_load(broker, symbol):
+    # The check before indexes: load every matching row, then test the length
+    today = broker.now().date()
+    with broker.Session() as session:
+        return len(session.query(Trade).filter(and_(
+            Trade.symbol == symbol,
+            Trade.broker == broker.broker_name,
+            Trade.order_type == 'buy',
+            Trade.timestamp >= today,
+        )).all()) > 0
+
+
+def per_check(function, symbols):
+    start = time.perf_counter()
+    for symbol in symbols:
+        function(symbol)
+    return (time.perf_counter() - start) / len(symbols) * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        drop_then_init_db(engine)
+        feed = RandomWalkPriceFeed(start_prices={'SYM0': 100.0}, seed=0)
+        broker = SimulatedBroker(engine=engine, price_feed=feed, ledger_config={'flush_interval': 0})
+        print(f"{'trades':>10} {'full load, no index us':>23} {'EXISTS, indexed us':>19} {'in memory us':>13}")
+        rows = 0
+        for size in SIZES:
+            add_trades(engine, size - rows, rng)
+            rows = size
+            symbols = [rng.choice(SYMBOLS) for _ in range(CHECKS)]
+
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"DROP INDEX {INDEX}")
+            scan = per_check(lambda symbol: full_load(broker, symbol), symbols[:20])
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"CREATE INDEX {INDEX} ON trades (broker, symbol, order_type, timestamp)")
+
+            # Forget earlier answers so every first lookup hits the database
+            broker._bought_day = None
+            lookup = per_check(broker.has_bought_today, list(dict.fromkeys(symbols)))
+            cached = per_check(broker.has_bought_today, symbols)
+            print(f"{rows:>10} {scan:>23.1f} {lookup:>19.1f} {cached:>13.2f}")
+        broker.ledger.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark vectorized greeks and implied volatility over synthetic chains.
+
+    python -m benchmarks.bench_greeks
+"""
+import time
+import numpy as np
+from data import black_scholes
+from data.options_chain import OptionsChain
+
+SPOT = 100.0
+RATE = 0.05
+MIN_VEGA = 0.01
+
+
+def synthetic_chain(size, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = rng.uniform(50, 150, size).round()
+    is_call = rng.random(size) < 0.5
+    days = rng.integers(1, 730, size)
+    # Pre-sort by (expiration, strike) so rows line up with the chain's own ordering
+    order = np.lexsort((strikes, days))
+    strikes, is_call, days = strikes[order], is_call[order], days[order]
+    expiration = np.datetime64('2024-01-01') + days.astype('timedelta64[D]')
+    vols = rng.uniform(0.1, 0.9, size)
+    fair = black_scholes.price(SPOT, strikes, days / 365.0, RATE, vols, is_call)
+    return OptionsChain(
+        'SYN',
+        [f'SYN{i}' for i in range(size)],
+        is_call,
+        expiration,
+        strike=strikes,
+        bid=fair - 0.005,
+        ask=fair + 0.005,
+    ), vols
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'contracts':>10} {'greeks ms':>10} {'iv+greeks ms':>13} {'us/contract':>12} {'max iv err':>11}")
+    for size in (1_000, 10_000, 100_000):
+        chain, vols = synthetic_chain(size)
+        t = black_scholes.year_fractions(chain.expiration, '2024-01-01')
+        greeks_time = best_of(lambda: black_scholes.greeks(SPOT, chain.strike, t, RATE, vols, chain.is_call))
+        full_time = best_of(lambda: chain.compute_greeks(SPOT, RATE, valuation_date='2024-01-01'))
+        chain = chain.compute_greeks(SPOT, RATE, valuation_date='2024-01-01')
+        # IV is only pinned down where the price is sensitive to it
+        solved = ~np.isnan(chain.iv) & (chain.vega > MIN_VEGA)
+        error = np.max(np.abs(chain.iv[solved] - vols[solved])) if solved.any() else float('nan')
+        print(f"{size:>10} {greeks_time * 1e3:>10.2f} {full_time * 1e3:>13.2f} {full_time / size * 1e6:>12.3f} {error:>11.2e}")
+
+
+if __name__ == '__main__':
+    main()
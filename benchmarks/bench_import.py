@@ -0,0 +1,44 @@
+"""
+Benchmark trade-mode startup imports: `import main` plus resolving the broker
+and strategy a config names, each in a fresh interpreter.
+
+    python -m benchmarks.bench_import --broker tradier --strategy constant_percentage
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+SCRIPT = '''
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from utils.config import BROKER_MAP, STRATEGY_MAP
+BROKER_MAP[{broker!r}]
+STRATEGY_MAP[{strategy!r}]
+print(imported - start, time.perf_counter() - start, 'flask' in sys.modules, 'aiohttp' in sys.modules)
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--broker', default='tradier')
+    parser.add_argument('--strategy', default='constant_percentage')
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    script = 'import sys\n' + SCRIPT.format(broker=args.broker, strategy=args.strategy)
+    main_times, total_times = [], []
+    for _ in range(args.rounds):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout.split()
+        main_times.append(float(output[0]))
+        total_times.append(float(output[1]))
+        flask, aiohttp = output[2], output[3]
+    print(f"import main:            median {statistics.median(main_times) * 1e3:7.1f} ms")
+    print(f"+ {args.broker}/{args.strategy}: median {statistics.median(total_times) * 1e3:7.1f} ms")
+    print(f"flask imported: {flask}, aiohttp imported: {aiohttp}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Benchmark the vectorized rebalance planner over large symbol universes.
+
+    python -m benchmarks.bench_rebalance_planner
+"""
+import time
+import numpy as np
+from strategies.rebalance_planner import plan_rebalance, deltas_to_orders
+
+
+def best_of(fn, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'symbols':>8} {'plan us':>9} {'plan+orders us':>15}")
+    for size in (100, 1_000, 10_000):
+        allocations = rng.random(size)
+        allocations /= allocations.sum()
+        prices = rng.uniform(1, 500, size)
+        positions = rng.integers(0, 100, size)
+        symbols = [f'SYM{i}' for i in range(size)]
+        plan_time = best_of(lambda: plan_rebalance(allocations, prices, positions, 1e7))
+        full_time = best_of(lambda: deltas_to_orders(symbols, plan_rebalance(allocations, prices, positions, 1e7)))
+        print(f"{size:>8} {plan_time * 1e6:>9.1f} {full_time * 1e6:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
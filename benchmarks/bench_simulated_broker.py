@@ -0,0 +1,53 @@
+"""
+Measure order throughput against the SimulatedBroker, with and without the
+database write path.
+
+    python -m benchmarks.bench_simulated_broker
+"""
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from brokers.simulated_broker import SimulatedBroker
+from data.price_feed import RandomWalkPriceFeed
+from database.models import init_db
+
+SYMBOLS = ['AAPL', 'MSFT', 'GOOG', 'AMZN', 'NVDA']
+
+
+def make_broker(latency=0.0):
+    # A file, not an in-memory DB: the ledger flushes from its own thread,
+    # and each thread would otherwise get its own empty database
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_simulated_broker'), 'trading.db')}")
+    init_db(engine)
+    feed = RandomWalkPriceFeed(start_prices={symbol: 100.0 for symbol in SYMBOLS}, seed=0)
+    return SimulatedBroker(engine=engine, price_feed=feed, starting_cash=1e9, latency=latency)
+
+
+def run(broker, orders, record):
+    start = time.perf_counter()
+    for i in range(orders):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        if record:
+            broker.place_order(symbol, 1, 'buy', 'bench')
+        else:
+            broker._place_order(symbol, 1, 'buy')
+        if i % 10 == 0:
+            broker.step()
+    if record:
+        # Count the positions still waiting in the write-behind ledger
+        broker.ledger.flush()
+    return orders / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'path':>16} {'orders':>8} {'orders/s':>10}")
+    for label, orders, record in (('matching only', 100_000, False), ('with db writes', 2_000, True)):
+        broker = make_broker()
+        rate = run(broker, orders, record)
+        broker.ledger.close()
+        print(f"{label:>16} {orders:>8} {rate:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
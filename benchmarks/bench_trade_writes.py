@@ -0,0 +1,55 @@
+"""
+Time recording a rebalance's fills one transaction per trade versus one
+unit of work per rebalance. Set DATABASE_URL to run against Postgres.
+
+    python -m benchmarks.bench_trade_writes
+    DATABASE_URL=postgresql://localhost/soad_bench python -m benchmarks.bench_trade_writes
+"""
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from brokers.simulated_broker import SimulatedBroker
+from data.price_feed import RandomWalkPriceFeed
+from database.models import drop_then_init_db
+
+SYMBOLS = [f"SYM{i}" for i in range(50)]
+CYCLES = 5
+
+
+def make_broker(url):
+    engine = create_engine(url)
+    drop_then_init_db(engine)
+    feed = RandomWalkPriceFeed(start_prices={symbol: 100.0 for symbol in SYMBOLS}, seed=0)
+    return SimulatedBroker(engine=engine, price_feed=feed, starting_cash=1e12, ledger_config={'flush_interval': 0})
+
+
+def run(url, fills, batched):
+    broker = make_broker(url)
+    start = time.perf_counter()
+    for _ in range(CYCLES):
+        if batched:
+            with broker.unit_of_work('bench'):
+                for i in range(fills):
+                    broker.place_order(SYMBOLS[i % len(SYMBOLS)], 1, 'buy', 'bench')
+        else:
+            for i in range(fills):
+                broker.place_order(SYMBOLS[i % len(SYMBOLS)], 1, 'buy', 'bench')
+            broker.ledger.flush()
+    elapsed = time.perf_counter() - start
+    broker.ledger.close()
+    return elapsed / CYCLES
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        url = os.environ.get('DATABASE_URL') or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        print(f"{'fills/cycle':>11} {'per trade ms':>13} {'batched ms':>11} {'speedup':>8}")
+        for fills in (10, 100, 500):
+            single = run(url, fills, batched=False)
+            batched = run(url, fills, batched=True)
+            print(f"{fills:>11} {single * 1e3:>13.1f} {batched * 1e3:>11.1f} {single / batched:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,114 @@
+import asyncio
+import threading
+import time
+import traceback
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.sql import and_
+from sqlalchemy.sql import and_, exists
 from database.db_manager import DBManager
-from database.models import Trade, AccountInfo, Balance, Position
+from database.ledger import Ledger
+from database.unit_of_work import UnitOfWork
+from database.models import Trade, AccountInfo
 from datetime import datetime
+from utils.http_session import create_http_session
+from utils.http_cassette import Cassette
+from utils.async_http_session import create_async_http_session
+from utils.quote_cache import QuoteCache
+from utils.rate_limiter import RateLimiter
+from utils.event_bus import Event, EventBus
+from brokers.order_tracker import OrderTracker, TERMINAL_STATUSES, order_accepted, response_order_id
+from brokers.order_netting import OrderNetter, allocate
+from data.market_stream import stream_options
+from data.options_chain import OptionsChain, DEFAULT_OPTIONS_CHAIN_CACHE_CONFIG
+
+# Upper bound on concurrent quote requests when a broker has no batch endpoint
+QUOTE_FANOUT_WORKERS = 8
+# Upper bound on concurrent order submissions in place_orders
+ORDER_FANOUT_WORKERS = 4
+
+DEFAULT_ACCOUNT_CACHE_CONFIG = {
+    'ttl': 10,  # seconds an account snapshot is reused between fills
+}
+
+def broker_options(config):
+    # Options shared by every broker type, taken from the broker's YAML section
+    return {
+        'prevent_day_trading': config.get('prevent_day_trading', False),
+        'http_config': config.get('http'),
+        'quote_cache_config': config.get('quote_cache'),
+        'stream_config': config.get('stream'),
+        'options_chain_cache_config': config.get('options_chain_cache'),
+        'account_cache_config': config.get('account_cache'),
+        'rate_limit_config': config.get('rate_limit'),
+        'cassette_config': config.get('cassette'),
+        'netting_config': config.get('netting'),
+        'events_config': config.get('events'),
+        'ledger_config': config.get('ledger'),
+    }
 
 class BaseBroker(ABC):
-    def __init__(self, api_key, secret_key, broker_name, engine, prevent_day_trading=False):
+    def __init__(self, api_key, secret_key, broker_name, engine, prevent_day_trading=False, http_config=None, quote_cache_config=None, stream_config=None, options_chain_cache_config=None, account_cache_config=None, rate_limit_config=None, cassette_config=None, netting_config=None, events_config=None, ledger_config=None):
         self.api_key = api_key
         self.secret_key = secret_key
         self.broker_name = broker_name
         self.db_manager = DBManager(engine)
         self.Session = sessionmaker(bind=engine)
+        # Positions and balances served from memory and written behind
+        self.ledger = Ledger.from_config(lambda: self.Session(), broker_name, ledger_config)
+        # Fills of trades written in batches are published once they have ids
+        self.ledger.trades_written = self._publish_fills
+        # Open units of work by strategy; their trades are written when the unit ends
+        self._units = {}
+        self._units_lock = threading.Lock()
+        # {symbol: bought?} for self._bought_day, so the day trading check
+        # queries each symbol at most once a day
+        self._bought_day = None
+        self._bought_today = {}
+        self._bought_lock = threading.Lock()
         self.account_id = None
-        self.prevent_day_trading = False
+        self.prevent_day_trading = prevent_day_trading
+        # Account snapshot reused for account_cache ttl seconds, dropped on fills
+        account_cache = dict(DEFAULT_ACCOUNT_CACHE_CONFIG)
+        account_cache.update(account_cache_config or {})
+        self.account_info_ttl = account_cache['ttl']
+        self._account_info = None
+        self._account_info_time = None
+        self._persisted_account_value = None
+        self._account_lock = threading.Lock()
+        # Serializes fetches so concurrent cache misses make one API call
+        self._account_fetch = None  # in-flight account fetch, shared by sync and async callers
+        # Every request to this broker takes a token from one prioritized bucket
+        self.rate_limiter = RateLimiter.from_config(rate_limit_config)
+        # One pooled keep-alive transport per broker, shared by every API call
+        self.http_config = http_config
+        # Optional record/replay of every request made through self.http
+        self.cassette = Cassette.from_config(cassette_config)
+        self.http = create_http_session(http_config, rate_limiter=self.rate_limiter, cassette=self.cassette)
+        # aiohttp session for the async API, created lazily inside the running loop
+        self._async_http = None
+        self._async_http_loop = None
+        # Nets opposite orders from strategies sharing this broker (see place_orders)
+        self.order_netter = OrderNetter.from_config(self, netting_config)
+        # Follows submitted orders in the background, created on first use
+        self._order_tracker = None
+        # Quotes shared by every strategy on this broker
+        self.quote_cache = QuoteCache.from_config(quote_cache_config)
+        self.options_chain_cache = QuoteCache.from_config(options_chain_cache_config, defaults=DEFAULT_OPTIONS_CHAIN_CACHE_CONFIG)
+        # Streamed top of book, preferred over the cache while fresh (see start_stream)
+        self.stream_config = stream_options(stream_config)
+        self.market_stream = None
+        self.quote_book = None
+        # Quote, bar, fill and order status events for strategies' on_* hooks
+        self.event_bus = EventBus.from_config(events_config)
+        # Strategy that placed each order still being followed, for order status events
+        self._order_owners = {}
+
+    @classmethod
+    def from_config(cls, config, engine):
+        """Build the broker from its YAML section; the factory used by BROKER_MAP."""
+        return cls(api_key=config['api_key'], secret_key=config.get('secret_key'), engine=engine, **broker_options(config))
 
     @abstractmethod
     def connect(self):
@@ -40,102 +135,419 @@ class BaseBroker(ABC):
         pass
 
     @abstractmethod
-    def get_current_price(self, symbol):
+    def _get_quote(self, symbol):
+        """Fetch a quote dict with at least a 'last' key (and 'bid'/'ask' when available)."""
         pass
 
-    def get_account_info(self):
-        account_info = self._get_account_info()
-        self.db_manager.add_account_info(AccountInfo(broker=self.broker_name, value=account_info['value']))
-        return account_info
+    def _get_quotes(self, symbols):
+        """
+        Fetch {symbol: quote} for symbols. Brokers with a multi-symbol quote
+        endpoint override this; the default fans out _get_quote calls
+        concurrently over the pooled transport.
+        """
+        with ThreadPoolExecutor(max_workers=min(len(symbols), QUOTE_FANOUT_WORKERS)) as executor:
+            quotes = list(executor.map(self._get_quote, symbols))
+        return dict(zip(symbols, quotes))
+
+    def _create_market_stream(self, symbols):
+        raise NotImplementedError(f"{self.broker_name} does not support streaming market data")
+
+    def start_stream(self, symbols):
+        """Start streaming quotes for symbols into self.quote_book."""
+        self.stop_stream()
+        self.market_stream = self._create_market_stream(symbols)
+        self.quote_book = self.market_stream.book
+        self.quote_book.add_listener(self.publish_quote)
+        self.market_stream.start()
+        return self.market_stream
+
+    def stop_stream(self):
+        if self.market_stream is not None:
+            self.market_stream.stop()
+        self.market_stream = None
+        self.quote_book = None
+
+    def _known_quotes(self, symbols):
+        # Fresh streamed quotes first, then the TTL cache
+        quotes = {}
+        if self.quote_book is not None:
+            quotes = self.quote_book.get_fresh_many(symbols, self.stream_config['max_age'])
+        remaining = [symbol for symbol in symbols if symbol not in quotes]
+        if remaining:
+            quotes.update(self.quote_cache.get_many(remaining))
+        return quotes
+
+    def get_quotes(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        quotes = self._known_quotes(symbols)
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if missing:
+            fetched = self._get_quotes(missing)
+            self.quote_cache.put_many(fetched)
+            self.publish_quotes(fetched)
+            quotes.update(fetched)
+        return {symbol: quotes[symbol] for symbol in symbols}
+
+    def get_quote(self, symbol):
+        return self.get_quotes([symbol])[symbol]
+
+    def publish_quote(self, symbol, quote):
+        if self.event_bus.wants('quote'):
+            self.event_bus.publish(Event('quote', symbol, quote, timestamp=self.now()))
+
+    def publish_quotes(self, quotes):
+        if self.event_bus.wants('quote'):
+            for symbol, quote in quotes.items():
+                self.publish_quote(symbol, quote)
+
+    def register_order(self, response, owner):
+        """
+        Remember who owns an order still open at the broker, for its order
+        status events: a strategy name, or {strategy: quantity} for a netted
+        order shared by several strategies.
+        """
+        order_id = response_order_id(response)
+        if order_id is not None and response.get('status') not in TERMINAL_STATUSES and self.event_bus.wants('order_status'):
+            self._order_owners[order_id] = owner
+
+    def publish_order_status(self, order_id, order_info):
+        status = order_info.get('status')
+        if status in TERMINAL_STATUSES:
+            owner = self._order_owners.pop(order_id, None)
+        else:
+            owner = self._order_owners.get(order_id)
+        if self.event_bus.wants('order_status'):
+            data = dict(order_info, order_id=order_id)
+            strategy = tuple(owner) if isinstance(owner, dict) else owner
+            self.event_bus.publish(Event('order_status', order_info.get('symbol'), data, strategy=strategy, timestamp=self.now()))
+
+    def get_current_prices(self, symbols):
+        """Return a {symbol: last_price} dict, served from the quote cache where fresh."""
+        return {symbol: quote.get('last') for symbol, quote in self.get_quotes(symbols).items()}
+
+    def get_current_price(self, symbol):
+        return self.get_quote(symbol).get('last')
+
+    def _cached_account_info(self):
+        with self._account_lock:
+            if self._account_info is not None and time.monotonic() - self._account_info_time <= self.account_info_ttl:
+                return dict(self._account_info)
+        return None
+
+    def _store_account_info(self, account_info):
+        with self._account_lock:
+            self._account_info = dict(account_info)
+            self._account_info_time = time.monotonic()
+            changed = account_info['value'] != self._persisted_account_value
+            self._persisted_account_value = account_info['value']
+        # Only touch the AccountInfo row when the value actually moved
+        if changed:
+            self.db_manager.add_account_info(AccountInfo(broker=self.broker_name, value=account_info['value']))
+
+    def invalidate_account_info(self):
+        with self._account_lock:
+            self._account_info = None
+
+    def _join_account_fetch(self):
+        """
+        Return (future, owner) for the in-flight account fetch, starting one
+        when there is none. The owner runs the fetch; everyone else waits on
+        the future.
+        """
+        with self._account_lock:
+            if self._account_fetch is not None:
+                return self._account_fetch, False
+            self._account_fetch = Future()
+            return self._account_fetch, True
+
+    def _finish_account_fetch(self, future, account_info=None, error=None):
+        with self._account_lock:
+            self._account_fetch = None
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(account_info)
+
+    def get_account_info(self, refresh=False):
+        account_info = None if refresh else self._cached_account_info()
+        if account_info is not None:
+            return account_info
+        future, owner = self._join_account_fetch()
+        if owner:
+            try:
+                account_info = self._get_account_info()
+                self._store_account_info(account_info)
+            except Exception as e:
+                self._finish_account_fetch(future, error=e)
+            else:
+                self._finish_account_fetch(future, account_info)
+        return dict(future.result())
+
+    def now(self):
+        # Timestamp for trade records; simulated brokers return simulated time
+        return datetime.now()
+
+    def _bought_symbols(self, day):
+        # Caller holds _bought_lock; starts a fresh map at midnight
+        if self._bought_day != day:
+            self._bought_day = day
+            self._bought_today = {}
+        return self._bought_today
 
     def has_bought_today(self, symbol):
-        today = datetime.now().date()
+        today = self.now().date()
+        with self._bought_lock:
+            bought = self._bought_symbols(today).get(symbol)
+        if bought is not None:
+            return bought
         with self.Session() as session:
-            trades = session.query(Trade).filter(
+            bought = session.query(exists().where(
                 and_(
                     Trade.symbol == symbol,
                     Trade.broker == self.broker_name,
                     Trade.order_type == 'buy',
                     Trade.timestamp >= today
                 )
-            ).all()
-            return len(trades) > 0
+            )).scalar()
+        with self._bought_lock:
+            # A buy recorded while the query ran wins
+            return self._bought_symbols(today).setdefault(symbol, bool(bought))
 
-    def update_positions(self, session, trade):
-        position = session.query(Position).filter_by(symbol=trade.symbol, broker=self.broker_name, strategy=trade.strategy).first()
+    def _mark_bought(self, symbol, timestamp):
+        with self._bought_lock:
+            if timestamp.date() == self.now().date():
+                self._bought_symbols(timestamp.date())[symbol] = True
 
-        if trade.order_type == 'buy':
-            if position:
-                position.quantity += trade.quantity
-                position.latest_price = trade.executed_price
-                position.timestamp = datetime.now()
-            else:
-                position = Position(
-                    broker=self.broker_name,
-                    strategy=trade.strategy,
-                    symbol=trade.symbol,
-                    quantity=trade.quantity,
-                    latest_price=trade.executed_price,
-                )
-                session.add(position)
-        elif trade.order_type == 'sell':
-            if position:
-                position.quantity -= trade.quantity
-                position.latest_price = trade.executed_price
-                if position.quantity < 0:
-                    raise ValueError("Sell quantity exceeds current position quantity.")
+    def get_strategy_balance(self, strategy):
+        """The strategy's total balance from the ledger, or None if it has none."""
+        return self.ledger.get_balance(strategy)
 
-        session.commit()
+    def ensure_strategy_balance(self, strategy, total_balance):
+        return self.ledger.ensure_balance(strategy, total_balance)
 
-    def place_order(self, symbol, quantity, order_type, strategy, price=None):
-        # Check for day trading
+    def get_strategy_positions(self, strategy):
+        """{symbol: quantity} held by one strategy, from the ledger."""
+        return self.ledger.get_positions(strategy)
+
+    def check_day_trading(self, symbol, order_type):
         if self.prevent_day_trading and order_type == 'sell':
             if self.has_bought_today(symbol):
                 raise ValueError("Day trading is not allowed. Cannot sell positions opened today.")
 
-        response = self._place_order(symbol, quantity, order_type, price)
-        
-        trade = Trade(
-            symbol=symbol,
-            quantity=quantity,
-            price=price,
-            executed_price=response['filled_price'],
-            order_type=order_type,
-            status='filled',
-            timestamp=datetime.now(),
-            broker=self.broker_name,
-            strategy=strategy,
-            profit_loss=0,
-            success='yes'
-        )
-        
+    def record_trade(self, symbol, quantity, order_type, strategy, response, price=None):
+        # Brokers that pick the limit price themselves return it as 'price'
+        if price is None:
+            price = response.get('price')
+        # Brokers that report partial fills return filled_quantity
+        executed_price = response.get('filled_price', price)
+        if executed_price is None:
+            raise ValueError(f"No price known for the {order_type} of {quantity} {symbol}; trade not recorded")
+        values = {
+            'symbol': symbol,
+            'quantity': response.get('filled_quantity', quantity),
+            'price': price if price is not None else executed_price,
+            'executed_price': executed_price,
+            'order_type': order_type,
+            'status': 'filled',
+            'timestamp': self.now(),
+            'broker': self.broker_name,
+            'strategy': strategy,
+            'profit_loss': 0,
+            'success': 'yes',
+        }
+        trade = Trade(**values)
+        if order_type == 'buy':
+            self._mark_bought(symbol, values['timestamp'])
+
+        with self._units_lock:
+            unit = self._units.get(strategy)
+        # Inserted, and its fill published, when the unit commits
+        if unit is not None and unit.add(trade, values):
+            self.ledger.apply_fill(strategy, symbol, order_type, values['quantity'], executed_price, values['timestamp'])
+            return trade
+
         with self.Session() as session:
             session.add(trade)
             session.commit()
 
-        # Update positions
-        self.update_positions(session, trade, order_type)
+            # Positions change in memory; the ledger writes them back in batches
+            self.ledger.apply_fill(strategy, symbol, order_type, trade.quantity, trade.executed_price, trade.timestamp)
+            self._publish_fill(trade)
+        return trade
+
+    def _publish_fills(self, trades):
+        for trade in trades:
+            self._publish_fill(trade)
+
+    def _publish_fill(self, trade):
+        if self.event_bus.wants('fill'):
+            fill = {'trade_id': trade.id, 'quantity': trade.quantity, 'side': trade.order_type, 'price': trade.executed_price}
+            self.event_bus.publish(Event('fill', trade.symbol, fill, strategy=trade.strategy, timestamp=trade.timestamp))
+
+    @contextmanager
+    def unit_of_work(self, strategy):
+        """
+        Collect the trades strategy records inside the block, from any
+        thread, and write them with its changed positions in one transaction
+        when the block exits (even on error, since the orders were placed).
+        If that write fails the error is raised and the ledger retries the
+        trades with the positions on its next flush. Nested blocks for the
+        same strategy join the outer unit.
+        """
+        with self._units_lock:
+            unit = self._units.get(strategy)
+            if unit is None:
+                unit = self._units[strategy] = UnitOfWork(self.ledger, strategy)
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            yield unit
+            return
+        try:
+            yield unit
+        finally:
+            with self._units_lock:
+                del self._units[strategy]
+            unit.commit()
+
+    def place_order(self, symbol, quantity, order_type, strategy, price=None):
+        # Check for day trading
+        self.check_day_trading(symbol, order_type)
 
+        response = self._place_order(symbol, quantity, order_type, price)
+        self.invalidate_account_info()
+        if not order_accepted(response):
+            return response
+        self.register_order(response, strategy)
+        if response.get('track_timeout') is not None:
+            self.record_when_settled(response, symbol, order_type, strategy, price)
+        elif response.get('filled_quantity', quantity):
+            self.record_trade(symbol, quantity, order_type, strategy, response, price)
         return response
 
-    def get_order_status(self, order_id):
-        order_status = self._get_order_status(order_id)
+    def record_when_settled(self, response, symbol, order_type, owner, price=None):
+        """
+        For brokers whose orders rest until filled: track the order, cancelling
+        it after response['track_timeout'] seconds, and record what actually
+        filled once it is done. owner is a strategy name, or {strategy:
+        quantity} for a netted order.
+        """
+        if order_type == 'buy':
+            # A resting buy may fill at any moment, so same-day sells are checked against it now
+            self._mark_bought(symbol, self.now())
+        order_id = response_order_id(response)
+        price = price if price is not None else response.get('price')
+        future = self.track_order(order_id, timeout=response['track_timeout'])
+        future.add_done_callback(lambda f: self._record_settled_order(order_id, symbol, order_type, owner, price))
+        return future
+
+    def _record_settled_order(self, order_id, symbol, order_type, owner, price):
+        try:
+            fill = self._get_order_fill(order_id)
+            if fill.get('filled_quantity'):
+                self.record_owner_fill(symbol, fill['filled_quantity'], order_type, owner, fill, price)
+        except Exception:
+            print(f"Failed to record the fill of order {order_id} ({order_type} {symbol})")
+            traceback.print_exc()
+
+    def _get_order_fill(self, order_id):
+        """The order's {'status', 'filled_quantity', 'filled_price'} once it is done."""
+        return self._get_order_status(order_id)
+
+    def record_owner_fill(self, symbol, quantity, order_type, owner, response, price=None):
+        """Record a fill of an order owned by one strategy, or split by a netted order's {strategy: quantity}."""
+        if not isinstance(owner, dict):
+            return [self.record_trade(symbol, quantity, order_type, owner, dict(response, filled_quantity=quantity), price)]
+        trades = []
+        # A netted order's fills are split by what each strategy still waits for
+        for strategy, share in zip(list(owner), allocate(quantity, list(owner.values()))):
+            if share:
+                owner[strategy] -= share
+                trades.append(self.record_trade(symbol, share, order_type, strategy, dict(response, filled_quantity=share), price))
+        return trades
+
+    def place_orders(self, orders, strategy):
+        """
+        Place a batch of (symbol, quantity, side) orders and return the
+        responses in order. Sells go out first so they free cash for the buys,
+        and each side is submitted concurrently. With netting enabled the
+        orders are netted against other strategies' orders instead.
+        """
+        if self.order_netter is not None:
+            return self.order_netter.submit(orders, strategy)
+        responses = [None] * len(orders)
+        for side in ('sell', 'buy'):
+            batch = [(i, order) for i, order in enumerate(orders) if order[2] == side]
+            if not batch:
+                continue
+            with ThreadPoolExecutor(max_workers=min(len(batch), ORDER_FANOUT_WORKERS)) as executor:
+                results = executor.map(lambda item: self.place_order(item[1][0], item[1][1], side, strategy), batch)
+                for (i, _), response in zip(batch, results):
+                    responses[i] = response
+        return responses
+
+    def _update_trade_by_id(self, order_id, order_info):
         with self.Session() as session:
             trade = session.query(Trade).filter_by(id=order_id).first()
             if trade:
-                self.update_trade(session, trade.id, order_status)
+                self.update_trade(session, trade.id, order_info)
+
+    def get_order_status(self, order_id):
+        order_status = self._get_order_status(order_id)
+        self._update_trade_by_id(order_id, order_status)
+        self.publish_order_status(order_id, order_status)
         return order_status
 
     def cancel_order(self, order_id):
         cancel_status = self._cancel_order(order_id)
-        with self.Session() as session:
-            trade = session.query(Trade).filter_by(id=order_id).first()
-            if trade:
-                self.update_trade(session, trade.id, cancel_status)
+        self._update_trade_by_id(order_id, cancel_status)
+        self.publish_order_status(order_id, cancel_status)
         return cancel_status
 
+    def _parse_options_chain(self, symbol, raw_chain):
+        return OptionsChain.from_response(symbol, raw_chain)
+
     def get_options_chain(self, symbol, expiration_date):
-        return self._get_options_chain(symbol, expiration_date)
+        """Return a columnar OptionsChain, cached per (symbol, expiration_date)."""
+        key = (symbol, str(expiration_date))
+        chain = self.options_chain_cache.get(key)
+        if chain is None:
+            chain = self._parse_options_chain(symbol, self._get_options_chain(symbol, expiration_date))
+            self.options_chain_cache.put(key, chain)
+        return chain
+
+    def _poll_order(self, order_id):
+        """Return the broker's status string for order_id; used by the order tracker."""
+        return self._get_order_status(order_id).get('status')
+
+    def _cancel_unfilled_order(self, order_id):
+        """Cancel an order the tracker gave up waiting on."""
+        return self._cancel_order(order_id)
+
+    @property
+    def order_tracker(self):
+        if self._order_tracker is None:
+            self._order_tracker = OrderTracker(self._poll_order, self._cancel_unfilled_order)
+        return self._order_tracker
+
+    def track_order(self, order_id, timeout=None, callback=None):
+        """
+        Follow a submitted order in the background without blocking the caller.
+        Returns a Future resolved with the order's final state; orders still open
+        after timeout seconds are cancelled.
+        """
+        future = self.order_tracker.track(order_id, timeout=timeout, callback=callback)
+        # A fill or cancel changes cash and buying power
+        future.add_done_callback(lambda f: self.invalidate_account_info())
+        future.add_done_callback(lambda f: self._publish_tracked_status(order_id, f))
+        return future
+
+    def _publish_tracked_status(self, order_id, future):
+        if future.exception() is None:
+            self.publish_order_status(order_id, future.result())
 
     def update_trade(self, session, trade_id, order_info):
         trade = session.query(Trade).filter_by(id=trade_id).first()
@@ -154,3 +566,113 @@ class BaseBroker(ABC):
         trade.success = success
         trade.profit_loss = profit_loss
         session.commit()
+
+    # Async API. Every method below can be awaited concurrently with the others.
+    # The underscored hooks default to running the sync implementation on a
+    # worker thread; brokers with a native async client override them.
+
+    def get_async_http(self):
+        # aiohttp sessions are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_http.closed or self._async_http_loop is not loop:
+            self._async_http = create_async_http_session(self.http_config)
+            self._async_http_loop = loop
+        return self._async_http
+
+    async def close_async(self):
+        if self._async_http is not None and not self._async_http.closed:
+            await self._async_http.close()
+        self._async_http = None
+
+    async def _get_account_info_async(self):
+        return await asyncio.to_thread(self._get_account_info)
+
+    async def _place_order_async(self, symbol, quantity, order_type, price=None):
+        return await asyncio.to_thread(self._place_order, symbol, quantity, order_type, price)
+
+    async def _get_order_status_async(self, order_id):
+        return await asyncio.to_thread(self._get_order_status, order_id)
+
+    async def _cancel_order_async(self, order_id):
+        return await asyncio.to_thread(self._cancel_order, order_id)
+
+    async def _get_options_chain_async(self, symbol, expiration_date):
+        return await asyncio.to_thread(self._get_options_chain, symbol, expiration_date)
+
+    async def _get_quotes_async(self, symbols):
+        return await asyncio.to_thread(self._get_quotes, symbols)
+
+    async def get_quotes_async(self, symbols):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        quotes = self._known_quotes(symbols)
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if missing:
+            fetched = await self._get_quotes_async(missing)
+            self.quote_cache.put_many(fetched)
+            self.publish_quotes(fetched)
+            quotes.update(fetched)
+        return {symbol: quotes[symbol] for symbol in symbols}
+
+    async def get_quote_async(self, symbol):
+        return (await self.get_quotes_async([symbol]))[symbol]
+
+    async def get_current_prices_async(self, symbols):
+        return {symbol: quote.get('last') for symbol, quote in (await self.get_quotes_async(symbols)).items()}
+
+    async def get_current_price_async(self, symbol):
+        return (await self.get_quote_async(symbol)).get('last')
+
+    async def get_account_info_async(self, refresh=False):
+        account_info = None if refresh else self._cached_account_info()
+        if account_info is not None:
+            return account_info
+        future, owner = self._join_account_fetch()
+        if owner:
+            try:
+                account_info = await self._get_account_info_async()
+                await asyncio.to_thread(self._store_account_info, account_info)
+            except asyncio.CancelledError as e:
+                # Callers sharing this fetch must not wait on it forever
+                self._finish_account_fetch(future, error=e)
+                raise
+            except Exception as e:
+                self._finish_account_fetch(future, error=e)
+            else:
+                self._finish_account_fetch(future, account_info)
+        return dict(await asyncio.wrap_future(future))
+
+    async def place_order_async(self, symbol, quantity, order_type, strategy, price=None):
+        await asyncio.to_thread(self.check_day_trading, symbol, order_type)
+        response = await self._place_order_async(symbol, quantity, order_type, price)
+        self.invalidate_account_info()
+        if not order_accepted(response):
+            return response
+        self.register_order(response, strategy)
+        if response.get('track_timeout') is not None:
+            self.record_when_settled(response, symbol, order_type, strategy, price)
+        elif response.get('filled_quantity', quantity):
+            await asyncio.to_thread(self.record_trade, symbol, quantity, order_type, strategy, response, price)
+        return response
+
+    async def get_order_status_async(self, order_id):
+        order_status = await self._get_order_status_async(order_id)
+        await asyncio.to_thread(self._update_trade_by_id, order_id, order_status)
+        self.publish_order_status(order_id, order_status)
+        return order_status
+
+    async def cancel_order_async(self, order_id):
+        cancel_status = await self._cancel_order_async(order_id)
+        await asyncio.to_thread(self._update_trade_by_id, order_id, cancel_status)
+        self.publish_order_status(order_id, cancel_status)
+        return cancel_status
+
+    async def get_options_chain_async(self, symbol, expiration_date):
+        key = (symbol, str(expiration_date))
+        chain = self.options_chain_cache.get(key)
+        if chain is None:
+            chain = self._parse_options_chain(symbol, await self._get_options_chain_async(symbol, expiration_date))
+            self.options_chain_cache.put(key, chain)
+        return chain
+
@@ -1,17 +1,16 @@
-import requests
 from brokers.base_broker import BaseBroker
 
 class EtradeBroker(BaseBroker):
-    def __init__(self, api_key, secret_key, engine):
-        super().__init__(api_key, secret_key, 'E*TRADE', engine)
+    def __init__(self, api_key, secret_key, engine, **kwargs):
+        super().__init__(api_key, secret_key, 'E*TRADE', engine, **kwargs)
 
     def connect(self):
         # Implement the connection logic
-        response = requests.post("https://api.etrade.com/oauth/token", data={"key": self.api_key, "secret": self.secret_key})
+        response = self.http.post("https://api.etrade.com/oauth/token", data={"key": self.api_key, "secret": self.secret_key})
         self.auth = response.json().get('access_token')
 
     def _get_account_info(self):
-        response = requests.get("https://api.etrade.com/v1/accounts/list", headers={"Authorization": f"Bearer {self.auth}"})
+        response = self.http.get("https://api.etrade.com/v1/accounts/list", headers={"Authorization": f"Bearer {self.auth}"})
         account_info = response.json()
         account_id = account_info['accountListResponse']['accounts'][0]['accountId']
         self.account_id = account_id
@@ -26,25 +25,25 @@ class EtradeBroker(BaseBroker):
             "order_type": order_type,
             "price": price
         }
-        response = requests.post("https://api.etrade.com/v1/accounts/placeOrder", json=order_data, headers={"Authorization": f"Bearer {self.auth}"})
+        response = self.http.post("https://api.etrade.com/v1/accounts/placeOrder", json=order_data, headers={"Authorization": f"Bearer {self.auth}"})
         return response.json()
 
     def _get_order_status(self, order_id):
         # Implement order status retrieval
-        response = requests.get(f"https://api.etrade.com/v1/accounts/order/{order_id}", headers={"Authorization": f"Bearer {self.auth}"})
+        response = self.http.get(f"https://api.etrade.com/v1/accounts/order/{order_id}", headers={"Authorization": f"Bearer {self.auth}"})
         return response.json()
 
     def _cancel_order(self, order_id):
         # Implement order cancellation
-        response = requests.put(f"https://api.etrade.com/v1/accounts/order/{order_id}/cancel", headers={"Authorization": f"Bearer {self.auth}"})
+        response = self.http.put(f"https://api.etrade.com/v1/accounts/order/{order_id}/cancel", headers={"Authorization": f"Bearer {self.auth}"})
         return response.json()
 
     def _get_options_chain(self, symbol, expiration_date):
         # Implement options chain retrieval
-        response = requests.get(f"https://api.etrade.com/v1/market/options/chains?symbol={symbol}&expiration={expiration_date}", headers={"Authorization": f"Bearer {self.auth}"})
+        response = self.http.get(f"https://api.etrade.com/v1/market/options/chains?symbol={symbol}&expiration={expiration_date}", headers={"Authorization": f"Bearer {self.auth}"}, priority='chain')
         return response.json()
 
-    def get_current_price(self, symbol):
-        # Implement current price retrieval
-        response = requests.get(f"https://api.etrade.com/v1/market/quote/{symbol}", headers={"Authorization": f"Bearer {self.auth}"})
-        return response.json().get('lastPrice')
+    def _get_quote(self, symbol):
+        # Implement current quote retrieval
+        response = self.http.get(f"https://api.etrade.com/v1/market/quote/{symbol}", headers={"Authorization": f"Bearer {self.auth}"}, priority='quote')
+        return {'last': response.json().get('lastPrice')}
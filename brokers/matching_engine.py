@@ -0,0 +1,141 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+
+class SimulatedOrder:
+    def __init__(self, order_id, symbol, side, quantity, price):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.price = price  # None for a market order
+        self.filled_quantity = 0
+        self.filled_notional = 0.0
+        self.status = 'open'
+
+    @property
+    def remaining(self):
+        return self.quantity - self.filled_quantity
+
+    @property
+    def average_price(self):
+        return self.filled_notional / self.filled_quantity if self.filled_quantity else None
+
+    def to_dict(self):
+        return {
+            'order_id': self.order_id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'quantity': self.quantity,
+            'price': self.price,
+            'filled_quantity': self.filled_quantity,
+            'filled_price': self.average_price,
+            'status': self.status,
+        }
+
+
+class MatchingEngine:
+    """
+    In-process exchange for simulated trading. Orders cross against the price
+    feed's top of book: buys fill at the ask when their limit is at or above
+    it, sells at the bid. Each symbol offers at most liquidity_per_tick shares
+    per tick, so large orders fill partially and the remainder rests until
+    later ticks (see advance). Also keeps the simulated account's cash and
+    positions.
+    """
+
+    def __init__(self, price_feed, starting_cash=100000.0, liquidity_per_tick=None):
+        self.price_feed = price_feed
+        self.cash = float(starting_cash)
+        self.liquidity_per_tick = liquidity_per_tick
+        self.positions = {}
+        self.orders = {}
+        self._resting = OrderedDict()
+        self._available = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, symbol, side, quantity, price=None):
+        """Submit an order; returns (order dict, fills) where fills is [(quantity, price)]."""
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Unsupported order side: {side}")
+        if quantity <= 0:
+            raise ValueError("Order quantity must be positive.")
+        with self._lock:
+            order = SimulatedOrder(next(self._ids), symbol, side, quantity, price)
+            self.orders[order.order_id] = order
+            fills = self._match(order)
+            if order.remaining > 0 and order.price is not None:
+                self._resting[order.order_id] = order
+            elif order.remaining > 0:
+                # Unfilled market order remainder does not rest
+                order.status = 'canceled' if order.filled_quantity == 0 else 'partially_filled'
+            return order.to_dict(), fills
+
+    def cancel(self, order_id):
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                raise KeyError(f"Unknown order {order_id}")
+            if self._resting.pop(order_id, None) is not None:
+                order.status = 'canceled'
+            return order.to_dict()
+
+    def get_order(self, order_id):
+        with self._lock:
+            return self.orders[order_id].to_dict()
+
+    def open_orders(self):
+        with self._lock:
+            return [order.to_dict() for order in self._resting.values()]
+
+    def advance(self):
+        """
+        Move the price feed one tick, refresh per-tick liquidity and re-match
+        resting orders. Returns [(order dict, fill quantity, fill price)].
+        """
+        with self._lock:
+            if not self.price_feed.advance():
+                return None
+            self._available.clear()
+            fills = []
+            for order in list(self._resting.values()):
+                for quantity, price in self._match(order):
+                    fills.append((order.to_dict(), quantity, price))
+                if order.remaining == 0:
+                    del self._resting[order.order_id]
+            return fills
+
+    def account_value(self):
+        with self._lock:
+            positions = dict(self.positions)
+            cash = self.cash
+        return cash + sum(quantity * self.price_feed.quote(symbol)['last'] for symbol, quantity in positions.items())
+
+    def _match(self, order):
+        quote = self.price_feed.quote(order.symbol)
+        if order.side == 'buy':
+            crossable = order.price is None or order.price >= quote['ask']
+            fill_price = quote['ask']
+        else:
+            crossable = order.price is None or order.price <= quote['bid']
+            fill_price = quote['bid']
+        if not crossable:
+            return []
+
+        available = self._available.get(order.symbol, self.liquidity_per_tick)
+        quantity = order.remaining if available is None else min(order.remaining, available)
+        if quantity <= 0:
+            return []
+        if available is not None:
+            self._available[order.symbol] = available - quantity
+
+        order.filled_quantity += quantity
+        order.filled_notional += quantity * fill_price
+        order.status = 'filled' if order.remaining == 0 else 'partially_filled'
+
+        signed = quantity if order.side == 'buy' else -quantity
+        self.positions[order.symbol] = self.positions.get(order.symbol, 0) + signed
+        self.cash -= signed * fill_price
+        return [(quantity, fill_price)]
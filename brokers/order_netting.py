@@ -0,0 +1,178 @@
+import threading
+from collections import defaultdict
+from brokers.order_tracker import order_accepted, response_order_id
+
+DEFAULT_NETTING_CONFIG = {
+    'enabled': False,
+    'window': 0.05,  # seconds intents are collected before netting
+}
+
+
+def allocate(total, weights):
+    """Split integer total across integer weights pro rata, largest remainder first."""
+    weight_sum = sum(weights)
+    if weight_sum == 0 or total == 0:
+        return [0] * len(weights)
+    exact = [total * weight / weight_sum for weight in weights]
+    shares = [int(share) for share in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in by_remainder[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+class OrderIntent:
+    def __init__(self, symbol, quantity, side, strategy):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.side = side
+        self.strategy = strategy
+        self.crossed = 0
+        self.filled = 0
+        self.fills = []  # (quantity, price)
+        self.order_id = None
+        self.error = None
+
+    def result(self):
+        filled = self.crossed + self.filled
+        priced = [(quantity, price) for quantity, price in self.fills if price is not None]
+        priced_quantity = sum(quantity for quantity, _ in priced)
+        return {
+            'symbol': self.symbol,
+            'quantity': self.quantity,
+            'side': self.side,
+            'netted_quantity': self.crossed,
+            'filled_quantity': filled,
+            'filled_price': sum(quantity * price for quantity, price in priced) / priced_quantity if priced_quantity else None,
+            'order_id': self.order_id,
+            'error': self.error,
+        }
+
+
+class NettingBatch:
+    def __init__(self):
+        self.intents = []
+        self.done = threading.Event()
+
+
+class OrderNetter:
+    """
+    Collects order intents from every strategy trading on one broker for a
+    short window, nets them per symbol and sends only the residual. Opposite
+    intents cross internally at the current price; the residual order's fill
+    is split pro rata across the strategies on its side. Each strategy gets
+    its own Trade and Position rows for what it was allocated.
+    """
+
+    def __init__(self, broker, window=DEFAULT_NETTING_CONFIG['window']):
+        self.broker = broker
+        self.window = window
+        self._batch = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, broker, config=None):
+        """Build a netter from a broker's `netting` section, or None when disabled."""
+        options = dict(DEFAULT_NETTING_CONFIG)
+        options.update(config or {})
+        if not options['enabled']:
+            return None
+        return cls(broker, window=options['window'])
+
+    def submit(self, orders, strategy):
+        """Queue (symbol, quantity, side) orders and block until their batch is netted."""
+        intents = [OrderIntent(symbol, quantity, side, strategy) for symbol, quantity, side in orders]
+        with self._lock:
+            batch = self._batch
+            if batch is None:
+                batch = self._batch = NettingBatch()
+                timer = threading.Timer(self.window, self._flush, args=(batch,))
+                timer.daemon = True
+                timer.start()
+            batch.intents.extend(intents)
+        batch.done.wait()
+        return [intent.result() for intent in intents]
+
+    def _flush(self, batch):
+        with self._lock:
+            if self._batch is batch:
+                self._batch = None
+        try:
+            by_symbol = defaultdict(list)
+            for intent in batch.intents:
+                by_symbol[intent.symbol].append(intent)
+            for symbol, intents in by_symbol.items():
+                try:
+                    self._net_symbol(symbol, intents)
+                except Exception as e:
+                    for intent in intents:
+                        intent.error = intent.error or str(e)
+            self.broker.invalidate_account_info()
+        finally:
+            batch.done.set()
+
+    def _net_symbol(self, symbol, intents):
+        buys = [intent for intent in intents if intent.side == 'buy']
+        sells = [intent for intent in intents if intent.side == 'sell']
+        for intent in sells:
+            try:
+                self.broker.check_day_trading(symbol, 'sell')
+            except ValueError as e:
+                intent.error = str(e)
+        sells = [intent for intent in sells if intent.error is None]
+
+        bought = sum(intent.quantity for intent in buys)
+        sold = sum(intent.quantity for intent in sells)
+        crossed = min(bought, sold)
+        price = self.broker.get_current_price(symbol) if crossed else None
+        if crossed and price is None:
+            # Nothing to cross at; each side goes to the broker as it is
+            for side in (sells, buys):
+                self._submit(symbol, side)
+            return
+        if crossed:
+            # Offsetting intents never reach the broker; both sides fill at the last price
+            for side in (buys, sells):
+                for intent, quantity in zip(side, allocate(crossed, [intent.quantity for intent in side])):
+                    if quantity:
+                        intent.crossed = quantity
+                        intent.fills.append((quantity, price))
+                        self._record(intent, quantity, price)
+
+        self._submit(symbol, buys if bought > sold else sells)
+
+    def _submit(self, symbol, intents):
+        """Send what the intents still need as one order and split its fill among them."""
+        remaining = [intent.quantity - intent.crossed for intent in intents]
+        quantity = sum(remaining)
+        if not quantity:
+            return
+        response = self.broker._place_order(symbol, quantity, intents[0].side)
+        if not order_accepted(response):
+            for intent in intents:
+                intent.error = f"Order for {quantity} {symbol} was not accepted"
+            return
+        # Orders the broker settles later are recorded by it once they are done
+        settles_later = response.get('track_timeout') is not None
+        filled = 0 if settles_later else response.get('filled_quantity', quantity)
+        # Brokers that pick the limit price themselves return it as 'price'
+        price = response.get('filled_price', response.get('price'))
+        order_id = response_order_id(response)
+        waiting = {}
+        for intent, share, wanted in zip(intents, allocate(filled, remaining), remaining):
+            intent.order_id = order_id
+            if share:
+                intent.filled = share
+                intent.fills.append((share, price))
+                self._record(intent, share, price)
+            if wanted > share:
+                waiting[intent.strategy] = waiting.get(intent.strategy, 0) + wanted - share
+        if waiting:
+            # Whatever rests at the broker is attributed to the strategies still waiting
+            owner = next(iter(waiting)) if len(waiting) == 1 else waiting
+            self.broker.register_order(response, owner)
+            if settles_later:
+                self.broker.record_when_settled(response, symbol, intents[0].side, dict(owner) if isinstance(owner, dict) else owner, price)
+
+    def _record(self, intent, quantity, price):
+        self.broker.record_trade(intent.symbol, quantity, intent.side, intent.strategy, {'filled_price': price, 'filled_quantity': quantity}, price)
@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import Future
+
+# Broker order states after which an order needs no more polling
+TERMINAL_STATUSES = {'filled', 'canceled', 'cancelled', 'rejected', 'expired'}
+# Submission outcomes for orders that never reached the market
+REJECTED_STATUSES = {'rejected', 'error'}
+
+DEFAULT_POLL_INTERVAL = 0.25
+# Consecutive failed polls tolerated for an order that has no timeout
+DEFAULT_MAX_POLL_FAILURES = 20
+
+
+def response_order_id(response):
+    """The order id in a broker's order response, flat or nested under 'order'."""
+    return response.get('order_id') or (response.get('order') or {}).get('id')
+
+
+def order_accepted(response):
+    """Whether the broker took the order; failed submissions return {} or a rejected status."""
+    if response.get('status') in REJECTED_STATUSES:
+        return False
+    return response_order_id(response) is not None or response.get('status') is not None
+
+
+class TrackedOrder:
+    def __init__(self, order_id, deadline, future):
+        self.order_id = order_id
+        self.deadline = deadline
+        self.future = future
+        self.status = None
+        self.failures = 0  # consecutive failed polls
+
+
+class OrderTracker:
+    """
+    Background thread that follows submitted orders until they reach a
+    terminal state. Each tracked order resolves a Future with its final
+    {'order_id', 'status', 'timed_out'} dict; orders still open after their
+    timeout are cancelled through cancel_fn.
+
+    poll_fn(order_id) returns the broker's status string for an order and
+    cancel_fn(order_id) cancels it. A failed poll does not give up on the
+    order: it is retried until the order's timeout (or max_poll_failures
+    failures in a row when it has none), then the order is cancelled and
+    its Future fails with the last poll error.
+    """
+
+    def __init__(self, poll_fn, cancel_fn, poll_interval=DEFAULT_POLL_INTERVAL, clock=time.monotonic, max_poll_failures=DEFAULT_MAX_POLL_FAILURES):
+        self.poll_fn = poll_fn
+        self.cancel_fn = cancel_fn
+        self.poll_interval = poll_interval
+        self.max_poll_failures = max_poll_failures
+        self.clock = clock
+        self._orders = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def track(self, order_id, timeout=None, callback=None):
+        """Start following order_id and return the Future its final state resolves."""
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(lambda f: self._run_callback(callback, f))
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            self._orders[order_id] = TrackedOrder(order_id, deadline, future)
+            self._ensure_running()
+            self._condition.notify()
+        return future
+
+    def get(self, order_id):
+        with self._condition:
+            tracked = self._orders.get(order_id)
+        return tracked.future if tracked else None
+
+    def pending(self):
+        with self._condition:
+            return list(self._orders)
+
+    def stop(self, wait=True):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if wait and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    @staticmethod
+    def _run_callback(callback, future):
+        if future.exception() is None:
+            callback(future.result())
+
+    def _ensure_running(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name='order-tracker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                if not self._orders:
+                    self._condition.wait()
+                    continue
+                orders = list(self._orders.values())
+            for tracked in orders:
+                self._check(tracked)
+            with self._condition:
+                if self._running and self._orders:
+                    self._condition.wait(self.poll_interval)
+
+    def _check(self, tracked):
+        try:
+            status = self.poll_fn(tracked.order_id)
+        except Exception as e:
+            self._poll_failed(tracked, e)
+            return
+        tracked.failures = 0
+        tracked.status = status
+        try:
+            if tracked.status in TERMINAL_STATUSES:
+                self._resolve(tracked, {'order_id': tracked.order_id, 'status': tracked.status, 'timed_out': False})
+            elif tracked.deadline is not None and self.clock() >= tracked.deadline:
+                self.cancel_fn(tracked.order_id)
+                self._resolve(tracked, {'order_id': tracked.order_id, 'status': 'canceled', 'timed_out': True})
+        except Exception as e:
+            self._fail(tracked, e)
+
+    def _poll_failed(self, tracked, error):
+        tracked.failures += 1
+        if tracked.deadline is not None:
+            if self.clock() < tracked.deadline:
+                return
+        elif tracked.failures < self.max_poll_failures:
+            return
+        # Don't leave an order we lost track of working at the broker
+        try:
+            self.cancel_fn(tracked.order_id)
+        except Exception:
+            pass
+        self._fail(tracked, error)
+
+    def _resolve(self, tracked, result):
+        with self._condition:
+            self._orders.pop(tracked.order_id, None)
+        tracked.future.set_result(result)
+
+    def _fail(self, tracked, error):
+        with self._condition:
+            self._orders.pop(tracked.order_id, None)
+        tracked.future.set_exception(error)
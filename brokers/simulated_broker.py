@@ -0,0 +1,171 @@
+import threading
+import time
+import traceback
+import numpy as np
+from datetime import date, timedelta
+from brokers.base_broker import BaseBroker, broker_options
+from brokers.matching_engine import MatchingEngine
+from data import black_scholes
+from data.price_feed import RandomWalkPriceFeed, create_price_feed
+
+# Seconds between price ticks when the broker runs in trade mode
+DEFAULT_TICK_INTERVAL = 1.0
+
+# Synthetic options chains: strikes around spot and a flat volatility
+CHAIN_STRIKE_STEPS = np.linspace(0.8, 1.2, 9)
+CHAIN_VOLATILITY = 0.3
+
+
+class SimulatedBroker(BaseBroker):
+    """
+    Broker backed by an in-process MatchingEngine instead of a live API, for
+    offline paper trading and load tests. Trades and positions still go
+    through the normal BaseBroker/DB path.
+
+    With tick_interval set, connect() starts a thread that calls step()
+    every tick_interval seconds, so prices move and resting orders fill in
+    trade mode. Without it the caller drives step(), as tests and backtests do.
+    """
+
+    def __init__(self, api_key=None, secret_key=None, engine=None, price_feed=None, starting_cash=100000.0, latency=0.0, liquidity_per_tick=None, broker_name='Simulated', tick_interval=None, **kwargs):
+        super().__init__(api_key, secret_key, broker_name, engine, **kwargs)
+        self.price_feed = price_feed if price_feed is not None else RandomWalkPriceFeed()
+        self.matching_engine = MatchingEngine(self.price_feed, starting_cash=starting_cash, liquidity_per_tick=liquidity_per_tick)
+        self.latency = latency
+        self.account_id = 'SIMULATED'
+        self._order_strategies = {}
+        self.tick_interval = tick_interval
+        self._ticker = None
+        self._stop_ticker = threading.Event()
+
+    @classmethod
+    def from_config(cls, config, engine):
+        return cls(
+            engine=engine,
+            price_feed=create_price_feed(config.get('feed')),
+            starting_cash=config.get('starting_cash', 100000.0),
+            latency=config.get('latency', 0.0),
+            liquidity_per_tick=config.get('liquidity_per_tick'),
+            tick_interval=config.get('tick_interval', DEFAULT_TICK_INTERVAL),
+            **broker_options(config)
+        )
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def connect(self):
+        if self.tick_interval and self._ticker is None:
+            self._stop_ticker.clear()
+            self._ticker = threading.Thread(target=self._tick, name=f"ticker-{self.broker_name}", daemon=True)
+            self._ticker.start()
+
+    def stop_ticking(self):
+        self._stop_ticker.set()
+        if self._ticker is not None and self._ticker is not threading.current_thread():
+            self._ticker.join()
+        self._ticker = None
+
+    def _tick(self):
+        while not self._stop_ticker.wait(self.tick_interval):
+            try:
+                if self.step() is None:
+                    print(f"{self.broker_name} price feed exhausted, prices stop moving")
+                    return
+            except Exception:
+                traceback.print_exc()
+
+    def _get_account_info(self):
+        self._simulate_latency()
+        cash = self.matching_engine.cash
+        return {
+            'account_number': self.account_id,
+            'account_type': 'cash',
+            'buying_power': cash,
+            'cash_available': cash,
+            'value': self.matching_engine.account_value(),
+        }
+
+    def get_positions(self):
+        self._simulate_latency()
+        return {
+            symbol: {'symbol': symbol, 'quantity': quantity}
+            for symbol, quantity in self.matching_engine.positions.items()
+            if quantity
+        }
+
+    def _place_order(self, symbol, quantity, order_type, price=None):
+        self._simulate_latency()
+        order, fills = self.matching_engine.submit(symbol, order_type, quantity, price)
+        return order
+
+    def register_order(self, response, owner):
+        super().register_order(response, owner)
+        # Remember who owns resting remainders so later fills are attributed
+        if response['status'] in ('open', 'partially_filled') and response['price'] is not None:
+            self._order_strategies[response['order_id']] = dict(owner) if isinstance(owner, dict) else owner
+
+    def _record_resting_fill(self, order, quantity, price):
+        owner = self._order_strategies.get(order['order_id'])
+        if owner is not None:
+            self.record_owner_fill(order['symbol'], quantity, order['side'], owner, {'filled_price': price}, order['price'])
+
+    def step(self):
+        """
+        Advance the price feed one tick and record fills of resting orders.
+        Returns the number of fills, or None when the feed is exhausted.
+        """
+        fills = self.matching_engine.advance()
+        if fills is None:
+            return None
+        # Cached quotes are stale after a tick
+        self.quote_cache.invalidate()
+        if self.event_bus.wants('quote'):
+            self.publish_quotes({symbol: self.price_feed.quote(symbol) for symbol in self.price_feed.symbols()})
+        for order, quantity, price in fills:
+            self._record_resting_fill(order, quantity, price)
+            if order['status'] == 'filled':
+                self._order_strategies.pop(order['order_id'], None)
+            self.publish_order_status(order['order_id'], order)
+        if fills:
+            self.invalidate_account_info()
+        return len(fills)
+
+    def _get_order_status(self, order_id):
+        self._simulate_latency()
+        return self.matching_engine.get_order(order_id)
+
+    def _cancel_order(self, order_id):
+        self._simulate_latency()
+        self._order_strategies.pop(order_id, None)
+        return self.matching_engine.cancel(order_id)
+
+    def _get_quote(self, symbol):
+        self._simulate_latency()
+        return self.price_feed.quote(symbol)
+
+    def _get_quotes(self, symbols):
+        self._simulate_latency()
+        return {symbol: self.price_feed.quote(symbol) for symbol in symbols}
+
+    def _get_options_chain(self, symbol, expiration_date):
+        self._simulate_latency()
+        spot = self.price_feed.quote(symbol)['last']
+        expiration = expiration_date or str(date.today() + timedelta(days=30))
+        t = black_scholes.year_fractions(np.array([expiration], dtype='datetime64[D]'), date.today())[0]
+        strikes = np.round(spot * CHAIN_STRIKE_STEPS, 0)
+        options = []
+        for option_type in ('call', 'put'):
+            prices = black_scholes.price(spot, strikes, t, 0.0, CHAIN_VOLATILITY, option_type == 'call')
+            for strike, option_price in zip(strikes, prices):
+                options.append({
+                    'symbol': f"{symbol}{expiration.replace('-', '')[2:]}{option_type[0].upper()}{int(strike * 1000):08d}",
+                    'strike': float(strike),
+                    'option_type': option_type,
+                    'bid': round(max(option_price - 0.05, 0.0), 2),
+                    'ask': round(option_price + 0.05, 2),
+                    'open_interest': 0,
+                    'volume': 0,
+                    'expiration_date': expiration,
+                })
+        return {'options': {'option': options}}
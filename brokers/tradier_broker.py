@@ -1,6 +1,9 @@
-import requests
-import time
-from brokers.base_broker import BaseBroker
+import asyncio
+from brokers.base_broker import BaseBroker, broker_options
+from data.market_stream import TradierMarketStream
+
+# Symbols per /markets/quotes request; keeps the query string well under URL limits
+QUOTE_BATCH_SIZE = 200
 
 class TradierBroker(BaseBroker):
     def __init__(self, api_key, secret_key, engine, **kwargs):
@@ -13,22 +16,30 @@ class TradierBroker(BaseBroker):
         self.order_timeout = 1
         self.auto_cancel_orders = True
 
-    # TODO: remove
+    @classmethod
+    def from_config(cls, config, engine):
+        # Bearer token only; there is no secret key
+        return cls(api_key=config['api_key'], secret_key=None, engine=engine, **broker_options(config))
+
     def connect(self):
+        # Bearer token auth needs no handshake. The account number is looked up
+        # from the profile on first use and memoized in self.account_id.
         pass
 
-    def _get_account_info(self):
-        # Implement account information retrieval
-        response = requests.get("https://api.tradier.com/v1/user/profile", headers=self.headers)
+    def _get_account_id(self):
+        response = self.http.get(f"{self.base_url}/user/profile", headers=self.headers)
         if response.status_code == 401:
             raise ValueError("It seems we are having trouble authenticating to Tradier")
-        account_info = response.json()
-        account_id = account_info['profile']['account']['account_number']
-        self.account_id = account_id
+        return response.json()['profile']['account']['account_number']
+
+    def _get_account_info(self):
+        # The profile call is only needed until the account number is known
+        if self.account_id is None:
+            self.account_id = self._get_account_id()
 
         # Get the balance info for the account
         url = f'{self.base_url}/accounts/{self.account_id}/balances'
-        response = requests.get(url, headers=self.headers)
+        response = self.http.get(url, headers=self.headers)
         if response.status_code != 200:
             raise Exception(f"Failed to get account info: {response.text}")
 
@@ -57,7 +68,7 @@ class TradierBroker(BaseBroker):
 
     def get_positions(self):
         url = f"{self.base_url}/accounts/{self.account_id}/positions"
-        response = requests.get(url, headers=self.headers)
+        response = self.http.get(url, headers=self.headers)
 
         if response.status_code == 200:
             positions_data = response.json()['positions']['position']
@@ -69,23 +80,8 @@ class TradierBroker(BaseBroker):
         else:
             response.raise_for_status()
 
-    def _place_order(self, symbol, quantity, order_type, price=None):
-        # Retrieve the current quote to get the bid/ask prices
-        quote_url = f"https://api.tradier.com/v1/markets/quotes?symbols={symbol}"
-        quote_response = requests.get(quote_url, headers=self.headers)
-        if quote_response.status_code != 200:
-            raise Exception(f"Failed to get quote: {quote_response.text}")
-
-        quote = quote_response.json()['quotes']['quote']
-        bid = quote['bid']
-        ask = quote['ask']
-
-        # Use the median of the bid/ask spread as the limit price if none is provided
-        if price is None:
-            price = round((bid + ask) / 2, 2)
-
-        # Prepare order data
-        order_data = {
+    def _order_data(self, symbol, quantity, order_type, price):
+        return {
             "class": "equity",
             "symbol": symbol,
             "quantity": quantity,
@@ -95,54 +91,162 @@ class TradierBroker(BaseBroker):
             "price": price
         }
 
+    @staticmethod
+    def _mid_price(quote):
+        return round((quote['bid'] + quote['ask']) / 2, 2)
+
+    def _place_order(self, symbol, quantity, order_type, price=None):
+        # Use the median of the bid/ask spread as the limit price if none is provided.
+        # The quote usually comes straight from the cache the strategy just filled.
+        if price is None:
+            price = self._mid_price(self.get_quote(symbol))
+
+        # Prepare order data
+        order_data = self._order_data(symbol, quantity, order_type, price)
+
         # Make the API call to place the order
-        response = requests.post(f"https://api.tradier.com/v1/accounts/{self.account_id}/orders", data=order_data, headers=self.headers)
+        response = self.http.post(f"https://api.tradier.com/v1/accounts/{self.account_id}/orders", data=order_data, headers=self.headers)
 
         # Check for success or raise an exception
-        if response.status_code > 400:
+        if response.status_code >= 400:
             print(f"Failed to place order: {response.text}")
             return {}
 
-        order_id = response.json()['order']['id']
-        if self.auto_cancel_orders:
-            # Wait for a short period to check if the order gets filled
-            time.sleep(self.order_timeout)
-
-            # Check the order status
-            order_status_url = f"https://api.tradier.com/v1/accounts/{self.account_id}/orders/{order_id}"
-            status_response = requests.get(order_status_url, headers=self.headers)
-            if status_response.status_code != 200:
-                raise Exception(f"Failed to get order status: {status_response.text}")
-
-            order_status = status_response.json()['order']['status']
-
-            # Cancel the order if it's not filled
-            if order_status != 'filled':
-                cancel_url = f"https://api.tradier.com/v1/accounts/{self.account_id}/orders/{order_id}/cancel"
-                cancel_response = requests.put(cancel_url, headers=self.headers)
-                if cancel_response.status_code != 200:
-                    raise Exception(f"Failed to cancel order: {cancel_response.text}")
+        return self._order_response(response.json()['order'], price)
 
-        # Return the response in JSON format
-        return response.json()
+    def _order_response(self, order, price):
+        response = {'order_id': order['id'], 'status': order.get('status'), 'price': price}
+        if self.auto_cancel_orders:
+            # A limit order rests until filled: the background tracker cancels
+            # it if it is not filled within order_timeout, and the trade is
+            # recorded from what actually filled once it is done
+            response['track_timeout'] = self.order_timeout
+        return response
+
+    def _poll_order(self, order_id):
+        status_response = self.http.get(f"{self.base_url}/accounts/{self.account_id}/orders/{order_id}", headers=self.headers)
+        if status_response.status_code != 200:
+            raise Exception(f"Failed to get order status: {status_response.text}")
+        return status_response.json()['order']['status']
+
+    def _get_order_fill(self, order_id):
+        status_response = self.http.get(f"{self.base_url}/accounts/{self.account_id}/orders/{order_id}", headers=self.headers)
+        if status_response.status_code != 200:
+            raise Exception(f"Failed to get order status: {status_response.text}")
+        order = status_response.json()['order']
+        fill = {'status': order['status'], 'filled_quantity': order.get('exec_quantity') or 0}
+        if order.get('avg_fill_price'):
+            fill['filled_price'] = order['avg_fill_price']
+        return fill
+
+    def _cancel_unfilled_order(self, order_id):
+        cancel_response = self.http.put(f"{self.base_url}/accounts/{self.account_id}/orders/{order_id}/cancel", headers=self.headers)
+        if cancel_response.status_code != 200:
+            raise Exception(f"Failed to cancel order: {cancel_response.text}")
+        return cancel_response.json()
 
     def _get_order_status(self, order_id):
         # Implement order status retrieval
-        response = requests.get(f"https://api.tradier.com/v1/accounts/orders/{order_id}", headers=self.headers)
+        response = self.http.get(f"https://api.tradier.com/v1/accounts/orders/{order_id}", headers=self.headers)
         return response.json()
 
     def _cancel_order(self, order_id):
         # Implement order cancellation
-        response = requests.delete(f"https://api.tradier.com/v1/accounts/orders/{order_id}", headers=self.headers)
+        response = self.http.delete(f"https://api.tradier.com/v1/accounts/orders/{order_id}", headers=self.headers)
         return response.json()
 
     def _get_options_chain(self, symbol, expiration_date):
         # Implement options chain retrieval
-        response = requests.get(f"https://api.tradier.com/v1/markets/options/chains?symbol={symbol}&expiration={expiration_date}", headers=self.headers)
+        response = self.http.get(f"https://api.tradier.com/v1/markets/options/chains?symbol={symbol}&expiration={expiration_date}&greeks=true", headers=self.headers, priority='chain')
         return response.json()
 
-    def get_current_price(self, symbol):
-        # Implement current price retrieval
-        response = requests.get(f"https://api.tradier.com/v1/markets/quotes?symbols={symbol}", headers=self.headers)
-        last_price = response.json().get('quotes').get('quote').get('last')
-        return last_price
+    def _create_market_stream(self, symbols):
+        return TradierMarketStream(
+            self,
+            symbols,
+            base_url=self.stream_config.get('base_url'),
+            reconnect_delay=self.stream_config['reconnect_delay'],
+            max_reconnect_delay=self.stream_config['max_reconnect_delay'],
+        )
+
+    def _get_quote(self, symbol):
+        return self._get_quotes([symbol])[symbol]
+
+    def _get_quotes(self, symbols):
+        # Tradier accepts a comma separated symbol list, so one request covers the batch
+        quotes = {}
+        for i in range(0, len(symbols), QUOTE_BATCH_SIZE):
+            batch = symbols[i:i + QUOTE_BATCH_SIZE]
+            response = self.http.get(f"{self.base_url}/markets/quotes", params={'symbols': ','.join(batch)}, headers=self.headers, priority='quote')
+            if response.status_code != 200:
+                raise Exception(f"Failed to get quotes: {response.text}")
+            quotes.update(self._parse_quotes(response.json()))
+        return quotes
+
+    @staticmethod
+    def _parse_quotes(data):
+        quote_data = data.get('quotes', {}).get('quote', [])
+        # Singular dict response
+        if type(quote_data) != list:
+            quote_data = [quote_data]
+        return {quote['symbol']: {'last': quote.get('last'), 'bid': quote.get('bid'), 'ask': quote.get('ask')} for quote in quote_data}
+
+    # Native async implementations over the broker's aiohttp session. A
+    # cassette only sees the requests transport, so with one installed they
+    # defer to the thread-based defaults.
+
+    async def _get_quotes_async(self, symbols):
+        if self.cassette is not None:
+            return await super()._get_quotes_async(symbols)
+        http = self.get_async_http()
+        batches = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+
+        async def fetch(batch):
+            await self.rate_limiter.acquire_async('quote')
+            async with http.get(f"{self.base_url}/markets/quotes", params={'symbols': ','.join(batch)}, headers=self.headers) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to get quotes: {await response.text()}")
+                return self._parse_quotes(await response.json())
+
+        quotes = {}
+        for batch_quotes in await asyncio.gather(*(fetch(batch) for batch in batches)):
+            quotes.update(batch_quotes)
+        return quotes
+
+    async def _place_order_async(self, symbol, quantity, order_type, price=None):
+        if self.cassette is not None:
+            return await super()._place_order_async(symbol, quantity, order_type, price)
+        http = self.get_async_http()
+        if price is None:
+            price = self._mid_price(await self.get_quote_async(symbol))
+
+        order_data = self._order_data(symbol, quantity, order_type, price)
+        await self.rate_limiter.acquire_async('order')
+        async with http.post(f"{self.base_url}/accounts/{self.account_id}/orders", data=order_data, headers=self.headers) as response:
+            if response.status >= 400:
+                print(f"Failed to place order: {await response.text()}")
+                return {}
+            order = (await response.json())['order']
+        return self._order_response(order, price)
+
+    async def _get_order_status_async(self, order_id):
+        if self.cassette is not None:
+            return await super()._get_order_status_async(order_id)
+        await self.rate_limiter.acquire_async('status')
+        async with self.get_async_http().get(f"{self.base_url}/accounts/orders/{order_id}", headers=self.headers) as response:
+            return await response.json()
+
+    async def _cancel_order_async(self, order_id):
+        if self.cassette is not None:
+            return await super()._cancel_order_async(order_id)
+        await self.rate_limiter.acquire_async('cancel')
+        async with self.get_async_http().delete(f"{self.base_url}/accounts/orders/{order_id}", headers=self.headers) as response:
+            return await response.json()
+
+    async def _get_options_chain_async(self, symbol, expiration_date):
+        if self.cassette is not None:
+            return await super()._get_options_chain_async(symbol, expiration_date)
+        params = {'symbol': symbol, 'expiration': expiration_date, 'greeks': 'true'}
+        await self.rate_limiter.acquire_async('chain')
+        async with self.get_async_http().get(f"{self.base_url}/markets/options/chains", params=params, headers=self.headers) as response:
+            return await response.json()
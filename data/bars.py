@@ -0,0 +1,52 @@
+import csv
+import numpy as np
+
+
+class Bars:
+    """
+    Historical close prices as a (timestamps x symbols) matrix. Timestamps
+    are sorted datetime64[s]; missing closes are forward filled from the
+    previous bar (and back filled before a symbol's first bar).
+    """
+
+    def __init__(self, timestamps, symbols, closes):
+        self.timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        self.symbols = list(symbols)
+        self.closes = np.asarray(closes, dtype=np.float64)
+        if self.closes.shape != (len(self.timestamps), len(self.symbols)):
+            raise ValueError(f"closes shape {self.closes.shape} does not match {len(self.timestamps)} timestamps x {len(self.symbols)} symbols")
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_records(cls, timestamps, symbols, prices):
+        """Pivot long-format (timestamp, symbol, price) columns into a filled matrix."""
+        timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        unique_times, rows = np.unique(timestamps, return_inverse=True)
+        unique_symbols, columns = np.unique(np.asarray(symbols), return_inverse=True)
+        closes = np.full((len(unique_times), len(unique_symbols)), np.nan)
+        closes[rows, columns] = np.asarray(prices, dtype=np.float64)
+        return cls(unique_times, unique_symbols.tolist(), _fill(closes))
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a timestamp,symbol,price CSV (the FilePriceFeed format)."""
+        with open(path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        return cls.from_records([row['timestamp'] for row in rows], [row['symbol'] for row in rows], [float(row['price']) for row in rows])
+
+    def select(self, symbols):
+        columns = [self.symbols.index(symbol) for symbol in symbols]
+        return Bars(self.timestamps, symbols, self.closes[:, columns])
+
+
+def _fill(closes):
+    # Forward fill down each column, then back fill the leading gap
+    valid = ~np.isnan(closes)
+    last_valid = np.where(valid, np.arange(len(closes))[:, None], 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    filled = closes[last_valid, np.arange(closes.shape[1])]
+    first_valid = valid.argmax(axis=0)
+    leading = np.arange(len(closes))[:, None] < first_valid
+    return np.where(leading, closes[first_valid, np.arange(closes.shape[1])], filled)
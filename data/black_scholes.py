@@ -0,0 +1,132 @@
+"""
+Vectorized Black-Scholes pricing, greeks and implied volatility. Every
+function takes scalars or NumPy arrays and broadcasts, so a whole options
+chain is priced in a handful of array operations.
+
+Conventions match Tradier's greeks: theta is per calendar day and vega is
+per one volatility point (0.01).
+"""
+import numpy as np
+
+DAYS_PER_YEAR = 365.0
+MIN_VOLATILITY = 1e-4
+MAX_VOLATILITY = 5.0
+# Keeps d1/d2 finite for contracts expiring today
+MIN_TIME_TO_EXPIRY = 1e-6
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x):
+    # Abramowitz & Stegun 7.1.26 erf approximation, |error| < 1.5e-7
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def _d1_d2(spot, strike, t, rate, vol, dividend):
+    t = np.maximum(t, MIN_TIME_TO_EXPIRY)
+    vol_sqrt_t = vol * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * vol * vol) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t, t
+
+
+def price(spot, strike, t, rate, vol, is_call, dividend=0.0):
+    d1, d2, t = _d1_d2(spot, strike, t, rate, vol, dividend)
+    discounted_spot = spot * np.exp(-dividend * t)
+    discounted_strike = strike * np.exp(-rate * t)
+    call = discounted_spot * norm_cdf(d1) - discounted_strike * norm_cdf(d2)
+    put = discounted_strike * norm_cdf(-d2) - discounted_spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def greeks(spot, strike, t, rate, vol, is_call, dividend=0.0):
+    """Return a dict of delta, gamma, theta and vega arrays."""
+    d1, d2, t = _d1_d2(spot, strike, t, rate, vol, dividend)
+    sqrt_t = np.sqrt(t)
+    dividend_discount = np.exp(-dividend * t)
+    rate_discount = np.exp(-rate * t)
+    pdf_d1 = norm_pdf(d1)
+
+    call_delta = dividend_discount * norm_cdf(d1)
+    delta = np.where(is_call, call_delta, call_delta - dividend_discount)
+    gamma = dividend_discount * pdf_d1 / (spot * vol * sqrt_t)
+    vega = spot * dividend_discount * pdf_d1 * sqrt_t
+
+    decay = -spot * dividend_discount * pdf_d1 * vol / (2 * sqrt_t)
+    call_theta = decay - rate * strike * rate_discount * norm_cdf(d2) + dividend * spot * dividend_discount * norm_cdf(d1)
+    put_theta = decay + rate * strike * rate_discount * norm_cdf(-d2) - dividend * spot * dividend_discount * norm_cdf(-d1)
+    theta = np.where(is_call, call_theta, put_theta)
+
+    return {
+        'delta': delta,
+        'gamma': gamma,
+        'theta': theta / DAYS_PER_YEAR,
+        'vega': vega / 100,
+    }
+
+
+def implied_volatility(option_price, spot, strike, t, rate, is_call, dividend=0.0, tol=1e-6, max_iter=100):
+    """
+    Solve for Black-Scholes volatility across arrays of contracts at once.
+    Newton steps are safeguarded by a per-contract [low, high] bracket and fall
+    back to bisection whenever a step would leave it, so every contract
+    converges. Prices outside the no-arbitrage bounds come back as NaN.
+    """
+    option_price, spot, strike, t, rate, is_call, dividend = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (option_price, spot, strike, t, rate, is_call, dividend))
+    )
+    is_call = is_call.astype(bool)
+    t = np.maximum(t, MIN_TIME_TO_EXPIRY)
+
+    discounted_spot = spot * np.exp(-dividend * t)
+    discounted_strike = strike * np.exp(-rate * t)
+    lower_bound = np.where(is_call, np.maximum(discounted_spot - discounted_strike, 0), np.maximum(discounted_strike - discounted_spot, 0))
+    upper_bound = np.where(is_call, discounted_spot, discounted_strike)
+    valid = np.isfinite(option_price) & (option_price > lower_bound) & (option_price < upper_bound)
+
+    low = np.full(option_price.shape, MIN_VOLATILITY)
+    high = np.full(option_price.shape, MAX_VOLATILITY)
+    vol = np.full(option_price.shape, 0.3)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        v = vol[idx]
+        diff = price(spot[idx], strike[idx], t[idx], rate[idx], v, is_call[idx], dividend[idx]) - option_price[idx]
+
+        # Price is increasing in vol, so the sign of diff tightens the bracket
+        high[idx] = np.where(diff > 0, v, high[idx])
+        low[idx] = np.where(diff < 0, v, low[idx])
+
+        d1, _, ti = _d1_d2(spot[idx], strike[idx], t[idx], rate[idx], v, dividend[idx])
+        raw_vega = spot[idx] * np.exp(-dividend[idx] * ti) * norm_pdf(d1) * np.sqrt(ti)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = diff / raw_vega
+        newton = v - step
+
+        # Converged once the vol step is below tol, or the price matches exactly
+        converged = (np.abs(step) < tol) | (diff == 0)
+        active[idx[converged]] = False
+
+        in_bracket = np.isfinite(newton) & (newton > low[idx]) & (newton < high[idx])
+        vol[idx] = np.where(in_bracket, newton, 0.5 * (low[idx] + high[idx]))
+
+        bracket_closed = (high[idx] - low[idx]) < tol
+        active[idx[bracket_closed]] = False
+
+    return np.where(valid, vol, np.nan)
+
+
+def year_fractions(expiration, valuation_date):
+    """Calendar year fractions between valuation_date and datetime64[D] expirations."""
+    days = (np.asarray(expiration, dtype='datetime64[D]') - np.datetime64(valuation_date, 'D')).astype(np.float64)
+    return np.maximum(days, 0) / DAYS_PER_YEAR
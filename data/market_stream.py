@@ -0,0 +1,113 @@
+import json
+import threading
+from data.quote_book import QuoteBook
+
+DEFAULT_STREAM_CONFIG = {
+    'max_age': 2,  # seconds a streamed quote is preferred over a REST fetch
+    'reconnect_delay': 1,
+    'max_reconnect_delay': 30,
+}
+
+
+class MarketDataStream:
+    """
+    Background consumer of a line oriented market data stream. Subclasses
+    open the stream and translate each line into quote book updates; the
+    base class owns the reader thread and reconnects with backoff.
+    """
+
+    def __init__(self, symbols, book=None, reconnect_delay=DEFAULT_STREAM_CONFIG['reconnect_delay'], max_reconnect_delay=DEFAULT_STREAM_CONFIG['max_reconnect_delay']):
+        self.symbols = sorted(set(symbols))
+        self.book = book if book is not None else QuoteBook()
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.events_received = 0
+        self.reconnects = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._response = None
+
+    def _open(self):
+        """Open the stream and return an iterable of raw lines."""
+        raise NotImplementedError
+
+    def _handle_line(self, line):
+        raise NotImplementedError
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'{type(self).__name__}', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._response is not None:
+            self._response.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                for line in self._open():
+                    if self._stop.is_set():
+                        return
+                    if line:
+                        self._handle_line(line)
+                        self.events_received += 1
+                        delay = self.reconnect_delay
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                print(f"Market data stream error, reconnecting: {e}")
+            self.reconnects += 1
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+
+class TradierMarketStream(MarketDataStream):
+    """Tradier HTTP streaming quotes: POST a session, then read newline delimited JSON events."""
+
+    def __init__(self, broker, symbols, book=None, base_url=None, **kwargs):
+        super().__init__(symbols, book=book, **kwargs)
+        self.broker = broker
+        self.base_url = base_url or broker.base_url
+
+    def _open(self):
+        response = self.broker.http.post(f"{self.base_url}/markets/events/session", headers=self.broker.headers, priority='quote')
+        if response.status_code != 200:
+            raise Exception(f"Failed to create stream session: {response.text}")
+        stream = response.json()['stream']
+
+        params = {'sessionid': stream['sessionid'], 'symbols': ','.join(self.symbols), 'filter': 'quote,trade', 'linebreak': 'true'}
+        # No read timeout: the connection stays open for as long as the market streams
+        self._response = self.broker.http.get(stream['url'], params=params, headers=self.broker.headers, stream=True, timeout=(10, None), priority='quote')
+        if self._response.status_code != 200:
+            raise Exception(f"Failed to open market stream: {self._response.text}")
+        return self._response.iter_lines()
+
+    def _handle_line(self, line):
+        event = json.loads(line)
+        symbol = event.get('symbol')
+        if event.get('type') == 'quote':
+            self.book.update(symbol, bid=_to_float(event.get('bid')), ask=_to_float(event.get('ask')))
+        elif event.get('type') == 'trade':
+            self.book.update(symbol, last=_to_float(event.get('last') or event.get('price')))
+
+
+def _to_float(value):
+    # Tradier streams prices as strings
+    return None if value is None else float(value)
+
+
+def stream_options(config=None):
+    options = dict(DEFAULT_STREAM_CONFIG)
+    options.update(config or {})
+    return options
@@ -0,0 +1,177 @@
+from datetime import date
+import numpy as np
+from data import black_scholes
+
+# Default TTL cache settings for parsed chains, keyed by (symbol, expiration)
+DEFAULT_OPTIONS_CHAIN_CACHE_CONFIG = {
+    'ttl': 30,
+    'max_size': 200,
+}
+
+NUMERIC_FIELDS = ('strike', 'bid', 'ask', 'last', 'open_interest', 'volume', 'delta', 'gamma', 'theta', 'vega', 'iv')
+
+
+class OptionsChain:
+    """
+    Columnar options chain. Every contract attribute is a NumPy array of equal
+    length, rows sorted by (expiration, strike), so filters are vectorized masks
+    and strike/expiration lookups are binary searches instead of loops over JSON.
+    """
+
+    def __init__(self, underlying, symbol, is_call, expiration, **columns):
+        order = np.lexsort((columns['strike'], expiration))
+        self.underlying = underlying
+        self.symbol = np.asarray(symbol, dtype=object)[order]
+        self.is_call = np.asarray(is_call, dtype=bool)[order]
+        self.expiration = np.asarray(expiration, dtype='datetime64[D]')[order]
+        for field in NUMERIC_FIELDS:
+            values = columns.get(field)
+            if values is None:
+                values = np.full(len(order), np.nan)
+            setattr(self, field, np.asarray(values, dtype=np.float64)[order])
+
+    @classmethod
+    def from_records(cls, underlying, records):
+        """Build a chain from option dicts in Tradier's shape (greeks nested under 'greeks')."""
+        records = list(records or [])
+        columns = {field: np.empty(len(records)) for field in NUMERIC_FIELDS}
+        symbol = []
+        is_call = np.empty(len(records), dtype=bool)
+        expiration = []
+        for i, record in enumerate(records):
+            greeks = record.get('greeks') or {}
+            symbol.append(record.get('symbol'))
+            is_call[i] = str(record.get('option_type', '')).lower() == 'call'
+            expiration.append(record.get('expiration_date'))
+            columns['strike'][i] = _number(record.get('strike'))
+            columns['bid'][i] = _number(record.get('bid'))
+            columns['ask'][i] = _number(record.get('ask'))
+            columns['last'][i] = _number(record.get('last'))
+            columns['open_interest'][i] = _number(record.get('open_interest'))
+            columns['volume'][i] = _number(record.get('volume'))
+            columns['delta'][i] = _number(greeks.get('delta', record.get('delta')))
+            columns['gamma'][i] = _number(greeks.get('gamma', record.get('gamma')))
+            columns['theta'][i] = _number(greeks.get('theta', record.get('theta')))
+            columns['vega'][i] = _number(greeks.get('vega', record.get('vega')))
+            columns['iv'][i] = _number(greeks.get('mid_iv', record.get('iv')))
+        expiration = np.array(expiration, dtype='datetime64[D]') if records else np.array([], dtype='datetime64[D]')
+        return cls(underlying, symbol, is_call, expiration, **columns)
+
+    @classmethod
+    def from_response(cls, underlying, data):
+        """Parse the {'options': {'option': [...]}} payload returned by the chains endpoints."""
+        options = (data or {}).get('options') or {}
+        records = options.get('option') if isinstance(options, dict) else None
+        # Singular dict response
+        if isinstance(records, dict):
+            records = [records]
+        return cls.from_records(underlying, records)
+
+    def __len__(self):
+        return len(self.strike)
+
+    @property
+    def option_type(self):
+        return np.where(self.is_call, 'call', 'put')
+
+    @property
+    def mid(self):
+        return (self.bid + self.ask) / 2
+
+    @property
+    def spread(self):
+        return self.ask - self.bid
+
+    def take(self, selector):
+        """Return a new chain with the rows picked by a boolean mask, index array or slice."""
+        chain = object.__new__(OptionsChain)
+        chain.underlying = self.underlying
+        for field in ('symbol', 'is_call', 'expiration') + NUMERIC_FIELDS:
+            setattr(chain, field, getattr(self, field)[selector])
+        return chain
+
+    # Vectorized filters
+
+    def calls(self):
+        return self.take(self.is_call)
+
+    def puts(self):
+        return self.take(~self.is_call)
+
+    def where(self, min_strike=None, max_strike=None, min_open_interest=None, min_volume=None, max_spread=None, min_delta=None, max_delta=None):
+        mask = np.ones(len(self), dtype=bool)
+        if min_strike is not None:
+            mask &= self.strike >= min_strike
+        if max_strike is not None:
+            mask &= self.strike <= max_strike
+        if min_open_interest is not None:
+            mask &= self.open_interest >= min_open_interest
+        if min_volume is not None:
+            mask &= self.volume >= min_volume
+        if max_spread is not None:
+            mask &= self.spread <= max_spread
+        if min_delta is not None:
+            mask &= self.delta >= min_delta
+        if max_delta is not None:
+            mask &= self.delta <= max_delta
+        return self.take(mask)
+
+    # Indexed lookups
+
+    def expirations(self):
+        return np.unique(self.expiration)
+
+    def for_expiration(self, expiration):
+        expiration = np.datetime64(expiration, 'D')
+        start = np.searchsorted(self.expiration, expiration, side='left')
+        stop = np.searchsorted(self.expiration, expiration, side='right')
+        return self.take(slice(start, stop))
+
+    def by_strike(self, strike, option_type=None):
+        """Contracts at exactly strike, optionally restricted to 'call' or 'put'."""
+        mask = self.strike == strike
+        if option_type is not None:
+            mask &= self.is_call == (option_type == 'call')
+        return self.take(mask)
+
+    def nearest_strike(self, price, option_type=None):
+        """Row index of the contract whose strike is closest to price, or None."""
+        candidates = self._candidates(option_type)
+        if len(candidates) == 0:
+            return None
+        return candidates[np.argmin(np.abs(self.strike[candidates] - price))]
+
+    def nearest_delta(self, delta, option_type=None):
+        """Row index of the contract whose delta is closest to delta, or None."""
+        candidates = self._candidates(option_type)
+        candidates = candidates[~np.isnan(self.delta[candidates])]
+        if len(candidates) == 0:
+            return None
+        return candidates[np.argmin(np.abs(self.delta[candidates] - delta))]
+
+    def compute_greeks(self, spot, rate=0.0, dividend=0.0, valuation_date=None):
+        """
+        Solve implied volatility from mid prices and compute iv, delta, gamma,
+        theta and vega for every contract in one vectorized pass. Returns a new
+        chain; self may be shared through the options chain cache and is left as is.
+        """
+        chain = self.take(slice(None))
+        t = black_scholes.year_fractions(self.expiration, valuation_date or date.today())
+        chain.iv = black_scholes.implied_volatility(self.mid, spot, self.strike, t, rate, self.is_call, dividend)
+        for field, values in black_scholes.greeks(spot, self.strike, t, rate, chain.iv, self.is_call, dividend).items():
+            setattr(chain, field, values)
+        return chain
+
+    def row(self, index):
+        record = {field: getattr(self, field)[index] for field in ('symbol', 'expiration') + NUMERIC_FIELDS}
+        record['option_type'] = 'call' if self.is_call[index] else 'put'
+        return record
+
+    def _candidates(self, option_type):
+        if option_type is None:
+            return np.arange(len(self))
+        return np.flatnonzero(self.is_call == (option_type == 'call'))
+
+
+def _number(value):
+    return np.nan if value is None else float(value)
@@ -0,0 +1,126 @@
+import csv
+import random
+import threading
+
+DEFAULT_SPREAD = 0.0005  # bid/ask spread as a fraction of price
+
+
+class PriceFeed:
+    """
+    Source of simulated top-of-book prices. quote() reads the current tick
+    and advance() moves every symbol to the next one, returning False once
+    the feed is exhausted.
+    """
+
+    def __init__(self, spread=DEFAULT_SPREAD):
+        self.spread = spread
+        self.prices = {}
+        self._lock = threading.Lock()
+
+    def quote(self, symbol):
+        with self._lock:
+            if symbol not in self.prices:
+                self.prices[symbol] = self._initial_price(symbol)
+            last = self.prices[symbol]
+        return self._quote(last)
+
+    def _quote(self, last):
+        if not self.spread:
+            return {'last': last, 'bid': last, 'ask': last}
+        half_spread = max(round(last * self.spread / 2, 2), 0.01)
+        return {'last': last, 'bid': round(last - half_spread, 2), 'ask': round(last + half_spread, 2)}
+
+    def symbols(self):
+        with self._lock:
+            return list(self.prices)
+
+    def advance(self):
+        raise NotImplementedError
+
+    def _initial_price(self, symbol):
+        raise KeyError(f"No price for {symbol}")
+
+
+class RandomWalkPriceFeed(PriceFeed):
+    def __init__(self, start_prices=None, default_price=100.0, volatility=0.001, seed=None, spread=DEFAULT_SPREAD):
+        super().__init__(spread=spread)
+        self.prices.update(start_prices or {})
+        self.default_price = default_price
+        self.volatility = volatility
+        self.random = random.Random(seed)
+
+    def _initial_price(self, symbol):
+        return self.default_price
+
+    def advance(self):
+        with self._lock:
+            for symbol, price in self.prices.items():
+                self.prices[symbol] = round(max(price * (1 + self.random.gauss(0, self.volatility)), 0.01), 2)
+        return True
+
+
+class FilePriceFeed(PriceFeed):
+    """Replays a CSV with timestamp,symbol,price columns, one timestamp per tick."""
+
+    def __init__(self, path, spread=DEFAULT_SPREAD):
+        super().__init__(spread=spread)
+        self.ticks = []
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                if not self.ticks or self.ticks[-1][0] != row['timestamp']:
+                    self.ticks.append((row['timestamp'], {}))
+                self.ticks[-1][1][row['symbol']] = float(row['price'])
+        self.position = -1
+        self.advance()
+
+    @property
+    def timestamp(self):
+        return self.ticks[self.position][0] if 0 <= self.position < len(self.ticks) else None
+
+    def advance(self):
+        if self.position + 1 >= len(self.ticks):
+            return False
+        self.position += 1
+        with self._lock:
+            self.prices.update(self.ticks[self.position][1])
+        return True
+
+
+class BarPriceFeed(PriceFeed):
+    """Serves the close of the current bar from a Bars matrix; seek() jumps to any bar."""
+
+    def __init__(self, bars, spread=0.0):
+        super().__init__(spread=spread)
+        self.bars = bars
+        self.columns = {symbol: i for i, symbol in enumerate(bars.symbols)}
+        self.index = 0
+
+    @property
+    def timestamp(self):
+        return self.bars.timestamps[self.index]
+
+    def quote(self, symbol):
+        return self._quote(float(self.bars.closes[self.index, self.columns[symbol]]))
+
+    def symbols(self):
+        return list(self.bars.symbols)
+
+    def seek(self, index):
+        self.index = index
+
+    def advance(self):
+        if self.index + 1 >= len(self.bars):
+            return False
+        self.index += 1
+        return True
+
+
+def create_price_feed(config=None):
+    """Build a feed from a broker's `feed` config: {type: random_walk|file, ...}."""
+    config = dict(config or {})
+    feed_type = config.pop('type', 'random_walk')
+    if feed_type == 'random_walk':
+        return RandomWalkPriceFeed(**config)
+    if feed_type == 'file':
+        return FilePriceFeed(**config)
+    raise ValueError(f"Unsupported price feed type: {feed_type}")
@@ -0,0 +1,59 @@
+import threading
+import time
+
+QUOTE_FIELDS = ('last', 'bid', 'ask')
+
+
+class QuoteBook:
+    """
+    In-memory top of book per symbol (last, bid, ask, timestamp), kept
+    current by a market data stream and read by the broker's quote path.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._book = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Call listener(symbol, quote) after every update, on the updating thread."""
+        self._listeners.append(listener)
+
+    def update(self, symbol, **fields):
+        """Merge the non-None quote fields into symbol's entry and stamp it."""
+        with self._lock:
+            entry = self._book.setdefault(symbol, {'last': None, 'bid': None, 'ask': None, 'timestamp': None})
+            for field in QUOTE_FIELDS:
+                if fields.get(field) is not None:
+                    entry[field] = fields[field]
+            entry['timestamp'] = self.clock()
+            quote = dict(entry) if self._listeners else None
+        for listener in self._listeners:
+            listener(symbol, quote)
+
+    def get(self, symbol):
+        with self._lock:
+            entry = self._book.get(symbol)
+            return dict(entry) if entry else None
+
+    def get_fresh_many(self, symbols, max_age):
+        """Return {symbol: quote} for complete entries updated within max_age seconds."""
+        now = self.clock()
+        fresh = {}
+        with self._lock:
+            for symbol in symbols:
+                entry = self._book.get(symbol)
+                if entry is None or now - entry['timestamp'] > max_age:
+                    continue
+                if any(entry[field] is None for field in QUOTE_FIELDS):
+                    continue
+                fresh[symbol] = {field: entry[field] for field in QUOTE_FIELDS}
+        return fresh
+
+    def symbols(self):
+        with self._lock:
+            return list(self._book)
+
+    def __len__(self):
+        return len(self._book)
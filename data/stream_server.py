@@ -0,0 +1,112 @@
+"""
+Local stand-in for Tradier's streaming API so the market data stream can be
+exercised offline. Serves the session endpoint and an endless newline
+delimited JSON feed of random-walk quote and trade events.
+
+    python -m data.stream_server --port 8765
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StreamRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/v1/markets/events/session':
+            self.send_error(404)
+            return
+        self._send_json({'stream': {'url': f'{self.server.base_url}/markets/events', 'sessionid': 'local-session'}})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/v1/markets/events':
+            self.send_error(404)
+            return
+        symbols = parse_qs(url.query).get('symbols', [''])[0].split(',')
+        symbols = [symbol for symbol in symbols if symbol]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        try:
+            while not self.server.stopping.is_set():
+                for symbol in symbols:
+                    for event in self.server.next_events(symbol):
+                        self.wfile.write(json.dumps(event).encode() + b'\n')
+                self.wfile.flush()
+                self.server.stopping.wait(self.server.interval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class LocalStreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, interval=0.05, start_price=100.0, volatility=0.001, seed=None):
+        super().__init__((host, port), StreamRequestHandler)
+        self.interval = interval
+        self.start_price = start_price
+        self.volatility = volatility
+        self.prices = {}
+        self.random = random.Random(seed)
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def next_events(self, symbol):
+        with self._lock:
+            price = self.prices.get(symbol, self.start_price) * (1 + self.random.gauss(0, self.volatility))
+            self.prices[symbol] = price
+        spread = max(round(price * 0.0005, 2), 0.01)
+        now = str(int(time.time() * 1000))
+        return [
+            {'type': 'quote', 'symbol': symbol, 'bid': f'{price - spread / 2:.2f}', 'ask': f'{price + spread / 2:.2f}', 'biddate': now, 'askdate': now},
+            {'type': 'trade', 'symbol': symbol, 'price': f'{price:.2f}', 'last': f'{price:.2f}', 'size': '100', 'date': now},
+        ]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='local-stream-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Tradier market data stream for offline testing.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--interval', type=float, default=0.1, help='Seconds between event batches')
+    args = parser.parse_args()
+    server = LocalStreamServer(args.host, args.port, interval=args.interval)
+    print(f"Streaming on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
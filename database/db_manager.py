@@ -13,23 +13,17 @@ class DBManager:
         self.Session = sessionmaker(bind=engine)
 
     def add_account_info(self, account_info):
-        with self.Session() as session:
+        # Update the broker's row in place, one commit, and skip it when unchanged
+        session = self.Session()
+        try:
             existing_info = session.query(AccountInfo).filter_by(broker=account_info.broker).first()
             if existing_info:
+                if existing_info.value == account_info.value:
+                    return
                 existing_info.value = account_info.value
             else:
                 session.add(account_info)
             session.commit()
-
-    def add_account_info(self, account_info):
-        session = self.Session()
-        try:
-            existing_info = session.query(AccountInfo).first()
-            if existing_info:
-                session.delete(existing_info)
-                session.commit()
-            session.add(account_info)
-            session.commit()
         except Exception as e:
             session.rollback()
             raise e
@@ -0,0 +1,306 @@
+import atexit
+import threading
+import weakref
+from datetime import datetime
+from sqlalchemy import insert, update
+from sqlalchemy.exc import DataError, IntegrityError
+from .models import Balance, Position, Trade
+
+DEFAULT_LEDGER_CONFIG = {
+    'flush_interval': 1.0,  # seconds between write-behind flushes
+    'max_retries': 3,  # failed batch flushes before rows are written one by one
+}
+
+# Errors a row will hit however often it is retried
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+def _close_at_exit(reference):
+    ledger = reference()
+    if ledger is None:
+        return
+    try:
+        ledger.close()
+    except Exception as e:
+        print(f"Ledger flush for {ledger.broker_name} failed at exit: {e}")
+
+
+class LedgerPosition:
+    __slots__ = ('quantity', 'latest_price', 'last_updated', 'balance_id', 'id')
+
+    def __init__(self, quantity=0.0, latest_price=None, last_updated=None, balance_id=None, id=None):
+        self.quantity = quantity
+        self.latest_price = latest_price
+        self.last_updated = last_updated
+        self.balance_id = balance_id
+        self.id = id  # Position row id, once written
+
+
+class Ledger:
+    """
+    Authoritative in-memory positions and balances for one broker, keyed by
+    (strategy, symbol). It is hydrated from the Position and Balance tables
+    on first use. Fills update memory only; changed positions are written
+    back in one transaction every flush_interval seconds, and on close() or
+    interpreter exit. A failed flush keeps its positions dirty for the next
+    one.
+
+    Trades handed to flush() are inserted in the same transaction. If it
+    fails they stay queued, and a later flush writes them together with
+    their positions. While a strategy is held (see hold()), its positions
+    are only written by the flush that releases it, alongside its trades.
+    After max_retries failed flushes in a row the next one writes each
+    trade and position on its own, so a row that can never be written
+    (a constraint violation, say) is set aside in dead_letters instead of
+    stalling every later write.
+
+    Balances are rare and need their row id, so new ones are written
+    through immediately.
+    """
+
+    def __init__(self, Session, broker_name, flush_interval=DEFAULT_LEDGER_CONFIG['flush_interval'], max_retries=DEFAULT_LEDGER_CONFIG['max_retries']):
+        self.Session = Session
+        self.broker_name = broker_name
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.flushes = 0
+        self.failures = 0  # consecutive failed flushes
+        # {'kind': 'trade' or 'position', 'row': column values, 'error'} for rows set aside
+        self.dead_letters = []
+        # Called with the trades of each successful flush, ids set
+        self.trades_written = None
+        self._positions = {}
+        self._balances = {}  # strategy -> (balance id, total balance)
+        self._dirty = set()
+        self._held = set()
+        self._trades = []  # (Trade, column values) waiting to be inserted
+        self._hydrated = False
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Flush on exit without keeping the ledger alive
+        atexit.register(_close_at_exit, weakref.ref(self))
+
+    @classmethod
+    def from_config(cls, Session, broker_name, config=None):
+        options = dict(DEFAULT_LEDGER_CONFIG)
+        options.update(config or {})
+        return cls(Session, broker_name, flush_interval=options['flush_interval'], max_retries=options['max_retries'])
+
+    def hydrate(self):
+        """Load this broker's positions and balances, once."""
+        with self._lock:
+            if self._hydrated:
+                return
+            with self.Session() as session:
+                for balance in session.query(Balance).filter_by(broker=self.broker_name):
+                    self._balances.setdefault(balance.strategy, (balance.id, balance.total_balance))
+                for position in session.query(Position).filter_by(broker=self.broker_name):
+                    self._positions[(position.strategy, position.symbol)] = LedgerPosition(
+                        position.quantity, position.latest_price, position.last_updated, position.balance_id, position.id
+                    )
+            self._hydrated = True
+
+    def get_balance(self, strategy):
+        """The strategy's total balance, or None when it has none."""
+        self.hydrate()
+        with self._lock:
+            balance = self._balances.get(strategy)
+        return balance[1] if balance else None
+
+    def ensure_balance(self, strategy, total_balance):
+        """Create the strategy's Balance row if it has none; return its total balance."""
+        self.hydrate()
+        with self._lock:
+            if strategy not in self._balances:
+                with self.Session() as session:
+                    balance = Balance(strategy=strategy, broker=self.broker_name, total_balance=total_balance)
+                    session.add(balance)
+                    session.commit()
+                    self._balances[strategy] = (balance.id, balance.total_balance)
+            return self._balances[strategy][1]
+
+    def get_position(self, strategy, symbol):
+        self.hydrate()
+        with self._lock:
+            position = self._positions.get((strategy, symbol))
+            return position.quantity if position else 0
+
+    def get_positions(self, strategy):
+        """{symbol: quantity} of the strategy's open positions."""
+        self.hydrate()
+        with self._lock:
+            return {symbol: position.quantity for (owner, symbol), position in self._positions.items() if owner == strategy and position.quantity}
+
+    def apply_fill(self, strategy, symbol, side, quantity, price, timestamp):
+        self.hydrate()
+        key = (strategy, symbol)
+        with self._lock:
+            position = self._positions.get(key)
+            if side == 'buy':
+                if position is None:
+                    balance = self._balances.get(strategy)
+                    position = self._positions[key] = LedgerPosition(balance_id=balance[0] if balance else None)
+                position.quantity += quantity
+            elif side == 'sell':
+                if position is None:
+                    return
+                if quantity > position.quantity:
+                    raise ValueError("Sell quantity exceeds current position quantity.")
+                position.quantity -= quantity
+            if price is not None:
+                # A fill without a price keeps the last known one
+                position.latest_price = price
+            position.last_updated = timestamp
+            self._dirty.add(key)
+        self._ensure_flusher()
+
+    def hold(self, strategy):
+        """Keep the strategy's positions out of flushes until one releases it."""
+        with self._lock:
+            self._held.add(strategy)
+
+    def flush(self, trades=(), release=None):
+        """
+        Insert trades ((Trade, column values) pairs) and write every changed
+        position in one transaction; returns how many positions were written.
+        release ends the hold on a strategy, so its positions are included.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._held.discard(release)
+                pending, self._trades = self._trades + list(trades), []
+                written = {key for key in self._dirty if key[0] not in self._held}
+                self._dirty -= written
+                # Snapshot so fills can keep landing while the transaction runs
+                rows = {}
+                for key in written:
+                    position = self._positions[key]
+                    rows[key] = LedgerPosition(position.quantity, position.latest_price, position.last_updated, position.balance_id, position.id)
+            if not rows and not pending:
+                return 0
+            try:
+                if self.failures >= self.max_retries:
+                    ids, inserted = self._write_each(pending, rows)
+                else:
+                    with self.Session() as session:
+                        ids = []
+                        if pending:
+                            statement = insert(Trade).returning(Trade.id, sort_by_parameter_order=True)
+                            ids = session.scalars(statement, [values for _, values in pending]).all()
+                        inserted = self._write(session, rows)
+                        session.commit()
+            except Exception:
+                with self._lock:
+                    self._dirty |= set(rows)
+                    self._trades[:0] = pending
+                    self.failures += 1
+                raise
+            with self._lock:
+                for key, position_id in inserted.items():
+                    self._positions[key].id = position_id
+            self.failures = 0
+            self.flushes += 1
+            trades = []
+            for (trade, _), trade_id in zip(pending, ids):
+                if trade_id is not None:
+                    trade.id = trade_id
+                    trades.append(trade)
+        if trades and self.trades_written is not None:
+            self.trades_written(trades)
+        return len(rows)
+
+    def _write_each(self, pending, rows):
+        """
+        Write every trade and position in its own transaction, setting aside
+        the rows that fail with a row error. Rows hit by any other error (the
+        database is down, say) stay queued for the next flush.
+        """
+        ids = []
+        for index, (_, values) in enumerate(pending):
+            try:
+                with self.Session() as session:
+                    ids.append(session.scalar(insert(Trade).returning(Trade.id), values))
+                    session.commit()
+            except ROW_ERRORS as e:
+                ids.append(None)
+                self._dead_letter('trade', values, e)
+            except Exception as e:
+                print(f"Ledger flush for {self.broker_name} failed, retrying next interval: {e}")
+                with self._lock:
+                    self._trades[:0] = pending[index:]
+                    self._dirty |= set(rows)
+                return ids, {}
+        inserted = {}
+        for key, row in rows.items():
+            try:
+                with self.Session() as session:
+                    inserted.update(self._write(session, {key: row}))
+                    session.commit()
+            except ROW_ERRORS as e:
+                self._dead_letter('position', {'strategy': key[0], 'symbol': key[1], 'quantity': row.quantity, 'balance_id': row.balance_id}, e)
+            except Exception:
+                with self._lock:
+                    self._dirty.add(key)
+        return ids, inserted
+
+    def _dead_letter(self, kind, row, error):
+        print(f"Ledger for {self.broker_name} set aside a {kind} it cannot write: {row}: {error}")
+        with self._lock:
+            self.dead_letters.append({'kind': kind, 'row': row, 'error': error})
+
+    def pending_trades(self):
+        with self._lock:
+            return len(self._trades)
+
+    def _write(self, session, rows):
+        # Known rows are updated by primary key in one executemany; new rows
+        # are inserted in one statement whose RETURNING gives their ids
+        updates = [
+            {'id': row.id, 'quantity': row.quantity, 'latest_price': row.latest_price, 'last_updated': row.last_updated or datetime.now()}
+            for row in rows.values() if row.id is not None
+        ]
+        if updates:
+            session.execute(update(Position), updates)
+        new = [key for key, row in rows.items() if row.id is None]
+        if not new:
+            return {}
+        values = [
+            {
+                'broker': self.broker_name,
+                'strategy': strategy,
+                'symbol': symbol,
+                'quantity': rows[(strategy, symbol)].quantity,
+                'latest_price': rows[(strategy, symbol)].latest_price,
+                'last_updated': rows[(strategy, symbol)].last_updated or datetime.now(),
+                'balance_id': rows[(strategy, symbol)].balance_id,
+            }
+            for strategy, symbol in new
+        ]
+        ids = session.scalars(insert(Position).returning(Position.id, sort_by_parameter_order=True), values).all()
+        return dict(zip(new, ids))
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._held.clear()
+        if self._hydrated or self._trades:
+            self.flush()
+
+    def _ensure_flusher(self):
+        if self._thread is None and self.flush_interval and not self._stop.is_set():
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"ledger-{self.broker_name}", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Ledger flush for {self.broker_name} failed, retrying next interval: {e}")
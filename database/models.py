@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, create_engine, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, create_engine, ForeignKey, Index, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -22,6 +22,13 @@ class Trade(Base):
     success = Column(String, nullable=True)
     balance_id = Column(Integer, ForeignKey('balances.id'))
 
+    __table_args__ = (
+        # has_bought_today: a broker's buys of a symbol since midnight
+        Index('ix_trades_broker_symbol_order_type_timestamp', 'broker', 'symbol', 'order_type', 'timestamp'),
+        # Per strategy and broker counts in the UI
+        Index('ix_trades_strategy_broker', 'strategy', 'broker'),
+    )
+
 class AccountInfo(Base):
     __tablename__ = 'account_info'
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -39,11 +46,17 @@ class Balance(Base):
     trades = relationship('Trade', backref='balance')
     positions = relationship("Position", back_populates="balance")
 
+    __table_args__ = (
+        Index('ix_balances_broker_strategy', 'broker', 'strategy'),
+    )
+
 class Position(Base):
     __tablename__ = 'positions'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    balance_id = Column(Integer, ForeignKey('balances.id'), nullable=False)
+    # Strategies without a Balance row can still hold positions; init_db
+    # relaxes the NOT NULL that older databases have on this column
+    balance_id = Column(Integer, ForeignKey('balances.id'), nullable=True)
     strategy = Column(String)
     broker = Column(String, nullable=False)
     symbol = Column(String, nullable=False)
@@ -53,10 +66,39 @@ class Position(Base):
 
     balance = relationship("Balance", back_populates="positions")
 
+    __table_args__ = (
+        Index('ix_positions_broker_strategy_symbol', 'broker', 'strategy', 'symbol'),
+    )
+
 
 def drop_then_init_db(engine):
     Base.metadata.drop_all(engine)  # Create new tables
     Base.metadata.create_all(engine)  # Create new tables
 
+def _allow_positions_without_balance(engine):
+    """Drop the NOT NULL on positions.balance_id in databases created before it was nullable."""
+    columns = {column['name']: column for column in inspect(engine).get_columns('positions')}
+    if columns['balance_id']['nullable']:
+        return
+    with engine.begin() as connection:
+        if engine.dialect.name == 'postgresql':
+            connection.exec_driver_sql('ALTER TABLE positions ALTER COLUMN balance_id DROP NOT NULL')
+        elif engine.dialect.name in ('mysql', 'mariadb'):
+            connection.exec_driver_sql('ALTER TABLE positions MODIFY balance_id INTEGER NULL')
+        else:
+            # SQLite cannot alter a column, so the table is rebuilt
+            names = ', '.join(name for name in Position.__table__.columns.keys() if name in columns)
+            connection.exec_driver_sql('ALTER TABLE positions RENAME TO positions_old')
+            for index in inspect(connection).get_indexes('positions_old'):
+                connection.exec_driver_sql(f'DROP INDEX {index["name"]}')
+            Position.__table__.create(connection)
+            connection.exec_driver_sql(f'INSERT INTO positions ({names}) SELECT {names} FROM positions_old')
+            connection.exec_driver_sql('DROP TABLE positions_old')
+
 def init_db(engine):
     Base.metadata.create_all(engine)  # Create new tables
+    _allow_positions_without_balance(engine)
+    # create_all skips tables that already exist, so add indexes missing from older databases
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
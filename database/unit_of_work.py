@@ -0,0 +1,41 @@
+import threading
+
+
+class UnitOfWork:
+    """
+    Trades one strategy records during a rebalance. The ledger holds the
+    strategy's positions while the unit is open; commit() hands the trades
+    to the ledger, which inserts them with a single multi-row INSERT ...
+    RETURNING in the same transaction as those positions, instead of one
+    transaction per fill. If that transaction fails, the ledger keeps the
+    trades and retries them with the positions on its next flush.
+    """
+
+    def __init__(self, ledger, strategy):
+        self.ledger = ledger
+        self.strategy = strategy
+        self.closed = False
+        self._trades = []
+        self._lock = threading.Lock()
+        ledger.hold(strategy)
+
+    def add(self, trade, values):
+        """
+        Queue trade, a transient Trade built from the column values dict.
+        Returns False once the unit has committed; the caller writes it itself.
+        """
+        with self._lock:
+            if self.closed:
+                return False
+            self._trades.append((trade, values))
+            return True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._trades)
+
+    def commit(self):
+        with self._lock:
+            self.closed = True
+            pending, self._trades = self._trades, []
+        self.ledger.flush(trades=pending, release=self.strategy)
@@ -0,0 +1,27 @@
+from strategies.base_strategy import BaseStrategy
+
+class DipBuyingStrategy(BaseStrategy):
+    """Buys a share whenever a streamed quote drops 1% below the last fill."""
+
+    def __init__(self, broker, stock_allocations, cash_percentage, rebalance_interval_minutes, starting_capital):
+        self.stock_allocations = stock_allocations
+        self.cash_percentage = cash_percentage
+        self.rebalance_interval_minutes = rebalance_interval_minutes
+        self.starting_capital = starting_capital
+        self.strategy_name = 'dip_buying'
+        self.last_fill_price = {}
+        super().__init__(broker)
+
+    def rebalance(self):
+        # Nothing timed; everything happens in the event hooks
+        pass
+
+    def on_quote(self, event):
+        reference = self.last_fill_price.get(event.symbol)
+        last = event.data.get('last')
+        # Quotes for illiquid or halted symbols can come without a last price
+        if reference is not None and last is not None and last < reference * 0.99:
+            self.broker.place_order(event.symbol, 1, 'buy', self.strategy_name)
+
+    def on_fill(self, event):
+        self.last_fill_price[event.symbol] = event.data['price']
@@ -1,9 +1,9 @@
 import argparse
-import time
-from datetime import datetime, timedelta
 from database.models import init_db
-from ui.app import create_app
-from utils.config import parse_config, initialize_brokers, initialize_strategies
+from utils.config import parse_config, initialize_brokers, register_plugins, start_market_streams
+from utils.startup import startup, print_startup_report
+from utils.scheduler import StrategyScheduler
+from utils.supervisor import Supervisor
 from sqlalchemy import create_engine
 
 
@@ -22,24 +22,69 @@ def start_trading_system(config_path):
     init_db(engine)
     # Initialize the brokers
     brokers = initialize_brokers(config)
-    # Connect to each broker
-    for broker in brokers.values():
-        broker.connect()
-    # Initialize the strategies
-    strategies = initialize_strategies(brokers, config)
-    # Execute the strategies loop
-    rebalance_intervals = [timedelta(minutes=s.rebalance_interval_minutes) for s in strategies]
-    last_rebalances = [datetime.min for _ in strategies]
-    while True:
-        now = datetime.now()
-        for i, strategy in enumerate(strategies):
-            if now - last_rebalances[i] >= rebalance_intervals[i]:
-                strategy.rebalance()
-                last_rebalances[i] = now
-        time.sleep(60)  # Check every minute
+    try:
+        if (config.get('isolation') or {}).get('enabled'):
+            run_isolated(brokers, config)
+            return
+        # Run each strategy's rebalances on its own schedule, starting as soon
+        # as its broker is connected rather than after every broker is
+        scheduler = StrategyScheduler.from_config([], config.get('scheduler'))
+        scheduler_thread = scheduler.start()
+        # Connect the brokers and initialize the strategies concurrently
+        connected, strategies, report = startup(brokers, config, on_strategy=scheduler.add)
+        print_startup_report(report)
+        # Keep an in-memory quote book current for brokers that stream
+        start_market_streams(connected, strategies, config)
+        run_strategies(scheduler, scheduler_thread)
+    finally:
+        # Write back positions still held in the brokers' ledgers, and end
+        # recorded cassettes so they can be replayed
+        for broker in brokers.values():
+            broker.ledger.close()
+            if broker.cassette is not None:
+                broker.cassette.close()
+
+
+def run_strategies(scheduler, scheduler_thread):
+    try:
+        scheduler_thread.join()
+    finally:
+        scheduler.stop(wait=False)
+        for name, stats in scheduler.stats().items():
+            print(f"{name}: {stats['runs']} runs, {stats['skipped']} skipped, {stats['failures']} failed, "
+                  f"lateness avg {stats['avg_lateness'] * 1e3:.1f} ms max {stats['max_lateness'] * 1e3:.1f} ms")
+
+
+def run_isolated(brokers, config):
+    # Brokers stay in this process; strategies run in supervised workers
+    brokers, _, report = startup(brokers, dict(config, strategies=[]))
+    print_startup_report(report)
+    start_market_streams(brokers, [], config, strategy_configs=config.get('strategies', []))
+    supervisor = Supervisor.from_config(brokers, config)
+    try:
+        supervisor.run()
+    finally:
+        supervisor.stop()
+        for name, stats in supervisor.stats().items():
+            print(f"{name}: {stats['restarts']} restarts, last exit code {stats['last_exitcode']}")
+
+
+def run_backtests(config_path, bars_path):
+    # Imported per mode so trade mode does not pay for them at startup
+    from backtest.engine import Backtest
+    from data.bars import Bars
+    config = parse_config(config_path)
+    register_plugins(config)
+    options = config.get('backtest') or {}
+    bars = Bars.from_csv(bars_path)
+    for strategy_config in config['strategies']:
+        result = Backtest(bars, strategy_config, starting_cash=options.get('starting_cash', 100000.0), spread=options.get('spread', 0.0)).run()
+        metrics = ', '.join(f"{name}={value:.4f}" if isinstance(value, float) else f"{name}={value}" for name, value in result.metrics().items())
+        print(f"{strategy_config['type']}: {metrics}")
 
 
 def start_api_server(config_path=None):
+    from ui.app import create_app
     if config_path is None:
         config = {}
     else:
@@ -53,13 +98,18 @@ def start_api_server(config_path=None):
 
 def main():
     parser = argparse.ArgumentParser(description="Run trading strategies or start API server based on YAML configuration.")
-    parser.add_argument('--mode', choices=['trade', 'api'], required=True, help='Mode to run the system in: "trade" or "api"')
+    parser.add_argument('--mode', choices=['trade', 'api', 'backtest'], required=True, help='Mode to run the system in: "trade", "api" or "backtest"')
     parser.add_argument('--config', type=str, help='Path to the YAML configuration file.')
+    parser.add_argument('--bars', type=str, help='CSV of timestamp,symbol,price bars for backtest mode.')
     args = parser.parse_args()
     if args.mode == 'trade':
         if not args.config:
             parser.error('--config is required when mode is "trade"')
         start_trading_system(args.config)
+    elif args.mode == 'backtest':
+        if not args.config or not args.bars:
+            parser.error('--config and --bars are required when mode is "backtest"')
+        run_backtests(args.config, args.bars)
     elif args.mode == 'api':
         start_api_server()
 
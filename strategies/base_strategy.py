@@ -1,15 +1,66 @@
+import asyncio
 from abc import ABC, abstractmethod
-from database.models import Balance
+from contextlib import nullcontext
+
+# Optional event hooks; a strategy is subscribed to the events it overrides
+EVENT_HANDLERS = ('on_quote', 'on_bar', 'on_fill', 'on_order_status')
 
 class BaseStrategy(ABC):
     def __init__(self, broker):
         self.broker = broker
         self.initialize_starting_balance()
+        self.subscribe_events()
 
     @abstractmethod
     def rebalance(self):
         pass
 
+    async def rebalance_async(self):
+        # Strategies that await broker calls concurrently override this; the
+        # default runs the sync rebalance on a worker thread so it does not
+        # block other strategies sharing the event loop.
+        await asyncio.to_thread(self.rebalance)
+
+    # Event hooks, called on the strategy's own event thread (see
+    # utils/event_bus.py), concurrently with rebalance. Each gets an Event.
+
+    def on_quote(self, event):
+        pass
+
+    def on_bar(self, event):
+        pass
+
+    def on_fill(self, event):
+        pass
+
+    def on_order_status(self, event):
+        pass
+
+    def event_handlers(self):
+        """{event type: handler} for the on_* hooks this strategy overrides."""
+        return {
+            name[len('on_'):]: getattr(self, name)
+            for name in EVENT_HANDLERS
+            if getattr(type(self), name) is not getattr(BaseStrategy, name)
+        }
+
+    def subscribe_events(self):
+        event_bus = getattr(self.broker, 'event_bus', None)
+        handlers = self.event_handlers()
+        if event_bus is None or not handlers:
+            return None
+        # Quotes and bars for the strategy's own symbols when it has them
+        symbols = getattr(self, 'stock_allocations', None)
+        return event_bus.subscribe(self, handlers, symbols=list(symbols) if symbols is not None else None)
+
+    def unit_of_work(self):
+        """Batch the trades recorded until the block exits (see BaseBroker.unit_of_work)."""
+        unit_of_work = getattr(self.broker, 'unit_of_work', None)
+        if unit_of_work is None:
+            # Brokers proxied from a worker process record each trade as it fills
+            return nullcontext()
+        return unit_of_work(self.strategy_name)
+
     def initialize_starting_balance(self):
         account_info = self.broker.get_account_info()
         buying_power = account_info.get('buying_power')
@@ -17,17 +68,4 @@ class BaseStrategy(ABC):
         if buying_power < self.starting_capital:
             raise ValueError("Not enough cash available to initialize the strategy with the desired starting capital.")
 
-        with self.broker.Session() as session:
-            strategy_balance = session.query(Balance).filter_by(
-                strategy=self.strategy_name,
-                broker=self.broker.broker_name
-            ).first()
-
-            if strategy_balance is None:
-                strategy_balance = Balance(
-                    strategy=self.strategy_name,
-                    broker=self.broker.broker_name,
-                    total_balance=self.starting_capital
-                )
-                session.add(strategy_balance)
-                session.commit()
+        self.broker.ensure_strategy_balance(self.strategy_name, self.starting_capital)
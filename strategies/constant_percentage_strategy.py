@@ -1,45 +1,126 @@
+import asyncio
+import numpy as np
 from datetime import timedelta
 from strategies.base_strategy import BaseStrategy
-from database.models import Balance
+from strategies.rebalance_planner import plan_rebalance, deltas_to_orders
+
+DEFAULT_DRIFT_CONFIG = {
+    'shares': 0,  # leave positions within this many shares of target
+    'percent': 0,  # ... or within this percent of the target quantity
+    'dollars': 0,  # ... or within this dollar value of target
+    'price_max_age': 300,  # seconds a previous price may decide a symbol needs no quote
+}
 
 class ConstantPercentageStrategy(BaseStrategy):
-    def __init__(self, broker, stock_allocations, cash_percentage, rebalance_interval_minutes, starting_capital):
+    def __init__(self, broker, stock_allocations, cash_percentage, rebalance_interval_minutes, starting_capital, drift=None, min_order_notional=0):
         self.stock_allocations = stock_allocations
+        # Fixed symbol order for the vectorized planner
+        self.symbols = list(stock_allocations)
+        self.allocation_vector = np.array([stock_allocations[symbol] for symbol in self.symbols], dtype=np.float64)
         self.rebalance_interval_minutes = rebalance_interval_minutes
         self.cash_percentage = cash_percentage
         self.rebalance_interval = timedelta(minutes=rebalance_interval_minutes)
         self.starting_capital = starting_capital
+        self.drift = dict(DEFAULT_DRIFT_CONFIG)
+        self.drift.update(drift or {})
+        self.min_order_notional = min_order_notional
+        # Last quoted price and when, per symbol
+        self.last_prices = {}
         self.strategy_name = 'constant_percentage'
         super().__init__(broker)
 
+    @classmethod
+    def from_config(cls, broker, config):
+        return cls(
+            broker=broker,
+            stock_allocations=config['stock_allocations'],
+            cash_percentage=config['cash_percentage'],
+            rebalance_interval_minutes=config['rebalance_interval_minutes'],
+            starting_capital=config['starting_capital'],
+            drift=config.get('drift'),
+            min_order_notional=config.get('min_order_notional', 0)
+        )
+
+    def get_total_balance(self):
+        total_balance = self.broker.get_strategy_balance(self.strategy_name)
+        if total_balance is None:
+            raise ValueError(f"Strategy balance not initialized for {self.strategy_name} strategy on {self.broker.broker_name}.")
+        return total_balance
+
+    def plan_orders(self, total_balance, current_positions, current_prices):
+        """Return the (symbol, quantity, side) orders that bring positions to their targets."""
+        target_investment_balance = total_balance * (1 - self.cash_percentage)
+
+        # TODO: query the number of current positions in the DB for each ticker
+        # associated with this strategy, and then get their current value.
+        prices = self._price_vector(current_prices)
+        positions = np.array([current_positions.get(symbol, 0) for symbol in self.symbols], dtype=np.float64)
+        deltas = plan_rebalance(
+            self.allocation_vector, prices, positions, target_investment_balance,
+            drift_shares=self.drift['shares'], drift_percent=self.drift['percent'], drift_dollars=self.drift['dollars'],
+            min_notional=self.min_order_notional,
+        )
+        return deltas_to_orders(self.symbols, deltas)
+
+    def _price_vector(self, prices):
+        return np.array([prices[symbol] if prices.get(symbol) is not None else np.nan for symbol in self.symbols], dtype=np.float64)
+
+    def symbols_to_quote(self, total_balance, current_positions):
+        """
+        Symbols that need a fresh quote: those without a recent price, and
+        those whose recent price puts them outside the drift band.
+        """
+        # Broker time, so backtests age prices by bar time
+        now = self.broker.now()
+        recent = {symbol: price for symbol, (price, seen) in self.last_prices.items() if (now - seen).total_seconds() <= self.drift['price_max_age']}
+        deltas = plan_rebalance(
+            self.allocation_vector, self._price_vector(recent),
+            np.array([current_positions.get(symbol, 0) for symbol in self.symbols], dtype=np.float64),
+            total_balance * (1 - self.cash_percentage),
+            drift_shares=self.drift['shares'], drift_percent=self.drift['percent'], drift_dollars=self.drift['dollars'],
+        )
+        return [symbol for symbol, delta in zip(self.symbols, deltas) if symbol not in recent or delta]
+
+    def _remember_prices(self, prices):
+        now = self.broker.now()
+        for symbol, price in prices.items():
+            if price is not None:
+                self.last_prices[symbol] = (price, now)
+
     def rebalance(self):
         account_info = self.broker.get_account_info()
         cash_balance = account_info.get('cash_available')
-        with self.broker.Session() as session:
-            balance = session.query(Balance).filter_by(
-                strategy=self.strategy_name,
-                broker=self.broker.broker_name
-            ).first()
-            if balance is None:
-                raise ValueError("Strategy balance not initialized for {self.strategy_name} strategy on {self.broker}.")
-            total_balance = balance.total_balance
-
-        target_cash_balance = total_balance * self.cash_percentage
-        target_investment_balance = total_balance - target_cash_balance
+        total_balance = self.get_total_balance()
 
         current_positions = self.get_current_positions()
+        symbols = self.symbols_to_quote(total_balance, current_positions)
+        if not symbols:
+            return
+        # One batched quote request for every symbol that may need an order
+        current_prices = self.broker.get_current_prices(symbols)
+        self._remember_prices(current_prices)
 
-        # TODO: query the number of current positions in the DB for each ticker
-        # associated with this strategy, and then get their current value.
-        for stock, allocation in self.stock_allocations.items():
-            target_balance = target_investment_balance * allocation
-            current_position = current_positions.get(stock, 0)
-            current_price = self.broker.get_current_price(stock)
-            target_quantity = target_balance // current_price
-            if current_position < target_quantity:
-                self.broker.place_order(stock, target_quantity - current_position, 'buy', 'constant_percentage')
-            elif current_position > target_quantity:
-                self.broker.place_order(stock, current_position - target_quantity, 'sell', 'constant_percentage')
+        self.broker.place_orders(self.plan_orders(total_balance, current_positions, current_prices), self.strategy_name)
+
+    async def rebalance_async(self):
+        # Account info, balance, positions and quotes are independent, so fetch them together
+        account_info, total_balance, current_positions = await asyncio.gather(
+            self.broker.get_account_info_async(),
+            asyncio.to_thread(self.get_total_balance),
+            asyncio.to_thread(self.get_current_positions),
+        )
+        symbols = self.symbols_to_quote(total_balance, current_positions)
+        if not symbols:
+            return
+        current_prices = await self.broker.get_current_prices_async(symbols)
+        self._remember_prices(current_prices)
+
+        orders = self.plan_orders(total_balance, current_positions, current_prices)
+        # The same batch path as rebalance: sells first, netting, and one unit of work for the trades
+        def place():
+            with self.unit_of_work():
+                self.broker.place_orders(orders, self.strategy_name)
+        await asyncio.to_thread(place)
 
     def get_current_positions(self):
         positions = self.broker.get_positions()
@@ -0,0 +1,47 @@
+"""
+Vectorized rebalance planning. Allocations, prices and positions are aligned
+NumPy vectors over one symbol universe, so planning thousands of symbols is a
+few array operations and needs no broker, which also makes it usable for
+what-if runs.
+"""
+import numpy as np
+
+
+def plan_rebalance(allocations, prices, positions, investable, drift_shares=0, drift_percent=0, drift_dollars=0, min_notional=0):
+    """
+    Return the whole-share order delta per symbol (positive buys, negative
+    sells) that moves positions to floor(investable * allocation / price).
+    Symbols without a usable price are left alone, as are symbols inside the
+    drift band and orders worth less than min_notional.
+    """
+    allocations = np.asarray(allocations, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    priced = np.isfinite(prices) & (prices > 0)
+    safe_prices = np.where(priced, prices, 1.0)
+    targets = np.floor(investable * allocations / safe_prices)
+    deltas = targets - positions
+    trade = priced & ~within_band(deltas, targets, safe_prices, drift_shares, drift_percent, drift_dollars)
+    trade &= np.abs(deltas) * safe_prices >= min_notional
+    return np.where(trade, deltas, 0).astype(np.int64)
+
+
+def within_band(deltas, targets, prices, shares=0, percent=0, dollars=0):
+    """
+    True where a position is close enough to its target to leave alone: the
+    drift is at most `shares` shares, `percent` percent of the target
+    quantity, or `dollars` in value. A zero drift is always inside the band.
+    """
+    drift = np.abs(deltas)
+    return (drift <= shares) | (drift <= np.abs(targets) * percent / 100.0) | (drift * prices <= dollars)
+
+
+def deltas_to_orders(symbols, deltas):
+    """Turn an order-delta vector into [(symbol, quantity, side)], skipping zero deltas."""
+    deltas = np.asarray(deltas)
+    indexes = np.flatnonzero(deltas)
+    changes = deltas[indexes]
+    return [
+        (symbols[i], quantity, 'buy' if buy else 'sell')
+        for i, quantity, buy in zip(indexes.tolist(), np.abs(changes).tolist(), (changes > 0).tolist())
+    ]
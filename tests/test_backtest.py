@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from database.models import Trade, Balance, Position
+from data.bars import Bars
+from data.price_feed import BarPriceFeed
+from backtest.engine import Backtest
+
+STRATEGY = {
+    'type': 'constant_percentage',
+    'stock_allocations': {'AAPL': 0.5, 'MSFT': 0.5},
+    'cash_percentage': 0.2,
+    'rebalance_interval_minutes': 60,
+    'starting_capital': 10000,
+}
+
+
+def make_bars(minutes=600):
+    timestamps = np.datetime64('2024-01-02T14:30') + np.arange(minutes).astype('timedelta64[m]')
+    aapl = np.linspace(100, 120, minutes)
+    msft = np.full(minutes, 200.0)
+    return Bars(timestamps, ['AAPL', 'MSFT'], np.column_stack([aapl, msft]))
+
+
+class TestBars(unittest.TestCase):
+    def test_from_records_pivots_and_fills(self):
+        bars = Bars.from_records(
+            ['2024-01-01T00:00', '2024-01-01T00:00', '2024-01-01T00:01', '2024-01-01T00:02'],
+            ['AAPL', 'MSFT', 'AAPL', 'MSFT'],
+            [100, 200, 101, 202],
+        )
+        self.assertEqual(bars.symbols, ['AAPL', 'MSFT'])
+        np.testing.assert_array_equal(bars.closes, [[100, 200], [101, 200], [101, 202]])
+
+    def test_leading_gap_is_back_filled(self):
+        bars = Bars.from_records(['2024-01-01', '2024-01-02'], ['AAPL', 'MSFT'], [100, 200])
+        np.testing.assert_array_equal(bars.closes, [[100, 200], [100, 200]])
+
+    def test_from_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('timestamp,symbol,price\n2024-01-01T00:00,AAPL,100\n2024-01-01T00:01,AAPL,101\n')
+        try:
+            bars = Bars.from_csv(file.name)
+        finally:
+            os.remove(file.name)
+        self.assertEqual(len(bars), 2)
+        self.assertEqual(bars.closes[-1, 0], 101)
+
+    def test_bar_price_feed(self):
+        feed = BarPriceFeed(make_bars(3))
+        self.assertEqual(feed.quote('AAPL'), {'last': 100.0, 'bid': 100.0, 'ask': 100.0})
+        feed.seek(2)
+        self.assertEqual(feed.quote('AAPL')['last'], 120.0)
+        self.assertFalse(feed.advance())
+
+
+class TestBacktest(unittest.TestCase):
+    def test_constant_percentage_backtest(self):
+        backtest = Backtest(make_bars(), STRATEGY, starting_cash=10000)
+        result = backtest.run()
+
+        self.assertEqual(len(result.equity), 600)
+        self.assertEqual(result.equity[0], 10000)
+        # 8000 invested at the first bar: 40 AAPL @ 100 and 20 MSFT @ 200
+        np.testing.assert_array_equal(result.positions[0], [40, 20])
+        self.assertGreater(result.equity[-1], 10000)
+        metrics = result.metrics()
+        self.assertGreater(metrics['total_return'], 0)
+        self.assertEqual(metrics['max_drawdown'], 0.0)
+
+        with backtest.broker.Session() as session:
+            trades = session.query(Trade).filter_by(broker='Backtest').order_by(Trade.timestamp).all()
+            self.assertEqual(metrics['trades'], len(trades))
+            # Trades carry bar time, not wall-clock time
+            self.assertEqual(trades[0].timestamp.isoformat(), '2024-01-02T14:30:00')
+            self.assertEqual(session.query(Balance).filter_by(broker='Backtest').one().total_balance, 10000)
+            aapl = session.query(Position).filter_by(broker='Backtest', symbol='AAPL').one()
+            self.assertEqual(aapl.quantity, result.positions[-1][0])
+
+    def test_rebalance_indices_follow_interval(self):
+        backtest = Backtest(make_bars(), STRATEGY)
+        np.testing.assert_array_equal(backtest.rebalance_indices(3600), np.arange(0, 600, 60))
+
+
+if __name__ == '__main__':
+    unittest.main()
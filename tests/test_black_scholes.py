@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+from data import black_scholes
+from data.options_chain import OptionsChain
+
+class TestBlackScholes(unittest.TestCase):
+
+    def test_reference_prices_and_greeks(self):
+        prices = black_scholes.price(100.0, 100.0, 1.0, 0.05, 0.2, np.array([True, False]))
+        np.testing.assert_allclose(prices, [10.4506, 5.5735], atol=1e-4)
+
+        greeks = black_scholes.greeks(100.0, 100.0, 1.0, 0.05, 0.2, np.array([True, False]))
+        np.testing.assert_allclose(greeks['delta'], [0.6368, -0.3632], atol=1e-4)
+        np.testing.assert_allclose(greeks['gamma'], [0.018762, 0.018762], atol=1e-5)
+        np.testing.assert_allclose(greeks['vega'], [0.37524, 0.37524], atol=1e-4)
+        np.testing.assert_allclose(greeks['theta'] * 365, [-6.4140, -1.6579], atol=1e-3)
+
+    def test_put_call_parity(self):
+        strikes = np.linspace(50, 150, 21)
+        call = black_scholes.price(100.0, strikes, 0.5, 0.03, 0.35, True)
+        put = black_scholes.price(100.0, strikes, 0.5, 0.03, 0.35, False)
+        np.testing.assert_allclose(call - put, 100.0 - strikes * np.exp(-0.03 * 0.5), atol=1e-5)
+
+    def test_implied_volatility_round_trip(self):
+        rng = np.random.default_rng(7)
+        strikes = rng.uniform(80, 120, 500)
+        t = rng.uniform(0.05, 2.0, 500)
+        vols = rng.uniform(0.1, 1.0, 500)
+        is_call = rng.random(500) < 0.5
+        prices = black_scholes.price(100.0, strikes, t, 0.02, vols, is_call)
+
+        solved = black_scholes.implied_volatility(prices, 100.0, strikes, t, 0.02, is_call)
+        np.testing.assert_allclose(solved, vols, atol=1e-5)
+
+    def test_prices_outside_arbitrage_bounds_are_nan(self):
+        solved = black_scholes.implied_volatility([0.5, 150.0, np.nan], 100.0, [50.0, 100.0, 100.0], 1.0, 0.0, True)
+        self.assertTrue(np.all(np.isnan(solved)))
+
+    def test_chain_greeks_in_one_call(self):
+        strikes = np.array([90.0, 100.0, 110.0, 90.0, 100.0, 110.0])
+        is_call = np.array([True, True, True, False, False, False])
+        expiration = np.array(['2025-01-01'] * 6, dtype='datetime64[D]')
+        t = black_scholes.year_fractions(expiration, '2024-01-01')
+        fair = black_scholes.price(100.0, strikes, t, 0.01, 0.25, is_call)
+        chain = OptionsChain('XYZ', [f'XYZ{i}' for i in range(6)], is_call, expiration, strike=strikes, bid=fair - 0.01, ask=fair + 0.01)
+
+        priced = chain.compute_greeks(100.0, rate=0.01, valuation_date='2024-01-01')
+        # The source chain, possibly cached and shared, is not modified
+        self.assertTrue(np.all(np.isnan(chain.iv)))
+        chain = priced
+        np.testing.assert_allclose(chain.iv, 0.25, atol=1e-5)
+        self.assertTrue(np.all(chain.delta[chain.is_call] > 0))
+        self.assertTrue(np.all(chain.delta[~chain.is_call] < 0))
+        self.assertEqual(chain.nearest_delta(0.5, 'call'), chain.nearest_strike(100.0, 'call'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
+import asyncio
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
-from datetime import datetime
-from database.models import Trade, Balance, Position
+from datetime import datetime, timedelta
+from database.models import Trade, Balance
 from .base_test import BaseTest
 from brokers.base_broker import BaseBroker
 
@@ -10,7 +13,7 @@ class MockBroker(BaseBroker):
         pass
 
     def _get_account_info(self):
-        return {'profile': {'account': {'account_number': '12345', 'value': 10000.0}}}
+        return {'profile': {'account': {'account_number': '12345', 'value': 10000.0}}, 'value': 10000.0}
 
     def _place_order(self, symbol, quantity, order_type, price=None):
         return {'status': 'filled', 'filled_price': 150.0}
@@ -24,8 +27,8 @@ class MockBroker(BaseBroker):
     def _get_options_chain(self, symbol, expiration_date):
         return {'options': 'chain'}
 
-    def get_current_price(self, symbol):
-        return 150.0
+    def _get_quote(self, symbol):
+        return {'last': 150.0, 'bid': 149.9, 'ask': 150.1}
 
     def execute_trade(self, *args):
         pass
@@ -77,40 +80,111 @@ class TestTrading(BaseTest):
         self.assertEqual(balance.total_balance, 1510.0)
 
     def test_has_bought_today(self):
-        today = datetime.now().date()
-        self.session.query.return_value.filter.return_value.all.return_value = [
-            Trade(symbol="AAPL", timestamp=today)
-        ]
-
-        result = self.broker.has_bought_today("AAPL")
-        self.assertTrue(result)
-
-        self.session.query.return_value.filter.return_value.all.return_value = []
-        result = self.broker.has_bought_today("AAPL")
-        self.assertFalse(result)
-
-    def test_update_positions_buy(self):
-        trade = Trade(symbol="AAPL", quantity=10, executed_price=150.0, order_type="buy", timestamp=datetime.now())
-        self.session.query.return_value.filter_by.return_value.first.return_value = None
-
-        self.broker.update_positions(self.session, trade)
-        self.session.add.assert_called_once()
-
-        position = self.session.add.call_args[0][0]
-        self.assertEqual(position.symbol, "AAPL")
-        self.assertEqual(position.quantity, 10)
-        self.assertEqual(position.latest_price, 150.0)
-
-    def test_update_positions_sell(self):
-        trade = Trade(symbol="AAPL", quantity=5, executed_price=155.0, order_type="sell", timestamp=datetime.now())
-        existing_position = Position(symbol="AAPL", broker="dummy_broker", quantity=10, latest_price=150.0)
-        self.session.query.return_value.filter_by.return_value.first.return_value = existing_position
-
-        self.broker.update_positions(self.session, trade)
-        self.session.commit.assert_called()
-
-        self.assertEqual(existing_position.quantity, 5)
-        self.assertEqual(existing_position.latest_price, 155.0)
+        self.session.query.return_value.scalar.return_value = True
+        self.assertTrue(self.broker.has_bought_today("AAPL"))
+
+        self.session.query.return_value.scalar.return_value = False
+        self.assertFalse(self.broker.has_bought_today("MSFT"))
+        # Each symbol is looked up once a day, then answered from memory
+        self.assertTrue(self.broker.has_bought_today("AAPL"))
+        self.assertFalse(self.broker.has_bought_today("MSFT"))
+        self.assertEqual(self.session.query.call_count, 2)
+
+    def test_buys_are_remembered_until_midnight(self):
+        self.session.query.return_value.scalar.return_value = False
+        self.assertFalse(self.broker.has_bought_today("AAPL"))
+        self.broker.place_order("AAPL", 1, "buy", "strategy")
+        self.assertTrue(self.broker.has_bought_today("AAPL"))
+
+        with patch.object(self.broker, 'now', return_value=datetime.now() + timedelta(days=1)):
+            self.assertFalse(self.broker.has_bought_today("AAPL"))
+
+    def test_same_day_sell_is_rejected_before_reaching_the_broker(self):
+        self.session.query.return_value.scalar.return_value = False
+        self.broker.place_order("AAPL", 2, "buy", "strategy")
+        with patch.object(self.broker, '_place_order', wraps=self.broker._place_order) as place:
+            with self.assertRaisesRegex(ValueError, 'Day trading'):
+                self.broker.place_order("AAPL", 1, "sell", "strategy")
+            place.assert_not_called()
+            # Symbols not bought today can still be sold
+            self.broker.place_order("MSFT", 1, "sell", "strategy")
+            place.assert_called_once()
+
+    def test_get_current_prices_fans_out(self):
+        prices = self.broker.get_current_prices(['AAPL', 'MSFT', 'AAPL'])
+        self.assertEqual(prices, {'AAPL': 150.0, 'MSFT': 150.0})
+        self.assertEqual(self.broker.get_current_prices([]), {})
+
+    def test_get_current_prices_served_from_cache(self):
+        with patch.object(self.broker, '_get_quotes', wraps=self.broker._get_quotes) as mock_get_quotes:
+            self.broker.get_current_prices(['AAPL', 'MSFT'])
+            self.assertEqual(self.broker.get_current_price('AAPL'), 150.0)
+            self.broker.get_current_prices(['AAPL', 'MSFT', 'GOOG'])
+            self.assertEqual(mock_get_quotes.call_count, 2)
+            self.assertEqual(mock_get_quotes.call_args[0][0], ['GOOG'])
+        self.assertEqual(self.broker.quote_cache.stats()['hits'], 3)
+
+    def test_async_quotes_share_cache(self):
+        self.broker.get_current_price('AAPL')
+        with patch.object(self.broker, '_get_quotes', wraps=self.broker._get_quotes) as mock_get_quotes:
+            prices = asyncio.run(self.broker.get_current_prices_async(['AAPL', 'MSFT']))
+            mock_get_quotes.assert_called_once_with(['MSFT'])
+        self.assertEqual(prices, {'AAPL': 150.0, 'MSFT': 150.0})
+
+    def test_place_order_async_records_trade(self):
+        with patch.object(self.broker, 'record_trade') as mock_record_trade:
+            response = asyncio.run(self.broker.place_order_async('AAPL', 10, 'buy', 'test_strategy', 150.0))
+        self.assertEqual(response, {'status': 'filled', 'filled_price': 150.0})
+        mock_record_trade.assert_called_once_with('AAPL', 10, 'buy', 'test_strategy', response, 150.0)
+
+    def test_account_info_cached_until_fill(self):
+        self.broker.db_manager = MagicMock()
+        with patch.object(self.broker, '_get_account_info', wraps=self.broker._get_account_info) as mock_get_account_info:
+            self.broker.get_account_info()
+            self.broker.get_account_info()
+            self.assertEqual(mock_get_account_info.call_count, 1)
+
+            with patch.object(self.broker, 'record_trade'):
+                self.broker.place_order('AAPL', 1, 'buy', 'test_strategy', 150.0)
+            self.broker.get_account_info()
+            self.assertEqual(mock_get_account_info.call_count, 2)
+
+        # The value never changed, so only the first snapshot was written
+        self.broker.db_manager.add_account_info.assert_called_once()
+
+    def test_place_orders_sends_sells_first(self):
+        placed = []
+        with patch.object(self.broker, 'place_order', side_effect=lambda symbol, quantity, side, strategy: placed.append(side) or {'symbol': symbol}) as mock_place_order:
+            responses = self.broker.place_orders([('AAPL', 1, 'buy'), ('MSFT', 2, 'sell'), ('GOOG', 3, 'buy')], 'test_strategy')
+        self.assertEqual(placed, ['sell', 'buy', 'buy'])
+        self.assertEqual([response['symbol'] for response in responses], ['AAPL', 'MSFT', 'GOOG'])
+        mock_place_order.assert_any_call('MSFT', 2, 'sell', 'test_strategy')
+
+    def test_concurrent_account_info_fetched_once(self):
+        self.broker.db_manager = MagicMock()
+        def slow_account_info():
+            time.sleep(0.05)
+            return {'value': 10000.0}
+        with patch.object(self.broker, '_get_account_info', side_effect=slow_account_info) as mock_get_account_info:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: self.broker.get_account_info(), range(8)))
+        self.assertEqual(mock_get_account_info.call_count, 1)
+        self.assertEqual(results, [{'value': 10000.0}] * 8)
+
+    def test_sync_and_async_account_info_share_one_fetch(self):
+        self.broker.db_manager = MagicMock()
+        def slow_account_info():
+            time.sleep(0.05)
+            return {'value': 10000.0}
+        async def fetch_all():
+            return await asyncio.gather(
+                *(self.broker.get_account_info_async() for _ in range(4)),
+                *(asyncio.to_thread(self.broker.get_account_info) for _ in range(4)),
+            )
+        with patch.object(self.broker, '_get_account_info', side_effect=slow_account_info) as mock_get_account_info:
+            results = asyncio.run(fetch_all())
+        self.assertEqual(mock_get_account_info.call_count, 1)
+        self.assertEqual(results, [{'value': 10000.0}] * 8)
 
 if __name__ == '__main__':
     unittest.main()
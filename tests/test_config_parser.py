@@ -38,15 +38,14 @@ class TestConfigParser(unittest.TestCase):
             rebalance_interval_minutes: 60
         """
 
-    @patch('utils.config.TradierBroker')
-    @patch('utils.config.TastytradeBroker')
-    def test_initialize_brokers(self, MockTastytradeBroker, MockTradierBroker):
+    def test_initialize_brokers(self):
         mock_broker_tradier = MagicMock()
         mock_broker_tastytrade = MagicMock()
-        MockTradierBroker.return_value = mock_broker_tradier
-        MockTastytradeBroker.return_value = mock_broker_tastytrade
+        MockTradierBroker = MagicMock(return_value=mock_broker_tradier)
+        MockTastytradeBroker = MagicMock(return_value=mock_broker_tastytrade)
         config = yaml.safe_load(self.config)
-        brokers = initialize_brokers(config)
+        with patch.dict('utils.config.BROKER_MAP', {'tradier': MockTradierBroker, 'tastytrade': MockTastytradeBroker}):
+            brokers = initialize_brokers(config)
         self.assertEqual(brokers, {'tradier': mock_broker_tradier, 'tastytrade': mock_broker_tastytrade})
         MockTradierBroker.assert_called_once()
         MockTastytradeBroker.assert_called_once()
@@ -1,6 +1,7 @@
+import asyncio
 import unittest
-from unittest.mock import MagicMock
-from datetime import timedelta
+from unittest.mock import MagicMock, AsyncMock
+from datetime import datetime, timedelta
 from strategies.constant_percentage_strategy import ConstantPercentageStrategy
 
 class TestConstantPercentageStrategy(unittest.TestCase):
@@ -49,5 +50,79 @@ class TestConstantPercentageStrategy(unittest.TestCase):
         self.mock_broker.place_order.assert_any_call('GOOGL', 20 - 5, 'buy', 'constant_percentage')
         self.mock_broker.place_order.assert_any_call('MSFT', 13 - 15, 'sell', 'constant_percentage')
 
+class TestConstantPercentageRebalance(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_broker = MagicMock()
+        self.mock_broker.broker_name = 'Tradier'
+        self.mock_broker.get_account_info.return_value = {'buying_power': 20000, 'value': 20000}
+        self.mock_broker.get_strategy_balance.return_value = 10000
+        self.strategy = ConstantPercentageStrategy(
+            broker=self.mock_broker,
+            stock_allocations={'AAPL': 0.5, 'MSFT': 0.5},
+            cash_percentage=0.2,
+            rebalance_interval_minutes=60,
+            starting_capital=10000
+        )
+
+    def test_rebalance_uses_batched_quotes(self):
+        self.mock_broker.get_positions.return_value = {'AAPL': {'quantity': 10}}
+        self.mock_broker.get_current_prices.return_value = {'AAPL': 100.0, 'MSFT': 200.0}
+
+        self.strategy.rebalance()
+
+        self.mock_broker.get_current_prices.assert_called_once()
+        self.mock_broker.get_current_price.assert_not_called()
+        self.mock_broker.place_orders.assert_called_once_with([('AAPL', 30, 'buy'), ('MSFT', 20, 'buy')], 'constant_percentage')
+
+    def test_plan_orders_skips_unpriced_and_balanced_symbols(self):
+        orders = self.strategy.plan_orders(10000, {'AAPL': 40, 'MSFT': 3}, {'AAPL': 100.0, 'MSFT': None})
+        self.assertEqual(orders, [])
+        orders = self.strategy.plan_orders(10000, {'AAPL': 45}, {'AAPL': 100.0, 'MSFT': 200.0})
+        self.assertEqual(orders, [('AAPL', 5, 'sell'), ('MSFT', 20, 'buy')])
+
+    def test_drift_band_skips_quotes_and_orders(self):
+        self.mock_broker.now.side_effect = lambda: datetime(2024, 1, 2, 10, 0)
+        self.strategy.drift.update({'shares': 2})
+        self.strategy.min_order_notional = 500
+        self.mock_broker.get_positions.return_value = {'AAPL': {'quantity': 39}, 'MSFT': {'quantity': 10}}
+        self.mock_broker.get_current_prices.return_value = {'AAPL': 100.0, 'MSFT': 200.0}
+
+        self.strategy.rebalance()
+        # AAPL is 1 share off target (inside the band); MSFT needs 10 more
+        self.mock_broker.place_orders.assert_called_once_with([('MSFT', 10, 'buy')], 'constant_percentage')
+
+        # With recent prices on hand, only the out-of-band symbol is quoted again
+        self.mock_broker.get_current_prices.reset_mock()
+        self.mock_broker.get_current_prices.return_value = {'MSFT': 200.0}
+        self.strategy.rebalance()
+        self.mock_broker.get_current_prices.assert_called_once_with(['MSFT'])
+
+        # Once in band everywhere, no quotes and no orders
+        self.mock_broker.get_positions.return_value = {'AAPL': {'quantity': 39}, 'MSFT': {'quantity': 20}}
+        self.mock_broker.get_current_prices.reset_mock()
+        self.mock_broker.place_orders.reset_mock()
+        self.strategy.rebalance()
+        self.mock_broker.get_current_prices.assert_not_called()
+        self.mock_broker.place_orders.assert_not_called()
+
+    def test_min_order_notional(self):
+        self.strategy.min_order_notional = 150
+        self.mock_broker.get_positions.return_value = {'AAPL': {'quantity': 39}, 'MSFT': {'quantity': 10}}
+        self.mock_broker.get_current_prices.return_value = {'AAPL': 100.0, 'MSFT': 200.0}
+        self.strategy.rebalance()
+        self.mock_broker.place_orders.assert_called_once_with([('MSFT', 10, 'buy')], 'constant_percentage')
+
+    def test_rebalance_async_places_orders_as_one_batch(self):
+        self.mock_broker.get_positions.return_value = {'AAPL': {'quantity': 50}}
+        self.mock_broker.get_account_info_async = AsyncMock(return_value={'buying_power': 20000})
+        self.mock_broker.get_current_prices_async = AsyncMock(return_value={'AAPL': 100.0, 'MSFT': 200.0})
+
+        asyncio.run(self.strategy.rebalance_async())
+
+        self.mock_broker.place_order.assert_not_called()
+        self.mock_broker.place_orders.assert_called_once_with([('AAPL', 10, 'sell'), ('MSFT', 20, 'buy')], 'constant_percentage')
+        self.mock_broker.unit_of_work.assert_called_once_with('constant_percentage')
+
 if __name__ == '__main__':
     unittest.main()
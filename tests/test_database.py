@@ -0,0 +1,64 @@
+import unittest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+from database.db_manager import DBManager
+from database.models import AccountInfo, Base, init_db
+from .base_test import BaseTest
+
+class TestDBManager(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.db_manager = DBManager(self.engine)
+
+    def tearDown(self):
+        self.session.query(AccountInfo).delete()
+        self.session.commit()
+        super().tearDown()
+
+    def test_add_account_info_upserts_per_broker(self):
+        self.db_manager.add_account_info(AccountInfo(broker='Tradier', value=100.0))
+        self.db_manager.add_account_info(AccountInfo(broker='E*TRADE', value=50.0))
+        self.db_manager.add_account_info(AccountInfo(broker='Tradier', value=120.0))
+
+        rows = {row.broker: row.value for row in self.session.query(AccountInfo).all()}
+        self.assertEqual(rows, {'Tradier': 120.0, 'E*TRADE': 50.0})
+
+
+class TestMigrations(unittest.TestCase):
+    def test_init_db_lets_older_positions_tables_take_rows_without_a_balance(self):
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                'CREATE TABLE positions (id INTEGER PRIMARY KEY, balance_id INTEGER NOT NULL, strategy VARCHAR, broker VARCHAR NOT NULL, '
+                'symbol VARCHAR NOT NULL, quantity FLOAT NOT NULL, latest_price FLOAT NOT NULL, last_updated DATETIME NOT NULL)'
+            )
+            connection.exec_driver_sql("INSERT INTO positions VALUES (1, 7, 's1', 'Tradier', 'AAPL', 3, 100.0, '2024-01-02 00:00:00')")
+        init_db(engine)
+
+        self.assertTrue({column['name']: column for column in inspect(engine).get_columns('positions')}['balance_id']['nullable'])
+        self.assertIn('ix_positions_broker_strategy_symbol', {index['name'] for index in inspect(engine).get_indexes('positions')})
+        with engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO positions (broker, strategy, symbol, quantity, latest_price, last_updated) VALUES ('Tradier', 's2', 'MSFT', 1, 400.0, '2024-01-02 00:00:00')")
+            rows = connection.exec_driver_sql('SELECT id, balance_id, symbol, quantity FROM positions ORDER BY id').fetchall()
+        self.assertEqual([tuple(row) for row in rows], [(1, 7, 'AAPL', 3.0), (2, None, 'MSFT', 1.0)])
+        # Running it again is a no-op
+        init_db(engine)
+
+
+class TestIndexes(unittest.TestCase):
+    def test_init_db_adds_indexes_to_existing_tables(self):
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql('DROP INDEX ix_trades_broker_symbol_order_type_timestamp')
+        init_db(engine)
+        self.assertIn('ix_trades_broker_symbol_order_type_timestamp', {index['name'] for index in inspect(engine).get_indexes('trades')})
+
+        # The day trading lookup is answered from the index
+        with engine.connect() as connection:
+            plan = connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT EXISTS (SELECT 1 FROM trades WHERE symbol = 'AAPL' "
+                "AND broker = 'Tradier' AND order_type = 'buy' AND timestamp >= '2024-01-02')"
+            ).fetchall()
+        self.assertIn('ix_trades_broker_symbol_order_type_timestamp', ' '.join(str(row[-1]) for row in plan))
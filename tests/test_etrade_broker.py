@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 from sqlalchemy import create_engine
 from brokers.etrade_broker import EtradeBroker
 from .base_test import BaseTest
+from data.options_chain import OptionsChain
 from database.models import Balance, Trade
 
 class TestEtradeBroker(BaseTest):
@@ -17,16 +18,16 @@ class TestEtradeBroker(BaseTest):
         mock_response.json.return_value = {'access_token': 'token'}
         mock_post.return_value = mock_response
 
-    @patch('brokers.etrade_broker.requests.get')
-    @patch('brokers.etrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_connect(self, mock_post, mock_get):
         self.mock_connect(mock_post)
         self.broker.connect()
         self.assertTrue(hasattr(self.broker, 'auth'))
 
 
-    @patch('brokers.etrade_broker.requests.get')
-    @patch('brokers.etrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_account_info(self, mock_post, mock_get):
         self.mock_connect(mock_post)
         mock_response = MagicMock()
@@ -42,8 +43,8 @@ class TestEtradeBroker(BaseTest):
         self.assertEqual(account_info, {'value': 10000.0})
         self.assertEqual(self.broker.account_id, '12345')
 
-    @patch('brokers.etrade_broker.requests.post')
-    @patch('brokers.etrade_broker.requests.get')
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
     def skip_test_place_order(self, mock_get, mock_post):
         self.mock_connect(mock_post)
         
@@ -72,8 +73,8 @@ class TestEtradeBroker(BaseTest):
         self.assertIsNotNone(balance)
         self.assertEqual(balance.total_balance, 10000.0 + (10 * 155.00))  # Assuming the balance should include the executed trade
 
-    @patch('brokers.etrade_broker.requests.get')
-    @patch('brokers.etrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_order_status(self, mock_post_connect, mock_get):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
@@ -84,8 +85,8 @@ class TestEtradeBroker(BaseTest):
         order_status = self.broker.get_order_status('order_id')
         self.assertEqual(order_status, {'status': 'completed'})
 
-    @patch('brokers.etrade_broker.requests.put')
-    @patch('brokers.etrade_broker.requests.post')
+    @patch('requests.Session.put')
+    @patch('requests.Session.post')
     def test_cancel_order(self, mock_post_connect, mock_put):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
@@ -96,17 +97,25 @@ class TestEtradeBroker(BaseTest):
         cancel_status = self.broker.cancel_order('order_id')
         self.assertEqual(cancel_status, {'status': 'cancelled'})
 
-    @patch('brokers.etrade_broker.requests.get')
-    @patch('brokers.etrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_options_chain(self, mock_post_connect, mock_get):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
-        mock_response.json.return_value = {'options': 'chain'}
+        mock_response.json.return_value = {'options': {'option': [
+            {'symbol': 'AAPL241220C00190000', 'strike': 190.0, 'option_type': 'call', 'bid': 5.0, 'ask': 5.2, 'open_interest': 1200, 'volume': 300, 'expiration_date': '2024-12-20'},
+            {'symbol': 'AAPL241220P00190000', 'strike': 190.0, 'option_type': 'put', 'bid': 4.1, 'ask': 4.3, 'open_interest': 800, 'volume': 150, 'expiration_date': '2024-12-20'},
+        ]}}
         mock_get.return_value = mock_response
 
         self.broker.connect()
         options_chain = self.broker.get_options_chain('AAPL', '2024-12-20')
-        self.assertEqual(options_chain, {'options': 'chain'})
+        self.assertIsInstance(options_chain, OptionsChain)
+        self.assertEqual(len(options_chain), 2)
+        self.assertEqual(options_chain.calls().symbol.tolist(), ['AAPL241220C00190000'])
+
+        # Served from the chain cache on the next call
+        self.assertIs(self.broker.get_options_chain('AAPL', '2024-12-20'), options_chain)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from backtest.engine import Backtest
+from brokers.simulated_broker import SimulatedBroker
+from data.bars import Bars
+from data.price_feed import RandomWalkPriceFeed
+from data.quote_book import QuoteBook
+from database.models import init_db
+from strategies.base_strategy import BaseStrategy
+from utils.event_bus import Event, EventBus
+
+
+class EventStrategy(BaseStrategy):
+    def __init__(self, broker, stock_allocations=None, starting_capital=1000, strategy_name='events'):
+        self.stock_allocations = stock_allocations
+        self.starting_capital = starting_capital
+        self.strategy_name = strategy_name
+        self.rebalance_interval_minutes = 1
+        self.events = []
+        super().__init__(broker)
+
+    def rebalance(self):
+        pass
+
+    def on_quote(self, event):
+        self.events.append(event)
+
+    def on_fill(self, event):
+        self.events.append(event)
+
+    def on_order_status(self, event):
+        self.events.append(event)
+
+
+class BarStrategy(EventStrategy):
+    def on_bar(self, event):
+        self.events.append(event)
+        # Buys on the first bar, between scheduled rebalances
+        if event.symbol == 'AAPL' and not self.broker.get_positions():
+            self.broker.place_order('AAPL', 10, 'buy', self.strategy_name)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus(queue_size=3)
+        self.addCleanup(self.bus.close)
+        self.release = threading.Event()
+        self.received = []
+
+    def blocked_handler(self, event):
+        self.release.wait(5)
+        self.received.append(event)
+
+    def subscribe(self, handlers, symbols=None, name='strategy'):
+        strategy = MagicMock(strategy_name=name)
+        return self.bus.subscribe(strategy, handlers, symbols=symbols)
+
+    def test_waiting_quotes_are_coalesced_to_the_latest(self):
+        subscription = self.subscribe({'quote': self.blocked_handler})
+        self.bus.publish(Event('quote', 'MSFT', {'last': 1}))
+        self.assertTrue(wait_for(lambda: subscription.pending() == 0))
+        for price in range(2, 7):
+            self.bus.publish(Event('quote', 'AAPL', {'last': price}))
+        self.bus.publish(Event('quote', 'GOOG', {'last': 9}))
+        self.assertEqual(subscription.pending(), 2)
+        self.release.set()
+
+        self.assertTrue(wait_for(lambda: len(self.received) == 3))
+        self.assertEqual([(event.symbol, event.data['last']) for event in self.received], [('MSFT', 1), ('AAPL', 6), ('GOOG', 9)])
+        self.assertEqual(subscription.stats['coalesced'], 4)
+
+    def test_full_queue_drops_market_data_but_keeps_fills(self):
+        subscription = self.subscribe({'quote': self.blocked_handler, 'bar': self.blocked_handler, 'fill': self.blocked_handler})
+        self.bus.publish(Event('fill', 'X', {'n': 0}))
+        self.assertTrue(wait_for(lambda: subscription.pending() == 0))
+        self.bus.publish(Event('bar', 'AAPL', {'n': 1}))
+        self.bus.publish(Event('quote', 'AAPL', {'n': 2}))
+        self.bus.publish(Event('fill', 'AAPL', {'n': 3}))
+        self.bus.publish(Event('fill', 'AAPL', {'n': 4}))
+        self.bus.publish(Event('fill', 'AAPL', {'n': 5}))
+        self.bus.publish(Event('bar', 'AAPL', {'n': 6}))
+        self.release.set()
+
+        self.assertTrue(wait_for(lambda: len(self.received) == 4))
+        self.assertEqual([event.data['n'] for event in self.received], [0, 3, 4, 5])
+        self.assertEqual(subscription.stats['dropped'], 3)
+
+    def test_filters_by_symbol_and_owning_strategy(self):
+        self.release.set()
+        self.subscribe({'quote': self.blocked_handler, 'fill': self.blocked_handler}, symbols=['AAPL'], name='mine')
+        self.assertTrue(self.bus.wants('quote'))
+        self.assertFalse(self.bus.wants('bar'))
+        self.bus.publish(Event('quote', 'MSFT', {}))
+        self.bus.publish(Event('fill', 'MSFT', {}, strategy='other'))
+        self.bus.publish(Event('quote', 'AAPL', {}))
+        self.bus.publish(Event('fill', 'MSFT', {}, strategy='mine'))
+
+        self.assertTrue(wait_for(lambda: len(self.received) == 2))
+        self.assertEqual([(event.type, event.symbol) for event in self.received], [('quote', 'AAPL'), ('fill', 'MSFT')])
+
+    def test_handler_errors_are_counted_and_dispatch_continues(self):
+        def handler(event):
+            if event.data.get('fail'):
+                raise RuntimeError('boom')
+            self.received.append(event)
+        subscription = self.subscribe({'fill': handler})
+        with patch('utils.event_bus.traceback.print_exc'):
+            self.bus.publish(Event('fill', 'AAPL', {'fail': True}))
+            self.bus.publish(Event('fill', 'AAPL', {}))
+            self.assertTrue(wait_for(lambda: len(self.received) == 1))
+        self.assertEqual(subscription.stats['errors'], 1)
+
+    def test_unsupported_event_type(self):
+        with self.assertRaises(ValueError):
+            self.subscribe({'trade': print})
+
+
+class TestBrokerEvents(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(engine)
+        self.broker = SimulatedBroker(engine=engine, price_feed=RandomWalkPriceFeed(start_prices={'AAPL': 100.0, 'MSFT': 200.0}, volatility=0.0, spread=0.0))
+        self.addCleanup(self.broker.event_bus.close)
+        self.addCleanup(self.broker.ledger.close)
+
+    def test_strategies_without_hooks_are_not_subscribed(self):
+        class Plain(EventStrategy):
+            on_quote = BaseStrategy.on_quote
+            on_fill = BaseStrategy.on_fill
+            on_order_status = BaseStrategy.on_order_status
+        Plain(self.broker)
+        self.assertEqual(self.broker.event_bus.stats(), {})
+
+    def test_fills_order_status_and_quotes_reach_the_strategy(self):
+        strategy = EventStrategy(self.broker, stock_allocations={'AAPL': 1.0})
+        other = EventStrategy(self.broker, stock_allocations={'MSFT': 1.0}, strategy_name='other')
+        self.broker.place_order('AAPL', 5, 'buy', 'events')
+        self.broker.place_order('AAPL', 5, 'buy', 'events', price=90.0)
+        self.broker.get_quotes(['AAPL', 'MSFT'])
+        self.assertTrue(wait_for(lambda: len(strategy.events) == 2 and len(other.events) == 1))
+
+        fill, quote = strategy.events
+        self.assertEqual((fill.type, fill.symbol, fill.data['quantity'], fill.data['price']), ('fill', 'AAPL', 5, 100.0))
+        self.assertEqual((quote.type, quote.symbol, quote.data['last']), ('quote', 'AAPL', 100.0))
+        self.assertEqual(other.events[0].symbol, 'MSFT')
+
+        order_id = self.broker.matching_engine.open_orders()[0]['order_id']
+        self.broker.cancel_order(order_id)
+        self.assertTrue(wait_for(lambda: len(strategy.events) == 3))
+        self.assertEqual((strategy.events[-1].type, strategy.events[-1].data['status']), ('order_status', 'canceled'))
+        self.assertEqual(other.events[-1].type, 'quote')
+
+    def test_async_orders_publish_order_status_to_their_owner(self):
+        strategy = EventStrategy(self.broker, stock_allocations={'AAPL': 1.0})
+        other = EventStrategy(self.broker, stock_allocations={'MSFT': 1.0}, strategy_name='other')
+
+        async def place_poll_and_cancel():
+            response = await self.broker.place_order_async('AAPL', 5, 'buy', 'events', price=90.0)
+            await self.broker.get_order_status_async(response['order_id'])
+            await self.broker.cancel_order_async(response['order_id'])
+        asyncio.run(place_poll_and_cancel())
+
+        self.assertTrue(wait_for(lambda: len(strategy.events) == 2))
+        self.assertEqual([(event.type, event.data['status']) for event in strategy.events], [('order_status', 'open'), ('order_status', 'canceled')])
+        self.assertEqual(other.events, [])
+        self.assertEqual(self.broker._order_owners, {})
+
+    def test_streamed_quotes_are_published(self):
+        strategy = EventStrategy(self.broker)
+        book = QuoteBook()
+        book.add_listener(self.broker.publish_quote)
+        book.update('AAPL', last=101.0, bid=100.9, ask=101.1)
+        self.assertTrue(wait_for(lambda: len(strategy.events) == 1))
+        self.assertEqual(strategy.events[0].data['last'], 101.0)
+
+
+class TestBacktestBars(unittest.TestCase):
+    def test_on_bar_sees_every_bar_and_can_trade(self):
+        timestamps = np.datetime64('2024-01-02T14:30') + np.arange(10).astype('timedelta64[m]')
+        bars = Bars(timestamps, ['AAPL', 'MSFT'], np.column_stack([np.linspace(100, 109, 10), np.full(10, 50.0)]))
+        created = []
+
+        def factory(broker, config):
+            created.append(BarStrategy(broker, stock_allocations={'AAPL': 1.0}))
+            return created[-1]
+        with patch.dict('utils.config.STRATEGY_MAP', {'bars': factory}):
+            result = Backtest(bars, {'type': 'bars'}, starting_cash=10000).run()
+
+        strategy = created[0]
+        bar_events = [event for event in strategy.events if event.type == 'bar']
+        self.assertEqual([event.data['close'] for event in bar_events], np.linspace(100, 109, 10).tolist())
+        self.assertEqual([event.type for event in strategy.events[:3]], ['bar', 'fill', 'bar'])
+        self.assertEqual(result.trades, 1)
+        self.assertAlmostEqual(result.equity[-1], 10000 + 10 * 9.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import weakref
+from requests import Response
+from requests.adapters import BaseAdapter
+from utils import http_cassette
+from utils.http_cassette import Cassette, CassetteAdapter, CassetteMiss
+from utils.http_session import create_http_session
+from brokers.etrade_broker import EtradeBroker
+from brokers.tradier_broker import TradierBroker
+from .base_test import BaseTest
+
+QUOTES = {'quotes': {'quote': [{'symbol': 'AAPL', 'last': 150.0, 'bid': 149.9, 'ask': 150.1}]}}
+
+
+class FakeAdapter(BaseAdapter):
+    def __init__(self, payload):
+        super().__init__()
+        self.payload = payload
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        response = Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json'
+        response.headers['Set-Cookie'] = 'session=secret'
+        response._content = json.dumps(self.payload).encode('utf-8')
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, path, urls):
+        cassette = Cassette(path, 'record')
+        session = create_http_session()
+        session.mount('https://', CassetteAdapter(cassette, FakeAdapter(QUOTES)))
+        for url in urls:
+            session.get(url, headers={'Authorization': 'Bearer token'})
+        cassette.close()
+
+    def test_cassette_left_open_is_closed_at_exit(self):
+        path = os.path.join(self.directory, 'session.jsonl.gz')
+        cassette = Cassette(path, 'record')
+        session = create_http_session()
+        session.mount('https://', CassetteAdapter(cassette, FakeAdapter(QUOTES)))
+        session.get('https://api.example.com/quotes?symbols=AAPL')
+
+        http_cassette._close_at_exit(weakref.ref(cassette))
+        # Requests still in flight after the close are dropped, not failed
+        session.get('https://api.example.com/quotes?symbols=AAPL')
+        self.assertEqual(Cassette(path, 'replay').remaining(), 1)
+
+    def test_record_then_replay(self):
+        path = os.path.join(self.directory, 'session.jsonl.gz')
+        self.record(path, ['https://api.example.com/quotes?symbols=AAPL'])
+
+        delays = []
+        cassette = Cassette(path, 'replay', speed=2.0, sleep=delays.append)
+        session = create_http_session(cassette=cassette)
+        response = session.get('https://api.example.com/quotes?symbols=AAPL')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), QUOTES)
+        self.assertEqual(response.headers['Content-Type'], 'application/json')
+        self.assertNotIn('Set-Cookie', response.headers)
+        self.assertEqual(len(delays), 1)
+        self.assertEqual(cassette.remaining(), 0)
+
+    def test_no_secrets_written(self):
+        path = os.path.join(self.directory, 'session.jsonl')
+        self.record(path, ['https://api.example.com/quotes'])
+        with open(path) as file:
+            contents = file.read()
+        self.assertNotIn('Bearer token', contents)
+        self.assertNotIn('session=secret', contents)
+
+    def test_unrecorded_request_raises(self):
+        path = os.path.join(self.directory, 'session.jsonl')
+        self.record(path, ['https://api.example.com/quotes'])
+        session = create_http_session(cassette=Cassette(path, 'replay', speed=0))
+        session.get('https://api.example.com/quotes')
+        with self.assertRaises(CassetteMiss):
+            session.get('https://api.example.com/quotes')
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(Cassette.from_config(None))
+        with self.assertRaises(ValueError):
+            Cassette.from_config({'mode': 'rewind', 'path': 'x'})
+
+
+class TestBrokerReplay(BaseTest):
+    def test_broker_replays_recorded_session(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'tradier.jsonl')
+            recorder = TradierBroker('api_key', None, engine=self.engine, cassette_config={'mode': 'record', 'path': path})
+            recorder.http.get_adapter('https://api.tradier.com').adapter = FakeAdapter(QUOTES)
+            self.assertEqual(recorder.get_current_price('AAPL'), 150.0)
+            recorder.cassette.close()
+
+            broker = TradierBroker('api_key', None, engine=self.engine, cassette_config={'mode': 'replay', 'path': path, 'speed': 0})
+            self.assertEqual(broker.get_quote('AAPL'), {'last': 150.0, 'bid': 149.9, 'ask': 150.1})
+        finally:
+            shutil.rmtree(directory)
+
+    def test_login_credentials_and_tokens_are_redacted(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'etrade.jsonl')
+        recorder = EtradeBroker('my-api-key', 'my-secret-key', engine=self.engine, cassette_config={'mode': 'record', 'path': path})
+        recorder.http.get_adapter('https://api.etrade.com').adapter = FakeAdapter({'access_token': 'my-access-token', 'expires_in': 3600})
+        recorder.connect()
+        self.assertEqual(recorder.auth, 'my-access-token')
+        recorder.cassette.close()
+
+        with open(path) as file:
+            contents = file.read()
+        for secret in ('my-api-key', 'my-secret-key', 'my-access-token'):
+            self.assertNotIn(secret, contents)
+        self.assertIn('expires_in', contents)
+
+        # Replay matches the live request after the same redaction
+        broker = EtradeBroker('other-key', 'other-secret', engine=self.engine, cassette_config={'mode': 'replay', 'path': path, 'speed': 0})
+        broker.connect()
+        self.assertEqual(broker.auth, '<redacted>')
+
+
+if __name__ == '__main__':
+    unittest.main()
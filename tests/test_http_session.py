@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from utils.http_session import create_http_session, TimeoutHTTPAdapter
+from brokers.tradier_broker import TradierBroker
+from .base_test import BaseTest
+
+class TestHttpSession(unittest.TestCase):
+
+    def test_adapter_configuration(self):
+        session = create_http_session({'pool_size': 25, 'timeout': 3, 'max_retries': 5})
+        adapter = session.get_adapter('https://api.tradier.com')
+        self.assertIsInstance(adapter, TimeoutHTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 25)
+        self.assertEqual(adapter.timeout, 3)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertNotIn('POST', adapter.max_retries.allowed_methods)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_default_timeout_applied(self, mock_send):
+        adapter = create_http_session({'timeout': 7}).get_adapter('https://api.tradier.com')
+        request = MagicMock()
+        adapter.send(request)
+        self.assertEqual(mock_send.call_args.kwargs['timeout'], 7)
+
+        adapter.send(request, timeout=1)
+        self.assertEqual(mock_send.call_args.kwargs['timeout'], 1)
+
+class TestBrokerTransport(BaseTest):
+
+    def test_broker_owns_pooled_session(self):
+        broker = TradierBroker('api_key', 'secret_key', engine=self.engine, http_config={'pool_size': 4})
+        other = TradierBroker('api_key', 'secret_key', engine=self.engine)
+        self.assertIsNot(broker.http, other.http)
+        self.assertEqual(broker.http.get_adapter('https://api.tradier.com')._pool_maxsize, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.ledger import Ledger
+from database.models import Balance, Position, Trade, init_db
+
+
+class TestLedger(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.ledger = Ledger(self.Session, 'Simulated', flush_interval=0)
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.ledger.close)
+
+    def positions(self):
+        with self.Session() as session:
+            return {(position.strategy, position.symbol): position.quantity for position in session.query(Position)}
+
+    def test_hydrates_from_existing_rows(self):
+        with self.Session() as session:
+            balance = Balance(strategy='s1', broker='Simulated', total_balance=5000)
+            session.add(balance)
+            session.flush()
+            session.add(Position(strategy='s1', broker='Simulated', symbol='AAPL', quantity=3, latest_price=100, balance_id=balance.id, last_updated=datetime.now()))
+            session.add(Position(strategy='s1', broker='Other', symbol='MSFT', quantity=7, latest_price=200, last_updated=datetime.now()))
+            session.commit()
+
+        self.assertEqual(self.ledger.get_balance('s1'), 5000)
+        self.assertEqual(self.ledger.ensure_balance('s1', 1000), 5000)
+        self.assertEqual(self.ledger.get_positions('s1'), {'AAPL': 3})
+        self.assertEqual(self.ledger.get_position('s1', 'MSFT'), 0)
+
+    def test_fills_are_written_behind_in_one_commit(self):
+        self.ledger.ensure_balance('s1', 1000)
+        commits = []
+        event.listen(self.engine, 'commit', lambda conn: commits.append(conn))
+        for symbol in ('AAPL', 'MSFT', 'AAPL'):
+            self.ledger.apply_fill('s1', symbol, 'buy', 2, 100.0, datetime.now())
+        self.ledger.apply_fill('s1', 'AAPL', 'sell', 1, 101.0, datetime.now())
+        self.assertEqual(self.positions(), {})
+        self.assertEqual(commits, [])
+
+        self.assertEqual(self.ledger.flush(), 2)
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(self.positions(), {('s1', 'AAPL'): 3, ('s1', 'MSFT'): 2})
+        self.assertEqual(self.ledger.flush(), 0)
+
+        self.ledger.apply_fill('s1', 'MSFT', 'sell', 2, 99.0, datetime.now())
+        self.ledger.close()
+        self.assertEqual(self.positions(), {('s1', 'AAPL'): 3, ('s1', 'MSFT'): 0})
+        self.assertEqual(self.ledger.get_positions('s1'), {'AAPL': 3})
+
+    def test_oversell_is_rejected(self):
+        self.ledger.apply_fill('s1', 'AAPL', 'buy', 1, 100.0, datetime.now())
+        with self.assertRaises(ValueError):
+            self.ledger.apply_fill('s1', 'AAPL', 'sell', 2, 100.0, datetime.now())
+        self.assertEqual(self.ledger.get_position('s1', 'AAPL'), 1)
+
+    def test_fill_without_price_keeps_latest_price(self):
+        self.ledger.apply_fill('s1', 'AAPL', 'buy', 4, 100.0, datetime.now())
+        self.ledger.apply_fill('s1', 'AAPL', 'sell', 1, None, datetime.now())
+        self.ledger.flush()
+        with self.Session() as session:
+            self.assertEqual(session.query(Position).filter_by(strategy='s1', symbol='AAPL').one().latest_price, 100.0)
+
+    def test_failed_flush_is_retried(self):
+        self.ledger.apply_fill('s1', 'AAPL', 'buy', 4, 100.0, datetime.now())
+        with patch.object(self.ledger, 'Session', side_effect=RuntimeError('database is locked')):
+            with self.assertRaises(RuntimeError):
+                self.ledger.flush()
+        self.assertEqual(self.ledger.flush(), 1)
+        self.assertEqual(self.positions(), {('s1', 'AAPL'): 4})
+
+
+    def test_unwritable_trade_is_set_aside_after_retries(self):
+        ledger = Ledger(self.Session, 'Simulated', flush_interval=0, max_retries=2)
+        self.addCleanup(ledger.close)
+        def trade(symbol):
+            values = {'symbol': symbol, 'quantity': 1, 'price': 100.0, 'executed_price': 100.0, 'order_type': 'buy', 'status': 'filled', 'timestamp': datetime.now(), 'broker': 'Simulated', 'strategy': 's1'}
+            return Trade(**values), values
+        ledger.apply_fill('s1', 'AAPL', 'buy', 1, 100.0, datetime.now())
+        written = []
+        ledger.trades_written = written.extend
+
+        # The symbol-less trade fails the whole batch until the retries run out
+        with patch('builtins.print'):
+            for _ in range(2):
+                with self.assertRaises(IntegrityError):
+                    ledger.flush(trades=[trade(None), trade('AAPL')] if not ledger.pending_trades() else ())
+            self.assertEqual(self.positions(), {})
+            self.assertEqual(ledger.flush(), 1)
+
+        self.assertEqual(self.positions(), {('s1', 'AAPL'): 1})
+        self.assertEqual([trade.symbol for trade in written], ['AAPL'])
+        self.assertEqual(ledger.pending_trades(), 0)
+        self.assertEqual([(letter['kind'], letter['row']['symbol']) for letter in ledger.dead_letters], [('trade', None)])
+        # Later flushes are batched again
+        self.assertEqual(ledger.failures, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import time
+import unittest
+from unittest.mock import patch
+from brokers.tradier_broker import TradierBroker
+from data.quote_book import QuoteBook
+from data.stream_server import LocalStreamServer
+from .base_test import BaseTest
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+class TestQuoteBook(unittest.TestCase):
+
+    def test_only_complete_fresh_entries_are_served(self):
+        now = [100.0]
+        book = QuoteBook(clock=lambda: now[0])
+        book.update('AAPL', bid=189.9, ask=190.1)
+        self.assertEqual(book.get_fresh_many(['AAPL'], max_age=2), {})
+        book.update('AAPL', last=190.0)
+        self.assertEqual(book.get_fresh_many(['AAPL'], max_age=2), {'AAPL': {'last': 190.0, 'bid': 189.9, 'ask': 190.1}})
+        now[0] = 103.0
+        self.assertEqual(book.get_fresh_many(['AAPL'], max_age=2), {})
+
+class TestTradierMarketStream(BaseTest):
+
+    def setUp(self):
+        super().setUp()
+        self.server = LocalStreamServer(interval=0.01, seed=1).start()
+        self.broker = TradierBroker('api_key', 'secret_key', engine=self.engine, stream_config={'base_url': self.server.base_url, 'max_age': 5})
+
+    def tearDown(self):
+        self.broker.stop_stream()
+        self.server.stop()
+        super().tearDown()
+
+    def test_prices_served_from_stream(self):
+        stream = self.broker.start_stream(['AAPL', 'MSFT'])
+        self.assertTrue(wait_for(lambda: len(self.broker.quote_book.get_fresh_many(['AAPL', 'MSFT'], 5)) == 2))
+        self.assertTrue(stream.is_running())
+
+        with patch.object(self.broker, '_get_quotes') as mock_get_quotes:
+            prices = self.broker.get_current_prices(['AAPL', 'MSFT'])
+            mock_get_quotes.assert_not_called()
+        self.assertEqual(set(prices), {'AAPL', 'MSFT'})
+        self.assertGreater(prices['AAPL'], 0)
+
+    def test_stale_book_falls_back_to_rest(self):
+        self.broker.start_stream(['AAPL'])
+        self.assertTrue(wait_for(lambda: self.broker.quote_book.get('AAPL') is not None))
+        self.broker.stop_stream()
+
+        with patch.object(self.broker, '_get_quotes', return_value={'GOOG': {'last': 170.0}}) as mock_get_quotes:
+            self.assertEqual(self.broker.get_current_price('GOOG'), 170.0)
+            mock_get_quotes.assert_called_once_with(['GOOG'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from data.options_chain import OptionsChain
+
+def make_records():
+    records = []
+    for expiration in ['2024-12-20', '2024-11-15']:
+        for strike in [200.0, 180.0, 190.0]:
+            for option_type in ['call', 'put']:
+                delta = (0.5 - (strike - 190.0) / 40) * (1 if option_type == 'call' else -1)
+                records.append({
+                    'symbol': f"AAPL{expiration}{option_type[0].upper()}{int(strike)}",
+                    'strike': strike,
+                    'option_type': option_type,
+                    'bid': 5.0,
+                    'ask': 5.0 + strike / 1000,
+                    'open_interest': strike * 10,
+                    'volume': 100,
+                    'expiration_date': expiration,
+                    'greeks': {'delta': delta},
+                })
+    return records
+
+class TestOptionsChain(unittest.TestCase):
+
+    def setUp(self):
+        self.chain = OptionsChain.from_response('AAPL', {'options': {'option': make_records()}})
+
+    def test_columns_sorted_by_expiration_then_strike(self):
+        self.assertEqual(len(self.chain), 12)
+        self.assertEqual(self.chain.expiration[0], np.datetime64('2024-11-15'))
+        self.assertTrue(np.all(np.diff(self.chain.strike[:6]) >= 0))
+        self.assertEqual(self.chain.expirations().tolist(), [np.datetime64('2024-11-15'), np.datetime64('2024-12-20')])
+
+    def test_lookups(self):
+        december = self.chain.for_expiration('2024-12-20')
+        self.assertEqual(len(december), 6)
+        self.assertEqual(len(december.by_strike(190.0, 'put')), 1)
+
+        index = december.nearest_strike(187.0, 'call')
+        self.assertEqual(december.strike[index], 190.0)
+        index = december.nearest_delta(0.25, 'call')
+        self.assertEqual(december.row(index)['strike'], 200.0)
+
+    def test_vectorized_filters(self):
+        liquid_calls = self.chain.calls().where(min_open_interest=1900, max_spread=0.21)
+        self.assertEqual(sorted(liquid_calls.strike.tolist()), [190.0, 190.0, 200.0, 200.0])
+        self.assertTrue(np.allclose(self.chain.mid, self.chain.bid + self.chain.spread / 2))
+
+    def test_singular_and_empty_responses(self):
+        single = OptionsChain.from_response('AAPL', {'options': {'option': make_records()[0]}})
+        self.assertEqual(len(single), 1)
+        self.assertEqual(len(OptionsChain.from_response('AAPL', {'options': None})), 0)
+
+if __name__ == '__main__':
+    unittest.main()
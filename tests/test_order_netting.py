@@ -0,0 +1,122 @@
+import threading
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.models import Trade, Position, init_db
+from data.price_feed import RandomWalkPriceFeed
+from brokers.simulated_broker import SimulatedBroker
+from brokers.order_netting import allocate
+
+
+class TestAllocate(unittest.TestCase):
+    def test_pro_rata_with_largest_remainder(self):
+        self.assertEqual(allocate(10, [1, 1, 1]), [4, 3, 3])
+        self.assertEqual(allocate(7, [10, 4]), [5, 2])
+        self.assertEqual(allocate(0, [3, 4]), [0, 0])
+        self.assertEqual(sum(allocate(101, [13, 29, 58])), 101)
+
+
+class TestOrderNetting(unittest.TestCase):
+    def setUp(self):
+        # Netting records trades from its own thread, so every thread must share one in-memory DB
+        self.engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        feed = RandomWalkPriceFeed(start_prices={'AAPL': 100.0, 'MSFT': 200.0}, volatility=0.0, spread=0.002)
+        self.broker = SimulatedBroker(engine=self.engine, price_feed=feed, netting_config={'enabled': True, 'window': 0.05})
+
+    def tearDown(self):
+        self.broker.ledger.close()
+        self.session.close()
+        self.engine.dispose()
+
+    def place_concurrently(self, batches):
+        results = {}
+        def run(strategy, orders):
+            results[strategy] = self.broker.place_orders(orders, strategy)
+        threads = [threading.Thread(target=run, args=item) for item in batches.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def position(self, strategy, symbol):
+        self.broker.ledger.flush()
+        position = self.session.query(Position).filter_by(strategy=strategy, symbol=symbol).first()
+        return position.quantity if position else 0
+
+    def test_opposite_orders_are_netted(self):
+        # Give strategy_b something to sell
+        self.broker.place_orders([('AAPL', 10, 'buy')], 'strategy_b')
+        engine_position = self.broker.matching_engine.positions['AAPL']
+
+        results = self.place_concurrently({
+            'strategy_a': [('AAPL', 10, 'buy'), ('MSFT', 2, 'buy')],
+            'strategy_b': [('AAPL', 4, 'sell')],
+        })
+
+        # Only the residual 6 AAPL reached the exchange
+        self.assertEqual(self.broker.matching_engine.positions['AAPL'] - engine_position, 6)
+        self.assertEqual(self.broker.matching_engine.positions['MSFT'], 2)
+        aapl_buy = results['strategy_a'][0]
+        self.assertEqual(aapl_buy['netted_quantity'], 4)
+        self.assertEqual(aapl_buy['filled_quantity'], 10)
+        self.assertEqual(results['strategy_b'][0]['netted_quantity'], 4)
+        self.assertIsNone(results['strategy_b'][0]['order_id'])
+
+        self.assertEqual(self.position('strategy_a', 'AAPL'), 10)
+        self.assertEqual(self.position('strategy_a', 'MSFT'), 2)
+        self.assertEqual(self.position('strategy_b', 'AAPL'), 6)
+
+    def test_residual_fill_split_across_strategies(self):
+        results = self.place_concurrently({
+            'strategy_a': [('AAPL', 3, 'buy')],
+            'strategy_b': [('AAPL', 1, 'buy')],
+        })
+        self.assertEqual(self.broker.matching_engine.positions['AAPL'], 4)
+        self.assertEqual(results['strategy_a'][0]['filled_quantity'], 3)
+        self.assertEqual(results['strategy_b'][0]['filled_quantity'], 1)
+        self.assertEqual(results['strategy_a'][0]['order_id'], results['strategy_b'][0]['order_id'])
+        self.assertEqual(self.session.query(Trade).count(), 2)
+
+    def test_resting_residual_fills_are_attributed_to_its_strategies(self):
+        self.broker.matching_engine.liquidity_per_tick = 2
+        # Submit the residual as a marketable limit order, so what does not fill now rests
+        place = self.broker._place_order
+        self.broker._place_order = lambda symbol, quantity, side, price=None: place(symbol, quantity, side, 101.0)
+
+        results = self.place_concurrently({
+            'strategy_a': [('AAPL', 3, 'buy')],
+            'strategy_b': [('AAPL', 3, 'buy')],
+        })
+        self.assertEqual(results['strategy_a'][0]['filled_quantity'] + results['strategy_b'][0]['filled_quantity'], 2)
+
+        self.broker.step()
+        self.broker.step()
+        self.assertEqual(self.position('strategy_a', 'AAPL'), 3)
+        self.assertEqual(self.position('strategy_b', 'AAPL'), 3)
+        self.assertEqual(self.session.query(Trade).filter(Trade.price.is_(None)).count(), 0)
+
+    def test_orders_are_not_crossed_without_a_price(self):
+        self.broker.place_orders([('AAPL', 10, 'buy')], 'strategy_b')
+        engine_position = self.broker.matching_engine.positions['AAPL']
+        self.broker.get_current_price = lambda symbol: None
+
+        results = self.place_concurrently({
+            'strategy_a': [('AAPL', 10, 'buy')],
+            'strategy_b': [('AAPL', 4, 'sell')],
+        })
+
+        # Both sides went to the exchange gross
+        self.assertEqual(results['strategy_a'][0]['netted_quantity'], 0)
+        self.assertEqual(results['strategy_b'][0]['filled_quantity'], 4)
+        self.assertEqual(self.broker.matching_engine.positions['AAPL'] - engine_position, 6)
+        self.assertEqual(self.session.query(Trade).filter(Trade.price.is_(None)).count(), 0)
+        self.assertEqual(self.position('strategy_a', 'AAPL'), 10)
+        self.assertEqual(self.position('strategy_b', 'AAPL'), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
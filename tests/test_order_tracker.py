@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import MagicMock
+from brokers.order_tracker import OrderTracker
+
+class TestOrderTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.statuses = {}
+        self.cancel_fn = MagicMock()
+        self.tracker = OrderTracker(lambda order_id: self.statuses[order_id], self.cancel_fn, poll_interval=0.01)
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def test_resolves_when_filled(self):
+        self.statuses[1] = 'open'
+        callback = MagicMock()
+        future = self.tracker.track(1, timeout=5, callback=callback)
+        self.statuses[1] = 'filled'
+        result = future.result(timeout=1)
+        self.assertEqual(result, {'order_id': 1, 'status': 'filled', 'timed_out': False})
+        callback.assert_called_once_with(result)
+        self.cancel_fn.assert_not_called()
+
+    def test_cancels_on_timeout(self):
+        self.statuses[2] = 'open'
+        future = self.tracker.track(2, timeout=0.05)
+        result = future.result(timeout=1)
+        self.assertTrue(result['timed_out'])
+        self.cancel_fn.assert_called_once_with(2)
+        self.assertEqual(self.tracker.pending(), [])
+
+    def test_many_orders_in_flight(self):
+        for order_id in range(20):
+            self.statuses[order_id] = 'open'
+        futures = [self.tracker.track(order_id, timeout=5) for order_id in range(20)]
+        self.assertEqual(len(self.tracker.pending()), 20)
+        for order_id in range(20):
+            self.statuses[order_id] = 'filled'
+        self.assertTrue(all(f.result(timeout=1)['status'] == 'filled' for f in futures))
+
+    def test_poll_errors_fail_the_future_at_the_deadline(self):
+        future = self.tracker.track('missing', timeout=0.05)
+        with self.assertRaises(KeyError):
+            future.result(timeout=1)
+        self.cancel_fn.assert_called_once_with('missing')
+        self.assertEqual(self.tracker.pending(), [])
+
+    def test_transient_poll_errors_keep_tracking(self):
+        failures = iter([ConnectionError('reset'), ConnectionError('reset')])
+        def poll(order_id):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            return 'filled'
+        tracker = OrderTracker(poll, self.cancel_fn, poll_interval=0.01)
+        try:
+            result = tracker.track(3, timeout=5).result(timeout=1)
+        finally:
+            tracker.stop()
+        self.assertEqual(result['status'], 'filled')
+        self.cancel_fn.assert_not_called()
+
+    def test_untimed_order_fails_after_repeated_poll_errors(self):
+        tracker = OrderTracker(lambda order_id: self.statuses[order_id], self.cancel_fn, poll_interval=0.01, max_poll_failures=3)
+        try:
+            with self.assertRaises(KeyError):
+                tracker.track('missing').result(timeout=1)
+        finally:
+            tracker.stop()
+        self.cancel_fn.assert_called_once_with('missing')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from brokers.tradier_broker import TradierBroker
+from utils.config import BROKER_MAP, STRATEGY_MAP, load_strategy_class, register_plugins
+from utils.plugins import PluginRegistry, load_reference
+
+PLUGIN_MODULE = '''
+LOADS = []
+
+def make_broker(config, engine):
+    return ('plugin broker', config['api_key'])
+'''
+
+STRATEGY_SOURCE = '''
+class CachedStrategy:
+    VERSION = {version}
+'''
+
+
+class TestPluginRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.module_name = f"soad_test_plugin_{id(self)}"
+        with open(os.path.join(self.directory, f"{self.module_name}.py"), 'w') as file:
+            file.write(PLUGIN_MODULE)
+        self.addCleanup(sys.modules.pop, self.module_name, None)
+        self.addCleanup(lambda: sys.path.remove(self.directory) if self.directory in sys.path else None)
+
+    def test_references_are_imported_on_first_lookup(self):
+        sys.path.insert(0, self.directory)
+        registry = PluginRegistry('soad.test', {'plugin': f"{self.module_name}:make_broker"})
+        self.assertNotIn(self.module_name, sys.modules)
+        self.assertIn('plugin', registry)
+
+        factory = registry['plugin']
+        self.assertIn(self.module_name, sys.modules)
+        self.assertEqual(factory({'api_key': 'key'}, None), ('plugin broker', 'key'))
+        self.assertIs(registry['plugin'], factory)
+
+    def test_unknown_names_fall_back_to_entry_points(self):
+        factory = MagicMock()
+        entry_point = MagicMock()
+        entry_point.load.return_value = factory
+        registry = PluginRegistry('soad.test')
+        with patch('utils.plugins.entry_points', return_value={'external': entry_point}):
+            self.assertIn('external', registry)
+            self.assertIs(registry['external'], factory)
+            self.assertNotIn('missing', registry)
+            with self.assertRaises(KeyError):
+                registry['missing']
+        entry_point.load.assert_called_once_with()
+
+    def test_config_plugins_section(self):
+        with patch.dict(BROKER_MAP):
+            register_plugins({'plugins': {'paths': [self.directory], 'brokers': {'mine': f"{self.module_name}:make_broker"}}})
+            self.assertEqual(BROKER_MAP['mine']({'api_key': 'abc'}, None), ('plugin broker', 'abc'))
+        self.assertNotIn('mine', dict(BROKER_MAP))
+
+    def test_load_reference_follows_attribute_paths(self):
+        self.assertIs(load_reference('brokers.tradier_broker:TradierBroker'), TradierBroker)
+        self.assertEqual(load_reference('brokers.tradier_broker:TradierBroker.from_config'), TradierBroker.from_config)
+
+    def test_builtin_factories(self):
+        broker = BROKER_MAP['tradier']({'api_key': 'token', 'secret_key': 'ignored'}, create_engine('sqlite://'))
+        self.assertIsInstance(broker, TradierBroker)
+        self.assertIsNone(broker.secret_key)
+        self.assertIn('constant_percentage', STRATEGY_MAP)
+        self.assertIn('custom', STRATEGY_MAP)
+
+
+class TestCustomStrategyCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'cached_strategy.py')
+
+    def write(self, version):
+        with open(self.path, 'w') as file:
+            file.write(STRATEGY_SOURCE.format(version=version))
+
+    def test_class_is_reused_until_the_file_changes(self):
+        self.write(1)
+        first = load_strategy_class(self.path, 'CachedStrategy')
+        self.assertIs(load_strategy_class(self.path, 'CachedStrategy'), first)
+
+        self.write(2)
+        second = load_strategy_class(self.path, 'CachedStrategy')
+        self.assertIsNot(second, first)
+        self.assertEqual(second.VERSION, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from utils.quote_cache import QuoteCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestQuoteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = QuoteCache(ttl=5, max_size=2, clock=self.clock)
+
+    def test_hit_and_miss_counters(self):
+        self.assertIsNone(self.cache.get('AAPL'))
+        self.cache.put('AAPL', {'last': 190.0})
+        self.assertEqual(self.cache.get('AAPL'), {'last': 190.0})
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1})
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.put('AAPL', {'last': 190.0})
+        self.clock.now = 5.5
+        self.assertIsNone(self.cache.get('AAPL'))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put_many({'AAPL': {'last': 1}, 'MSFT': {'last': 2}})
+        self.cache.get('AAPL')
+        self.cache.put('GOOG', {'last': 3})
+        self.assertEqual(set(self.cache.get_many(['AAPL', 'MSFT', 'GOOG'])), {'AAPL', 'GOOG'})
+        self.assertEqual(self.cache.evictions, 1)
+
+if __name__ == '__main__':
+    unittest.main()
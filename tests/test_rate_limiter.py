@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from utils.rate_limiter import RateLimiter
+from utils.http_session import create_http_session
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_unlimited_records_metrics(self):
+        limiter = RateLimiter()
+        self.assertEqual(limiter.acquire('quote'), limiter.stats()['quote']['total_wait'])
+        self.assertEqual(limiter.stats()['quote']['requests'], 1)
+        self.assertEqual(limiter.stats()['quote']['throttled'], 0)
+
+    def test_queues_instead_of_failing(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=1)  # one token per 10ms
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire('quote')
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+        self.assertGreaterEqual(limiter.stats()['quote']['throttled'], 3)
+
+    def test_orders_served_before_queued_quotes(self):
+        limiter = RateLimiter(requests_per_minute=600, burst=1)  # one token per 100ms
+        limiter.acquire('quote')  # drain the bucket
+        granted = []
+        lock = threading.Lock()
+
+        def request(priority):
+            limiter.acquire(priority)
+            with lock:
+                granted.append(priority)
+
+        threads = [threading.Thread(target=request, args=('quote',)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while limiter.queued() < 3:
+            time.sleep(0.001)
+        threads.append(threading.Thread(target=request, args=('chain',)))
+        threads.append(threading.Thread(target=request, args=('order',)))
+        threads[-2].start()
+        threads[-1].start()
+        while limiter.queued() < 5:
+            time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(granted, ['order', 'quote', 'quote', 'quote', 'chain'])
+        self.assertEqual(limiter.stats()['order']['throttled'], 1)
+
+    def test_session_takes_tokens_by_priority(self):
+        limiter = MagicMock()
+        session = create_http_session(rate_limiter=limiter)
+        with patch('requests.Session.request') as mock_request:
+            session.request('POST', 'https://api.tradier.com/v1/accounts/1/orders')
+            session.request('GET', 'https://api.tradier.com/v1/markets/quotes', priority='quote')
+            session.request('GET', 'https://api.tradier.com/v1/accounts/1/orders/1')
+        self.assertEqual([c.args[0] for c in limiter.acquire.call_args_list], ['order', 'quote', 'status'])
+        self.assertNotIn('priority', mock_request.call_args.kwargs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import time
+import unittest
+import numpy as np
+from strategies.rebalance_planner import plan_rebalance, deltas_to_orders
+
+
+class TestRebalancePlanner(unittest.TestCase):
+    def test_plan_rebalance(self):
+        deltas = plan_rebalance([0.5, 0.3, 0.2], [100.0, 30.0, 7.0], [10, 200, 0], 8000)
+        # Targets: 40, 80, 228
+        np.testing.assert_array_equal(deltas, [30, -120, 228])
+        self.assertEqual(deltas.dtype, np.int64)
+
+    def test_unpriced_symbols_are_left_alone(self):
+        deltas = plan_rebalance([0.5, 0.5], [np.nan, 0.0], [3, 4], 1000)
+        np.testing.assert_array_equal(deltas, [0, 0])
+
+    def test_drift_band(self):
+        # Targets: 40, 80, 228 as above; positions drift by 2, 5 and 20 shares
+        allocations, prices, positions = [0.5, 0.3, 0.2], [100.0, 30.0, 7.0], [38, 85, 208]
+        np.testing.assert_array_equal(plan_rebalance(allocations, prices, positions, 8000, drift_shares=5), [0, 0, 20])
+        # 6% of target: 2.4, 4.8 and 13.68 shares
+        np.testing.assert_array_equal(plan_rebalance(allocations, prices, positions, 8000, drift_percent=6), [0, -5, 20])
+        # $150 of drift: 200, 150 and 140 dollars
+        np.testing.assert_array_equal(plan_rebalance(allocations, prices, positions, 8000, drift_dollars=150), [2, 0, 0])
+
+    def test_min_notional(self):
+        deltas = plan_rebalance([0.5, 0.5], [100.0, 10.0], [38, 398], 8000, min_notional=100)
+        np.testing.assert_array_equal(deltas, [2, 0])
+
+    def test_deltas_to_orders(self):
+        orders = deltas_to_orders(['AAPL', 'MSFT', 'GOOG'], np.array([5, 0, -2]))
+        self.assertEqual(orders, [('AAPL', 5, 'buy'), ('GOOG', 2, 'sell')])
+
+    def test_large_universe_is_fast(self):
+        rng = np.random.default_rng(0)
+        size = 5000
+        allocations = rng.random(size)
+        allocations /= allocations.sum()
+        prices = rng.uniform(1, 500, size)
+        positions = rng.integers(0, 100, size)
+        plan_rebalance(allocations, prices, positions, 1e7)
+        start = time.perf_counter()
+        for _ in range(10):
+            plan_rebalance(allocations, prices, positions, 1e7)
+        self.assertLess((time.perf_counter() - start) / 10, 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from utils.scheduler import StrategyScheduler, strategy_interval
+
+
+class FakeStrategy:
+    def __init__(self, broker, interval, duration=0.0, fail=False):
+        self.broker = broker
+        self.rebalance_interval_seconds = interval
+        self.duration = duration
+        self.fail = fail
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def rebalance(self):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.duration)
+        with self.lock:
+            self.active -= 1
+        if self.fail:
+            raise RuntimeError('boom')
+
+
+def run_for(scheduler, seconds):
+    thread = scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    thread.join(1)
+
+
+class TestStrategyScheduler(unittest.TestCase):
+    def test_interval_from_minutes_or_seconds(self):
+        strategy = MagicMock(spec=['rebalance_interval_minutes'], rebalance_interval_minutes=2)
+        self.assertEqual(strategy_interval(strategy), 120)
+        self.assertEqual(strategy_interval(FakeStrategy(None, 0.05)), 0.05)
+
+    def test_sub_second_intervals(self):
+        fast = FakeStrategy('broker', 0.02)
+        slow = FakeStrategy('broker', 10)
+        scheduler = StrategyScheduler([fast, slow])
+        run_for(scheduler, 0.2)
+        self.assertGreaterEqual(fast.calls, 5)
+        self.assertEqual(slow.calls, 1)
+        stats = scheduler.stats()
+        self.assertLess(max(entry['max_lateness'] for entry in stats.values()), 0.1)
+
+    def test_strategy_added_while_running(self):
+        scheduler = StrategyScheduler([])
+        thread = scheduler.start()
+        strategy = FakeStrategy('broker', 10)
+        scheduler.add(strategy)
+        time.sleep(0.1)
+        scheduler.stop()
+        thread.join(1)
+        self.assertEqual(strategy.calls, 1)
+
+    def test_slow_strategy_does_not_delay_others(self):
+        slow = FakeStrategy('a', 0.02, duration=0.5)
+        fast = FakeStrategy('b', 0.02)
+        run_for(StrategyScheduler([slow, fast]), 0.2)
+        self.assertEqual(slow.calls, 1)
+        self.assertGreaterEqual(fast.calls, 5)
+
+    def test_skip_policy_drops_overruns(self):
+        strategy = FakeStrategy('broker', 0.02, duration=0.1)
+        scheduler = StrategyScheduler([strategy], overrun='skip')
+        run_for(scheduler, 0.25)
+        self.assertEqual(strategy.max_active, 1)
+        self.assertGreater(list(scheduler.stats().values())[0]['skipped'], 0)
+
+    def test_queue_policy_runs_right_after(self):
+        strategy = FakeStrategy('broker', 0.05, duration=0.12)
+        scheduler = StrategyScheduler([strategy], overrun='queue')
+        run_for(scheduler, 0.3)
+        self.assertEqual(strategy.max_active, 1)
+        self.assertGreaterEqual(strategy.calls, 2)
+        self.assertEqual(list(scheduler.stats().values())[0]['skipped'], 0)
+
+    def test_broker_concurrency_limit(self):
+        strategies = [FakeStrategy('shared', 10, duration=0.1) for _ in range(4)]
+        active = []
+        for strategy in strategies:
+            original = strategy.rebalance
+            def rebalance(original=original):
+                active.append(sum(s.active for s in strategies) + 1)
+                original()
+            strategy.rebalance = rebalance
+        run_for(StrategyScheduler(strategies, broker_concurrency=2), 0.35)
+        self.assertEqual(sum(strategy.calls for strategy in strategies), 4)
+        self.assertLessEqual(max(active), 2)
+
+    def test_failures_are_counted(self):
+        strategy = FakeStrategy('broker', 10, fail=True)
+        scheduler = StrategyScheduler([strategy])
+        run_for(scheduler, 0.05)
+        self.assertEqual(list(scheduler.stats().values())[0]['failures'], 1)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            StrategyScheduler([], overrun='pile_up')
+        with self.assertRaises(ValueError):
+            StrategyScheduler([FakeStrategy('broker', 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
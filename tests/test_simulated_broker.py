@@ -0,0 +1,162 @@
+import os
+import tempfile
+import time
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from database.models import Trade, Position, init_db
+from data.options_chain import OptionsChain
+from data.price_feed import RandomWalkPriceFeed, FilePriceFeed, create_price_feed
+from brokers.matching_engine import MatchingEngine
+from brokers.simulated_broker import SimulatedBroker
+from .base_test import BaseTest
+
+
+class TestMatchingEngine(unittest.TestCase):
+    def setUp(self):
+        self.feed = RandomWalkPriceFeed(start_prices={'AAPL': 100.0}, volatility=0.0, spread=0.002)
+        self.engine = MatchingEngine(self.feed, starting_cash=10000.0)
+
+    def test_market_buy_fills_at_ask(self):
+        order, fills = self.engine.submit('AAPL', 'buy', 10)
+        self.assertEqual(order['status'], 'filled')
+        self.assertEqual(fills, [(10, 100.1)])
+        self.assertEqual(self.engine.positions['AAPL'], 10)
+        self.assertAlmostEqual(self.engine.cash, 10000.0 - 1001.0)
+
+    def test_limit_below_ask_rests_until_cancelled(self):
+        order, fills = self.engine.submit('AAPL', 'buy', 10, price=99.0)
+        self.assertEqual(fills, [])
+        self.assertEqual(order['status'], 'open')
+        self.assertEqual(len(self.engine.open_orders()), 1)
+
+        self.assertEqual(self.engine.cancel(order['order_id'])['status'], 'canceled')
+        self.assertEqual(self.engine.open_orders(), [])
+
+    def test_partial_fill_rests_and_completes_on_later_ticks(self):
+        engine = MatchingEngine(self.feed, liquidity_per_tick=4)
+        order, fills = engine.submit('AAPL', 'buy', 10, price=101.0)
+        self.assertEqual(order['status'], 'partially_filled')
+        self.assertEqual(order['filled_quantity'], 4)
+
+        self.assertEqual([quantity for _, quantity, _ in engine.advance()], [4])
+        fills = engine.advance()
+        self.assertEqual(fills[0][0]['status'], 'filled')
+        self.assertEqual(fills[0][1], 2)
+        self.assertEqual(engine.positions['AAPL'], 10)
+
+    def test_rejects_bad_orders(self):
+        with self.assertRaises(ValueError):
+            self.engine.submit('AAPL', 'short', 1)
+        with self.assertRaises(ValueError):
+            self.engine.submit('AAPL', 'buy', 0)
+
+
+class TestPriceFeeds(unittest.TestCase):
+    def test_file_feed_replays_ticks(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('timestamp,symbol,price\n1,AAPL,100\n1,MSFT,200\n2,AAPL,101\n')
+        try:
+            feed = create_price_feed({'type': 'file', 'path': file.name})
+            self.assertIsInstance(feed, FilePriceFeed)
+            self.assertEqual(feed.quote('MSFT')['last'], 200.0)
+            self.assertTrue(feed.advance())
+            self.assertEqual(feed.quote('AAPL')['last'], 101.0)
+            self.assertEqual(feed.quote('MSFT')['last'], 200.0)
+            self.assertFalse(feed.advance())
+        finally:
+            os.remove(file.name)
+
+    def test_random_walk_is_reproducible(self):
+        first = RandomWalkPriceFeed(start_prices={'AAPL': 100.0}, seed=1)
+        second = RandomWalkPriceFeed(start_prices={'AAPL': 100.0}, seed=1)
+        for _ in range(5):
+            first.advance()
+            second.advance()
+        self.assertEqual(first.quote('AAPL'), second.quote('AAPL'))
+
+    def test_unknown_feed_type(self):
+        with self.assertRaises(ValueError):
+            create_price_feed({'type': 'ftp'})
+
+
+class TestSimulatedBroker(BaseTest):
+    def setUp(self):
+        super().setUp()
+        feed = RandomWalkPriceFeed(start_prices={'AAPL': 100.0}, volatility=0.0, spread=0.002)
+        # In-memory SQLite is per thread here, so flush from the test thread
+        self.broker = SimulatedBroker(engine=self.engine, price_feed=feed, starting_cash=10000.0, liquidity_per_tick=6, ledger_config={'flush_interval': 0})
+
+    def tearDown(self):
+        self.broker.ledger.close()
+        self.session.query(Trade).delete()
+        self.session.query(Position).delete()
+        self.session.commit()
+        super().tearDown()
+
+    def test_place_order_records_filled_quantity(self):
+        response = self.broker.place_order('AAPL', 5, 'buy', 'sim_strategy')
+        self.assertEqual(response['status'], 'filled')
+
+        trade = self.session.query(Trade).filter_by(broker='Simulated').one()
+        self.assertEqual(trade.quantity, 5)
+        self.assertEqual(trade.executed_price, 100.1)
+        self.assertEqual(self.broker.get_strategy_positions('sim_strategy'), {'AAPL': 5})
+        self.broker.ledger.flush()
+        position = self.session.query(Position).filter_by(broker='Simulated', symbol='AAPL').one()
+        self.assertEqual(position.quantity, 5)
+        self.assertEqual(self.broker.get_positions(), {'AAPL': {'symbol': 'AAPL', 'quantity': 5}})
+
+    def test_resting_fills_are_recorded_on_step(self):
+        response = self.broker.place_order('AAPL', 10, 'buy', 'sim_strategy', price=101.0)
+        self.assertEqual(response['filled_quantity'], 6)
+
+        self.assertEqual(self.broker.step(), 1)
+        self.assertEqual(self.broker.get_order_status(response['order_id'])['status'], 'filled')
+        quantities = sorted(trade.quantity for trade in self.session.query(Trade).filter_by(broker='Simulated'))
+        self.assertEqual(quantities, [4, 6])
+        self.broker.ledger.flush()
+        position = self.session.query(Position).filter_by(broker='Simulated', symbol='AAPL').one()
+        self.assertEqual(position.quantity, 10)
+
+    def test_connect_drives_ticks_in_trade_mode(self):
+        # The ticker records fills from its own thread, so it needs a shared in-memory DB
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(engine)
+        feed = RandomWalkPriceFeed(start_prices={'AAPL': 100.0}, volatility=0.0, spread=0.002)
+        broker = SimulatedBroker(engine=engine, price_feed=feed, liquidity_per_tick=4, tick_interval=0.01, ledger_config={'flush_interval': 0})
+        self.addCleanup(broker.ledger.close)
+        self.addCleanup(broker.stop_ticking)
+        response = broker.place_order('AAPL', 10, 'buy', 'sim_strategy', price=101.0)
+        broker.connect()
+
+        deadline = time.monotonic() + 5
+        while broker.get_order_status(response['order_id'])['status'] != 'filled' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The last fill is recorded just after the order reports filled
+        broker.stop_ticking()
+        self.assertIsNone(broker._ticker)
+        self.assertEqual(broker.get_strategy_positions('sim_strategy'), {'AAPL': 10})
+
+    def test_unfilled_order_is_not_recorded(self):
+        response = self.broker.place_order('AAPL', 5, 'buy', 'sim_strategy', price=90.0)
+        self.assertEqual(response['status'], 'open')
+        self.assertEqual(self.session.query(Trade).filter_by(broker='Simulated').count(), 0)
+        self.assertEqual(self.broker.cancel_order(response['order_id'])['status'], 'canceled')
+
+    def test_account_info(self):
+        self.broker.place_order('AAPL', 5, 'buy', 'sim_strategy')
+        info = self.broker.get_account_info()
+        self.assertAlmostEqual(info['cash_available'], 10000.0 - 500.5)
+        self.assertAlmostEqual(info['value'], 10000.0 - 500.5 + 500.0)
+
+    def test_options_chain(self):
+        chain = self.broker.get_options_chain('AAPL', '2030-01-18')
+        self.assertIsInstance(chain, OptionsChain)
+        self.assertEqual(len(chain.calls()), 9)
+        self.assertEqual(len(chain.puts()), 9)
+        self.assertTrue((chain.ask > chain.bid).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from utils.startup import startup
+
+
+class FakeStrategy:
+    def __init__(self, broker, config):
+        # Mirrors initialize_starting_balance hitting the broker
+        broker.get_account_info()
+        self.broker = broker
+        self.config = config
+
+
+def make_broker(connect_delay=0.0, error=None):
+    broker = MagicMock()
+
+    def connect():
+        time.sleep(connect_delay)
+        if error is not None:
+            raise error
+    broker.connect.side_effect = connect
+    return broker
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict('utils.config.STRATEGY_MAP', {'fake': FakeStrategy})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_brokers_connect_concurrently(self):
+        brokers = {name: make_broker(0.2) for name in ('a', 'b', 'c')}
+        config = {'strategies': [{'type': 'fake', 'broker': name} for name in brokers]}
+
+        start = time.perf_counter()
+        connected, strategies, report = startup(brokers, config)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(set(connected), {'a', 'b', 'c'})
+        self.assertEqual(len(strategies), 3)
+        self.assertEqual(len(report), 6)
+        self.assertTrue(all(entry['error'] is None for entry in report))
+
+    def test_failing_broker_only_drops_its_strategies(self):
+        brokers = {'good': make_broker(), 'bad': make_broker(error=ConnectionError('down'))}
+        config = {'strategies': [{'type': 'fake', 'broker': 'good'}, {'type': 'fake', 'broker': 'bad', 'name': 'bad_strategy'}]}
+
+        connected, strategies, report = startup(brokers, config)
+        self.assertEqual(list(connected), ['good'])
+        self.assertEqual([strategy.broker for strategy in strategies], [brokers['good']])
+        errors = {entry['name']: entry['error'] for entry in report}
+        self.assertIsInstance(errors['bad'], ConnectionError)
+        self.assertIn('unavailable', str(errors['bad_strategy']))
+
+    def test_slow_broker_times_out_without_delaying_others(self):
+        release = threading.Event()
+        slow = MagicMock()
+        slow.connect.side_effect = lambda: release.wait(5)
+        brokers = {'fast': make_broker(), 'slow': slow}
+        config = {'startup': {'timeout': 0.2}, 'strategies': [{'type': 'fake', 'broker': 'fast'}, {'type': 'fake', 'broker': 'slow'}]}
+
+        start = time.perf_counter()
+        connected, strategies, report = startup(brokers, config)
+        release.set()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(list(connected), ['fast'])
+        self.assertEqual(len(strategies), 1)
+        self.assertIsInstance(report[1]['error'], TimeoutError)
+
+    def test_strategies_are_handed_over_as_their_broker_connects(self):
+        release = threading.Event()
+        slow = MagicMock()
+        slow.connect.side_effect = lambda: release.wait(5)
+        brokers = {'fast': make_broker(), 'slow': slow}
+        config = {'strategies': [{'type': 'fake', 'broker': 'fast'}, {'type': 'fake', 'broker': 'slow'}]}
+        ready = []
+        fast_ready = threading.Event()
+        def on_strategy(strategy):
+            ready.append(strategy.broker)
+            if strategy.broker is brokers['fast']:
+                fast_ready.set()
+
+        thread = threading.Thread(target=lambda: startup(brokers, config, on_strategy=on_strategy))
+        thread.start()
+        # The fast broker's strategy is ready while the slow broker still connects
+        self.assertTrue(fast_ready.wait(1))
+        self.assertEqual(ready, [brokers['fast']])
+        release.set()
+        thread.join()
+        self.assertEqual(ready, [brokers['fast'], slow])
+
+    def test_unknown_broker(self):
+        connected, strategies, report = startup({}, {'strategies': [{'type': 'fake', 'broker': 'missing'}]})
+        self.assertEqual(strategies, [])
+        self.assertIsInstance(report[0]['error'], KeyError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from brokers.simulated_broker import SimulatedBroker
+from data.price_feed import RandomWalkPriceFeed
+from database.models import Trade, init_db
+from utils.supervisor import BrokerProxy, Supervisor, WorkerChannel
+
+# Crashes its worker on the first rebalance, then buys one share per rebalance
+CRASHING_STRATEGY = '''
+import os
+from strategies.base_strategy import BaseStrategy
+
+class CrashOnceStrategy(BaseStrategy):
+    def __init__(self, broker, stock_allocations, cash_percentage, rebalance_interval_minutes, starting_capital):
+        self.strategy_name = 'crash_once'
+        self.starting_capital = starting_capital
+        self.rebalance_interval_seconds = 0.05
+        super().__init__(broker)
+
+    def rebalance(self):
+        marker = os.path.join(os.path.dirname(__file__), 'crashed')
+        if not os.path.exists(marker):
+            open(marker, 'w').close()
+            os._exit(3)
+        self.broker.place_order('AAPL', 1, 'buy', self.strategy_name)
+'''
+
+
+class TestBrokerProxy(unittest.TestCase):
+    def setUp(self):
+        self.broker = MagicMock(broker_name='Fake')
+        self.supervisor = Supervisor({'fake': self.broker}, [])
+        conn, worker_conn = multiprocessing.Pipe()
+        worker = MagicMock()
+        worker.name = 'test'
+        threading.Thread(target=self.supervisor._serve, args=(worker, conn), daemon=True).start()
+        self.channel = WorkerChannel(worker_conn)
+        self.proxy = BrokerProxy('fake', 'Fake', self.channel, create_engine('sqlite://'))
+        self.addCleanup(conn.close)
+        self.addCleanup(self.supervisor.executor.shutdown)
+
+    def test_calls_run_on_the_supervisor_broker(self):
+        self.broker.get_current_prices.return_value = {'AAPL': 150.0}
+        self.assertEqual(self.proxy.get_current_prices(['AAPL']), {'AAPL': 150.0})
+        self.broker.get_current_prices.assert_called_once_with(['AAPL'])
+        self.assertEqual(self.proxy.broker_name, 'Fake')
+
+    def test_broker_errors_are_raised_in_the_worker(self):
+        self.broker.place_order.side_effect = ValueError('Day trading is not allowed')
+        with self.assertRaisesRegex(ValueError, 'Day trading'):
+            self.proxy.place_order('AAPL', 1, 'sell', 'strategy')
+
+    def test_async_variants_and_unknown_methods(self):
+        self.broker.get_account_info.return_value = {'value': 1.0}
+        self.assertEqual(asyncio.run(self.proxy.get_account_info_async()), {'value': 1.0})
+        with self.assertRaises(AttributeError):
+            self.proxy.connect()
+
+    def test_concurrent_calls_are_answered_out_of_order(self):
+        release = threading.Event()
+        self.broker.get_quote.side_effect = lambda symbol: release.wait(5) and {'last': 1.0}
+        self.broker.get_current_price.return_value = 2.0
+        slow = []
+        thread = threading.Thread(target=lambda: slow.append(self.proxy.get_quote('AAPL')))
+        thread.start()
+        self.assertEqual(self.proxy.get_current_price('MSFT'), 2.0)
+        release.set()
+        thread.join(5)
+        self.assertEqual(slow, [{'last': 1.0}])
+
+
+class TestSupervisorRestarts(unittest.TestCase):
+    def make_supervisor(self, **kwargs):
+        strategies = [
+            {'type': 'a', 'broker': 'fake', 'worker': 'shared'},
+            {'type': 'b', 'broker': 'fake', 'worker': 'shared'},
+            {'type': 'c', 'broker': 'fake'},
+        ]
+        supervisor = Supervisor({'fake': MagicMock(broker_name='Fake')}, strategies, limits={'memory_mb': 256, 'nice': 5}, worker_limits={'shared': {'memory_mb': 1024}}, **kwargs)
+        self.addCleanup(supervisor.executor.shutdown)
+        return supervisor
+
+    def test_strategies_are_grouped_by_worker(self):
+        supervisor = self.make_supervisor()
+        workers = {worker.name: worker for worker in supervisor.workers}
+        self.assertEqual(set(workers), {'shared', 'c#2@fake'})
+        self.assertEqual(len(workers['shared'].strategy_configs), 2)
+        self.assertEqual(workers['shared'].limits, {'memory_mb': 1024, 'nice': 5})
+        self.assertEqual(workers['c#2@fake'].limits, {'memory_mb': 256, 'nice': 5})
+
+    def test_unknown_broker_is_rejected(self):
+        with self.assertRaises(KeyError):
+            Supervisor({}, [{'type': 'a', 'broker': 'missing'}])
+
+    def test_restart_backoff_doubles_and_gives_up(self):
+        supervisor = self.make_supervisor(restart_delay=1.0, max_restart_delay=60.0, max_restarts=2)
+        worker = supervisor.workers[0]
+        worker.process = MagicMock(exitcode=-9)
+        worker.process.is_alive.return_value = False
+        clock = [100.0]
+        worker.started_at = clock[0]
+
+        def spawn(worker):
+            worker.restart_at = None
+            worker.started_at = clock[0]
+        with patch.object(supervisor, '_spawn', side_effect=spawn), patch('utils.supervisor.time.monotonic', side_effect=lambda: clock[0]):
+            supervisor.poll()
+            self.assertEqual(worker.restart_at, 101.0)
+            self.assertEqual(worker.last_exitcode, -9)
+            supervisor.poll()
+            self.assertEqual(worker.restarts, 0)
+            clock[0] = 101.0
+            supervisor.poll()
+            self.assertEqual(worker.restarts, 1)
+            supervisor.poll()
+            self.assertEqual(worker.restart_at, 103.0)
+            clock[0] = 103.0
+            supervisor.poll()
+            with patch('builtins.print') as mock_print:
+                supervisor.poll()
+            self.assertTrue(worker.failed)
+            self.assertEqual(worker.restarts, 2)
+            self.assertIn('giving up after 2 restarts', mock_print.call_args[0][0])
+
+    def test_healthy_runs_reset_the_restart_cap(self):
+        supervisor = self.make_supervisor(restart_delay=1.0, max_restart_delay=60.0, max_restarts=2)
+        worker = supervisor.workers[0]
+        worker.process = MagicMock(exitcode=-24)
+        worker.process.is_alive.return_value = False
+        clock = [100.0]
+        worker.started_at = clock[0]
+
+        def spawn(worker):
+            worker.restart_at = None
+            worker.started_at = clock[0]
+        with patch.object(supervisor, '_spawn', side_effect=spawn), patch('utils.supervisor.time.monotonic', side_effect=lambda: clock[0]), patch('builtins.print'):
+            # A worker that spends its CPU budget after a long healthy run, again and again
+            for _ in range(5):
+                clock[0] += 3600
+                supervisor.poll()
+                clock[0] += 1
+                supervisor.poll()
+        self.assertFalse(worker.failed)
+        self.assertEqual(worker.restarts, 5)
+
+    def test_restarts_are_capped_by_default(self):
+        self.assertEqual(self.make_supervisor().max_restarts, 10)
+
+
+class TestSupervisedWorkers(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.database_url = f"sqlite:///{os.path.join(self.directory, 'trading.db')}"
+        self.engine = create_engine(self.database_url)
+        init_db(self.engine)
+        strategy_file = os.path.join(self.directory, 'crash_once.py')
+        with open(strategy_file, 'w') as file:
+            file.write(CRASHING_STRATEGY)
+        self.broker = SimulatedBroker(engine=self.engine, price_feed=RandomWalkPriceFeed(start_prices={'AAPL': 100.0}, volatility=0.0))
+        self.addCleanup(self.broker.ledger.close)
+        self.strategy_config = {
+            'type': 'custom',
+            'broker': 'simulated',
+            'file': strategy_file,
+            'className': 'CrashOnceStrategy',
+            'stock_allocations': {'AAPL': 1.0},
+            'cash_percentage': 0.0,
+            'rebalance_interval_minutes': 1,
+            'starting_capital': 1000,
+        }
+
+    def test_crashed_worker_is_restarted_and_trades_through_the_supervisor(self):
+        supervisor = Supervisor({'simulated': self.broker}, [self.strategy_config], database_url=self.database_url, restart_delay=0.05, limits={'memory_mb': 2048})
+        thread = threading.Thread(target=supervisor.run, kwargs={'interval': 0.05}, daemon=True)
+        thread.start()
+        try:
+            deadline = time.monotonic() + 60
+            trades = 0
+            while time.monotonic() < deadline and trades < 2:
+                time.sleep(0.2)
+                with self.broker.Session() as session:
+                    trades = session.query(Trade).filter_by(strategy='crash_once').count()
+        finally:
+            supervisor.stop()
+            thread.join(5)
+
+        self.assertGreaterEqual(trades, 2)
+        stats = supervisor.stats()['custom#0@simulated']
+        self.assertEqual(stats['restarts'], 1)
+        self.assertEqual(stats['last_exitcode'], 3)
+        self.assertGreaterEqual(self.broker.matching_engine.positions['AAPL'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
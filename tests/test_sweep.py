@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from data.bars import Bars
+from backtest.sweep import grid_params, random_params, sweep_params, run_sweep, format_results
+
+STRATEGY = {
+    'type': 'constant_percentage',
+    'stock_allocations': {'AAPL': 0.5, 'MSFT': 0.5},
+    'cash_percentage': 0.2,
+    'rebalance_interval_minutes': 60,
+    'starting_capital': 10000,
+}
+
+
+class TestSweepParams(unittest.TestCase):
+    def test_grid(self):
+        params = grid_params({'cash_percentage': [0.1, 0.2], 'rebalance_interval_minutes': [30, 60, 90]})
+        self.assertEqual(len(params), 6)
+        self.assertIn({'cash_percentage': 0.2, 'rebalance_interval_minutes': 90}, params)
+
+    def test_random_is_seeded(self):
+        spec = {'samples': 5, 'seed': 3, 'params': {'cash_percentage': {'uniform': [0, 0.5]}, 'rebalance_interval_minutes': {'choice': [15, 60]}}}
+        params = random_params(spec)
+        self.assertEqual(params, random_params(spec))
+        self.assertTrue(all(0 <= p['cash_percentage'] <= 0.5 for p in params))
+        self.assertTrue(all(p['rebalance_interval_minutes'] in (15, 60) for p in params))
+
+    def test_spec_needs_search(self):
+        with self.assertRaises(ValueError):
+            sweep_params({'strategy': STRATEGY})
+
+
+class TestRunSweep(unittest.TestCase):
+    def test_results_ranked_by_metric(self):
+        minutes = 300
+        timestamps = np.datetime64('2024-01-02T14:30') + np.arange(minutes).astype('timedelta64[m]')
+        closes = np.column_stack([np.linspace(100, 130, minutes), np.linspace(200, 190, minutes)])
+        bars = Bars(timestamps, ['AAPL', 'MSFT'], closes)
+        allocations = [{'AAPL': 1.0, 'MSFT': 0.0}, {'AAPL': 0.0, 'MSFT': 1.0}]
+
+        results = run_sweep(bars, STRATEGY, grid_params({'stock_allocations': allocations}), metric='total_return', starting_cash=10000, workers=2)
+        self.assertEqual([params['stock_allocations'] for params, _ in results], allocations)
+        self.assertGreater(results[0][1]['total_return'], 0)
+        self.assertLess(results[1][1]['total_return'], 0)
+
+        header, rows = format_results(results, 'total_return')
+        self.assertEqual(header[:2], ['rank', 'stock_allocations'])
+        self.assertEqual([row[0] for row in rows], [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
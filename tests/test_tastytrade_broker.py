@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from brokers.tastytrade_broker import TastytradeBroker
 from database.models import Trade, Balance
 from .base_test import BaseTest
+from data.options_chain import OptionsChain
 
 class TestTastytradeBroker(BaseTest):
 
@@ -17,15 +18,15 @@ class TestTastytradeBroker(BaseTest):
         mock_response.json.return_value = {'access_token': 'token'}
         mock_post.return_value = mock_response
 
-    @patch('brokers.tastytrade_broker.requests.get')
-    @patch('brokers.tastytrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_connect(self, mock_post, mock_get):
         self.mock_connect(mock_post)
         self.broker.connect()
         self.assertTrue(hasattr(self.broker, 'auth'))
 
-    @patch('brokers.tastytrade_broker.requests.get')
-    @patch('brokers.tastytrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_account_info(self, mock_post, mock_get):
         self.mock_connect(mock_post)
         mock_response = MagicMock()
@@ -39,8 +40,8 @@ class TestTastytradeBroker(BaseTest):
         self.assertEqual(account_info, {'value': 10000.0})
         self.assertEqual(self.broker.account_id, '12345')
 
-    @patch('brokers.tastytrade_broker.requests.post')
-    @patch('brokers.tastytrade_broker.requests.get')
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
     def skip_test_place_order(self, mock_get, mock_post):
         self.mock_connect(mock_post)
         
@@ -67,8 +68,8 @@ class TestTastytradeBroker(BaseTest):
         self.assertIsNotNone(balance)
         self.assertEqual(balance.total_balance, 10000.0 + (10 * 155.00))  # Assuming the balance should include the executed trade
 
-    @patch('brokers.tastytrade_broker.requests.get')
-    @patch('brokers.tastytrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_order_status(self, mock_post_connect, mock_get):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
@@ -79,8 +80,8 @@ class TestTastytradeBroker(BaseTest):
         order_status = self.broker.get_order_status('order_id')
         self.assertEqual(order_status, {'status': 'completed'})
 
-    @patch('brokers.tastytrade_broker.requests.put')
-    @patch('brokers.tastytrade_broker.requests.post')
+    @patch('requests.Session.put')
+    @patch('requests.Session.post')
     def test_cancel_order(self, mock_post_connect, mock_put):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
@@ -91,17 +92,25 @@ class TestTastytradeBroker(BaseTest):
         cancel_status = self.broker.cancel_order('order_id')
         self.assertEqual(cancel_status, {'status': 'cancelled'})
 
-    @patch('brokers.tastytrade_broker.requests.get')
-    @patch('brokers.tastytrade_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_options_chain(self, mock_post_connect, mock_get):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
-        mock_response.json.return_value = {'options': 'chain'}
+        mock_response.json.return_value = {'options': {'option': [
+            {'symbol': 'AAPL241220C00190000', 'strike': 190.0, 'option_type': 'call', 'bid': 5.0, 'ask': 5.2, 'open_interest': 1200, 'volume': 300, 'expiration_date': '2024-12-20'},
+            {'symbol': 'AAPL241220P00190000', 'strike': 190.0, 'option_type': 'put', 'bid': 4.1, 'ask': 4.3, 'open_interest': 800, 'volume': 150, 'expiration_date': '2024-12-20'},
+        ]}}
         mock_get.return_value = mock_response
 
         self.broker.connect()
         options_chain = self.broker.get_options_chain('AAPL', '2024-12-20')
-        self.assertEqual(options_chain, {'options': 'chain'})
+        self.assertIsInstance(options_chain, OptionsChain)
+        self.assertEqual(len(options_chain), 2)
+        self.assertEqual(options_chain.calls().symbol.tolist(), ['AAPL241220C00190000'])
+
+        # Served from the chain cache on the next call
+        self.assertIs(self.broker.get_options_chain('AAPL', '2024-12-20'), options_chain)
 
 if __name__ == '__main__':
     unittest.main()
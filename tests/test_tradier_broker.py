@@ -1,9 +1,30 @@
+import asyncio
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 from brokers.tradier_broker import TradierBroker
 from .base_test import BaseTest
-from database.models import Balance, Trade
+from data.options_chain import OptionsChain
+from database.models import Balance, Trade, init_db
+
+class FakeAsyncResponse:
+    def __init__(self, payload, status=200):
+        self.payload = payload
+        self.status = status
+
+    async def json(self):
+        return self.payload
+
+    async def text(self):
+        return str(self.payload)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
 
 class TestTradierBroker(BaseTest):
 
@@ -17,15 +38,15 @@ class TestTradierBroker(BaseTest):
         mock_response.json.return_value = {'profile': {'account': {'account_number': '12345', 'balance': 10000.0}}}
         mock_post.return_value = mock_response
 
-    @patch('brokers.tradier_broker.requests.get')
-    @patch('brokers.tradier_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_connect(self, mock_post, mock_get):
         self.mock_connect(mock_post)
         self.broker.connect()
         self.assertTrue(hasattr(self.broker, 'headers'))
 
-    @patch('brokers.tradier_broker.requests.get')
-    @patch('brokers.tradier_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def skip_test_get_account_info(self, mock_post, mock_get):
         self.mock_connect(mock_post)
         mock_response = MagicMock()
@@ -37,8 +58,8 @@ class TestTradierBroker(BaseTest):
         self.assertEqual(account_info, {'value': 10000.0})
         self.assertEqual(self.broker.account_id, '12345')
 
-    @patch('brokers.etrade_broker.requests.post')
-    @patch('brokers.etrade_broker.requests.get')
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
     def skip_test_place_order(self, mock_get, mock_post):
         self.mock_connect(mock_post)
         mock_response = MagicMock()
@@ -63,8 +84,8 @@ class TestTradierBroker(BaseTest):
         self.assertIsNotNone(balance)
         self.assertEqual(balance.total_balance, 10000.0 + (10 * 155.00))  # Assuming the balance should include the executed trade
 
-    @patch('brokers.tradier_broker.requests.get')
-    @patch('brokers.tradier_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_order_status(self, mock_post_connect, mock_get):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
@@ -75,8 +96,8 @@ class TestTradierBroker(BaseTest):
         order_status = self.broker.get_order_status('order_id')
         self.assertEqual(order_status, {'status': 'completed'})
 
-    @patch('brokers.tradier_broker.requests.delete')
-    @patch('brokers.tradier_broker.requests.post')
+    @patch('requests.Session.delete')
+    @patch('requests.Session.post')
     def test_cancel_order(self, mock_post_connect, mock_delete):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
@@ -87,17 +108,162 @@ class TestTradierBroker(BaseTest):
         cancel_status = self.broker.cancel_order('order_id')
         self.assertEqual(cancel_status, {'status': 'cancelled'})
 
-    @patch('brokers.tradier_broker.requests.get')
-    @patch('brokers.tradier_broker.requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_get_options_chain(self, mock_post_connect, mock_get):
         self.mock_connect(mock_post_connect)
         mock_response = MagicMock()
-        mock_response.json.return_value = {'options': 'chain'}
+        mock_response.json.return_value = {'options': {'option': [
+            {'symbol': 'AAPL241220C00190000', 'strike': 190.0, 'option_type': 'call', 'bid': 5.0, 'ask': 5.2, 'open_interest': 1200, 'volume': 300, 'expiration_date': '2024-12-20'},
+            {'symbol': 'AAPL241220P00190000', 'strike': 190.0, 'option_type': 'put', 'bid': 4.1, 'ask': 4.3, 'open_interest': 800, 'volume': 150, 'expiration_date': '2024-12-20'},
+        ]}}
         mock_get.return_value = mock_response
 
         self.broker.connect()
         options_chain = self.broker.get_options_chain('AAPL', '2024-12-20')
-        self.assertEqual(options_chain, {'options': 'chain'})
+        self.assertIsInstance(options_chain, OptionsChain)
+        self.assertEqual(len(options_chain), 2)
+        self.assertEqual(options_chain.calls().symbol.tolist(), ['AAPL241220C00190000'])
+
+        # Served from the chain cache on the next call
+        self.assertIs(self.broker.get_options_chain('AAPL', '2024-12-20'), options_chain)
+
+    @patch('requests.Session.get')
+    def test_account_id_memoized(self, mock_get):
+        profile = MagicMock(status_code=200, json=MagicMock(return_value={'profile': {'account': {'account_number': '12345'}}}))
+        balances = MagicMock(status_code=200, json=MagicMock(return_value={'balances': {'account_number': '12345', 'total_equity': 10000.0, 'cash': {'cash_available': 5000.0}}}))
+        mock_get.side_effect = [profile, balances, balances]
+
+        self.broker._get_account_info()
+        account_info = self.broker._get_account_info()
+        self.assertEqual(self.broker.account_id, '12345')
+        self.assertEqual(account_info['buying_power'], 5000.0)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('requests.Session.get')
+    def test_get_current_prices_single_request(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'quotes': {'quote': [
+            {'symbol': 'AAPL', 'last': 190.5},
+            {'symbol': 'MSFT', 'last': 410.0},
+        ]}}
+        mock_get.return_value = mock_response
+
+        prices = self.broker.get_current_prices(['AAPL', 'MSFT'])
+        self.assertEqual(prices, {'AAPL': 190.5, 'MSFT': 410.0})
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args.kwargs['params'], {'symbols': 'AAPL,MSFT'})
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_place_order_uses_cached_quote(self, mock_get, mock_post):
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'quotes': {'quote': {'symbol': 'AAPL', 'last': 190.0, 'bid': 189.9, 'ask': 190.1}}}))
+        mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'order': {'id': 1}}))
+        self.broker.auto_cancel_orders = False
+
+        self.broker.get_current_price('AAPL')
+        self.broker._place_order('AAPL', 1, 'buy')
+        mock_get.assert_called_once()
+        self.assertEqual(mock_post.call_args.kwargs['data']['price'], 190.0)
+
+    @patch('requests.Session.post')
+    def test_place_order_returns_without_waiting_for_fill(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'order': {'id': 42, 'status': 'ok'}}))
+        with patch.object(self.broker, 'track_order') as mock_track_order:
+            response = self.broker.place_order('AAPL', 1, 'buy', 's', price=190.0)
+        self.assertEqual(response, {'order_id': 42, 'status': 'ok', 'price': 190.0, 'track_timeout': self.broker.order_timeout})
+        mock_track_order.assert_called_once_with(42, timeout=self.broker.order_timeout)
+
+    def make_recording_broker(self):
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(engine)
+        broker = TradierBroker('api_key', None, engine=engine, ledger_config={'flush_interval': 0})
+        broker.auto_cancel_orders = False
+        self.addCleanup(broker.ledger.close)
+        return broker
+
+    @patch('requests.Session.post')
+    @patch('requests.Session.get')
+    def test_place_order_records_the_computed_limit_price(self, mock_get, mock_post):
+        broker = self.make_recording_broker()
+        mock_get.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'quotes': {'quote': {'symbol': 'AAPL', 'last': 190.0, 'bid': 189.9, 'ask': 190.3}}}))
+        mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value={'order': {'id': 7, 'status': 'ok'}}))
+
+        broker.place_order('AAPL', 1, 'buy', 's')
+        with broker.Session() as session:
+            trade = session.query(Trade).one()
+            self.assertEqual((trade.price, trade.executed_price), (190.1, 190.1))
+        self.assertEqual(broker.get_strategy_positions('s'), {'AAPL': 1})
+
+    @patch('requests.Session.post')
+    def test_failed_order_is_not_recorded(self, mock_post):
+        broker = self.make_recording_broker()
+        mock_post.return_value = MagicMock(status_code=500, text='Internal Server Error')
+
+        with patch('builtins.print'):
+            self.assertEqual(broker.place_order('AAPL', 1, 'buy', 's', 150.0), {})
+        with broker.Session() as session:
+            self.assertEqual(session.query(Trade).count(), 0)
+        self.assertEqual(broker.get_strategy_positions('s'), {})
+
+    def place_tracked_order(self, broker, quantity, exec_quantity, avg_fill_price=None):
+        # The order rests until the tracker cancels it, having filled exec_quantity
+        broker.auto_cancel_orders = True
+        broker.order_timeout = 0.05
+        broker.account_id = '123'
+        order = {'id': 5, 'status': 'open', 'exec_quantity': 0}
+        def get(url, **kwargs):
+            return MagicMock(status_code=200, json=MagicMock(return_value={'order': dict(order)}))
+        def cancel(url, **kwargs):
+            order.update(status='canceled', exec_quantity=exec_quantity, avg_fill_price=avg_fill_price)
+            return MagicMock(status_code=200, json=MagicMock(return_value={'order': {'id': 5, 'status': 'ok'}}))
+        settled = threading.Event()
+        record = broker._record_settled_order
+        def record_and_signal(*args):
+            record(*args)
+            settled.set()
+        broker._record_settled_order = record_and_signal
+        with patch('requests.Session.post', return_value=MagicMock(status_code=200, json=MagicMock(return_value={'order': {'id': 5, 'status': 'ok'}}))), \
+                patch('requests.Session.get', side_effect=get), patch('requests.Session.put', side_effect=cancel):
+            broker.place_order('AAPL', quantity, 'buy', 's', 190.0)
+            # Nothing is recorded while the order rests
+            with broker.Session() as session:
+                self.assertEqual(session.query(Trade).count(), 0)
+            self.assertTrue(settled.wait(5))
+        broker.order_tracker.stop()
+        with broker.Session() as session:
+            return [(trade.quantity, trade.executed_price, trade.status) for trade in session.query(Trade)]
+
+    def test_order_cancelled_by_the_tracker_is_not_recorded(self):
+        broker = self.make_recording_broker()
+        self.assertEqual(self.place_tracked_order(broker, 5, exec_quantity=0), [])
+        self.assertEqual(broker.get_strategy_positions('s'), {})
+
+    def test_partially_filled_order_records_what_filled(self):
+        broker = self.make_recording_broker()
+        self.assertEqual(self.place_tracked_order(broker, 5, exec_quantity=2, avg_fill_price=189.95), [(2, 189.95, 'filled')])
+        self.assertEqual(broker.get_strategy_positions('s'), {'AAPL': 2})
+
+    def test_trade_without_a_price_is_not_recorded(self):
+        broker = self.make_recording_broker()
+        with self.assertRaises(ValueError):
+            broker.record_trade('AAPL', 1, 'buy', 's', {'order_id': 1, 'status': 'ok'})
+        with broker.Session() as session:
+            self.assertEqual(session.query(Trade).count(), 0)
+
+    def test_get_current_prices_async(self):
+        fake_http = MagicMock()
+        fake_http.get.return_value = FakeAsyncResponse({'quotes': {'quote': [
+            {'symbol': 'AAPL', 'last': 190.5, 'bid': 190.4, 'ask': 190.6},
+            {'symbol': 'MSFT', 'last': 410.0, 'bid': 409.9, 'ask': 410.1},
+        ]}})
+
+        with patch.object(self.broker, 'get_async_http', return_value=fake_http):
+            prices = asyncio.run(self.broker.get_current_prices_async(['AAPL', 'MSFT']))
+        self.assertEqual(prices, {'AAPL': 190.5, 'MSFT': 410.0})
+        fake_http.get.assert_called_once()
+        self.assertEqual(self.broker.get_quote('MSFT')['bid'], 409.9)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from brokers.simulated_broker import SimulatedBroker
+from data.price_feed import RandomWalkPriceFeed
+from database.models import Position, Trade, init_db
+from strategies.base_strategy import BaseStrategy
+
+
+class FillRecorder(BaseStrategy):
+    def __init__(self, broker):
+        self.strategy_name = 'recorder'
+        self.starting_capital = 1000
+        self.fills = []
+        super().__init__(broker)
+
+    def rebalance(self):
+        self.broker.place_orders([('AAPL', 2, 'buy'), ('MSFT', 1, 'buy')], self.strategy_name)
+
+    def on_fill(self, event):
+        self.fills.append(event.data['trade_id'])
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self):
+        # place_orders records trades from its own threads, so they must share one in-memory DB
+        self.engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(self.engine)
+        feed = RandomWalkPriceFeed(start_prices={'AAPL': 100.0, 'MSFT': 200.0}, volatility=0.0, spread=0.0)
+        self.broker = SimulatedBroker(engine=self.engine, price_feed=feed, starting_cash=100000.0, ledger_config={'flush_interval': 0})
+        self.broker.event_bus.synchronous = True
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.broker.ledger.close)
+        self.commits = []
+        event.listen(self.engine, 'commit', lambda conn: self.commits.append(conn))
+
+    def trades(self):
+        with self.broker.Session() as session:
+            return [(trade.id, trade.strategy, trade.symbol, trade.quantity) for trade in session.query(Trade).order_by(Trade.id)]
+
+    def test_trades_and_positions_are_written_in_one_transaction(self):
+        with self.broker.unit_of_work('s1') as unit:
+            for _ in range(50):
+                self.broker.place_order('AAPL', 1, 'buy', 's1')
+            self.broker.place_order('MSFT', 3, 'buy', 's1')
+            self.broker.place_order('AAPL', 1, 'buy', 's2')
+            self.assertEqual(len(unit), 51)
+            self.assertEqual(len(self.trades()), 1)
+        commits = len(self.commits)
+
+        trades = self.trades()
+        self.assertEqual(len(trades), 52)
+        self.assertEqual(trades[0][1], 's2')
+        self.assertEqual(trades[-1][2:], ('MSFT', 3))
+        with self.broker.Session() as session:
+            positions = {position.symbol: position.quantity for position in session.query(Position).filter_by(strategy='s1')}
+        self.assertEqual(positions, {'AAPL': 50, 'MSFT': 3})
+        # The trade outside the unit commits on its own; the unit commits once
+        self.assertEqual(commits, 2)
+
+    def test_rebalance_unit_publishes_fills_with_ids(self):
+        strategy = FillRecorder(self.broker)
+        with strategy.unit_of_work():
+            strategy.rebalance()
+            with strategy.unit_of_work():
+                self.broker.place_order('AAPL', 1, 'sell', strategy.strategy_name)
+            self.assertEqual(strategy.fills, [])
+        self.assertEqual(sorted(strategy.fills), [trade[0] for trade in self.trades()])
+        self.assertEqual(self.broker.get_strategy_positions('recorder'), {'AAPL': 1, 'MSFT': 1})
+
+    def test_open_unit_holds_its_positions_out_of_other_flushes(self):
+        with self.broker.unit_of_work('s1'):
+            self.broker.place_order('AAPL', 2, 'buy', 's1')
+            self.broker.place_order('MSFT', 1, 'buy', 's2')
+            # What the background flusher would write meanwhile
+            self.broker.ledger.flush()
+            with self.broker.Session() as session:
+                self.assertEqual([position.strategy for position in session.query(Position)], ['s2'])
+        with self.broker.Session() as session:
+            self.assertEqual(session.query(Position).filter_by(strategy='s1').one().quantity, 2)
+
+    def test_failed_commit_is_retried_with_its_positions(self):
+        strategy = FillRecorder(self.broker)
+        with patch.object(self.broker.ledger, 'Session', side_effect=RuntimeError('database is locked')):
+            with self.assertRaises(RuntimeError):
+                with strategy.unit_of_work():
+                    strategy.rebalance()
+            # Neither the trades nor the positions reached the database
+            self.assertEqual(self.trades(), [])
+            self.assertEqual(self.broker.ledger.pending_trades(), 2)
+            self.assertEqual(strategy.fills, [])
+
+        self.broker.ledger.flush()
+        self.assertEqual(len(self.trades()), 2)
+        with self.broker.Session() as session:
+            self.assertEqual({position.symbol: position.quantity for position in session.query(Position)}, {'AAPL': 2, 'MSFT': 1})
+        self.assertEqual(sorted(strategy.fills), [trade[0] for trade in self.trades()])
+
+
+if __name__ == '__main__':
+    unittest.main()
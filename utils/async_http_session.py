@@ -0,0 +1,16 @@
+from utils.http_session import DEFAULT_HTTP_CONFIG
+
+
+def create_async_http_session(http_config=None, headers=None):
+    """
+    Build a keep-alive aiohttp.ClientSession sized like the broker's sync
+    transport. Must be called from inside the event loop that will use it.
+    """
+    # Imported here: aiohttp is slow to import and only the async path needs it
+    import aiohttp
+    config = dict(DEFAULT_HTTP_CONFIG)
+    config.update(http_config or {})
+
+    connector = aiohttp.TCPConnector(limit=config['pool_size'], keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=config['timeout'])
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
@@ -1,36 +1,28 @@
+import hashlib
+import os
+import threading
 import yaml
 import importlib.util
-from brokers.tradier_broker import TradierBroker
-from brokers.tastytrade_broker import TastytradeBroker
-from brokers.etrade_broker import EtradeBroker
-from strategies.constant_percentage_strategy import ConstantPercentageStrategy
 from sqlalchemy import create_engine
+from utils.plugins import PluginRegistry, BROKER_ENTRY_POINTS, STRATEGY_ENTRY_POINTS, apply_plugin_config
 
-# Mapping of broker types to their constructors
-BROKER_MAP = {
-    'tradier': lambda config, engine: TradierBroker(api_key=config['api_key'], secret_key=None, engine=engine, prevent_day_trading=config.get('prevent_day_trading', False)),
-    'etrade': lambda config, engine: ETradeBroker(api_key=config['api_key'], secret_key=config['secret_key'], engine=engine, prevent_day_trading=config.get('prevent_day_trading', False)),
-    'tastytrade': lambda config, engine: TastytradeBroker(api_key=config['api_key'], secret_key=config['secret_key'], engine=engine, prevent_day_trading=config.get('prevent_day_trading', False))
-}
-
-# Mapping of strategy types to their constructors
-STRATEGY_MAP = {
-    'constant_percentage': lambda broker, config: ConstantPercentageStrategy(
-        broker=broker,
-        stock_allocations=config['stock_allocations'],
-        cash_percentage=config['cash_percentage'],
-        rebalance_interval_minutes=config['rebalance_interval_minutes'],
-        starting_capital=config['starting_capital']
-    ),
-    'custom': lambda broker, config: load_custom_strategy(broker, config)
-}
+# Custom strategy classes by (path, file hash, class name)
+_strategy_classes = {}
+_strategy_classes_lock = threading.Lock()
 
 def load_strategy_class(file_path, class_name):
-    spec = importlib.util.spec_from_file_location(class_name, file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    strategy_class = getattr(module, class_name)
-    return strategy_class
+    # Reuse the class while the file is unchanged, so repeated strategies and
+    # restarts do not re-execute the module
+    with open(file_path, 'rb') as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    key = (os.path.abspath(file_path), digest, class_name)
+    with _strategy_classes_lock:
+        if key not in _strategy_classes:
+            spec = importlib.util.spec_from_file_location(class_name, file_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _strategy_classes[key] = getattr(module, class_name)
+        return _strategy_classes[key]
 
 def load_custom_strategy(broker, config):
     strategy_class = load_strategy_class(config['file'], config['className'])
@@ -42,6 +34,24 @@ def load_custom_strategy(broker, config):
         starting_capital=config['starting_capital']
     )
 
+# Broker types and their factories, imported only when a config uses them
+BROKER_MAP = PluginRegistry(BROKER_ENTRY_POINTS, {
+    'tradier': 'brokers.tradier_broker:TradierBroker.from_config',
+    'etrade': 'brokers.etrade_broker:EtradeBroker.from_config',
+    'tastytrade': 'brokers.tastytrade_broker:TastytradeBroker.from_config',
+    'simulated': 'brokers.simulated_broker:SimulatedBroker.from_config',
+})
+
+# Strategy types and their factories, imported only when a config uses them
+STRATEGY_MAP = PluginRegistry(STRATEGY_ENTRY_POINTS, {
+    'constant_percentage': 'strategies.constant_percentage_strategy:ConstantPercentageStrategy.from_config',
+    'custom': load_custom_strategy,
+})
+
+def register_plugins(config):
+    # Brokers and strategies named in the config's `plugins` section
+    apply_plugin_config(config.get('plugins'), BROKER_MAP, STRATEGY_MAP)
+
 def parse_config(config_path):
     with open(config_path, 'r') as file:
         config = yaml.safe_load(file)
@@ -54,6 +64,7 @@ def initialize_brokers(config):
     else:
         engine = create_engine('sqlite:///default_trading_system.db')
     
+    register_plugins(config)
     brokers = {}
     for broker_name, broker_config in config['brokers'].items():
         
@@ -66,11 +77,30 @@ def initialize_strategies(brokers, config):
     strategies_config = config['strategies']
     strategies = []
     for strategy_config in strategies_config:
-        strategy_type = strategy_config['type']
-        broker_name = strategy_config['broker']
-        broker = brokers[broker_name]
-        if strategy_type in STRATEGY_MAP:
-            strategies.append(STRATEGY_MAP[strategy_type](broker, strategy_config))
-        else:
-            raise ValueError(f"Unsupported strategy type: {strategy_type}")
+        strategies.append(create_strategy(brokers, strategy_config))
     return strategies
+
+def create_strategy(brokers, strategy_config):
+    strategy_type = strategy_config['type']
+    broker = brokers[strategy_config['broker']]
+    if strategy_type not in STRATEGY_MAP:
+        raise ValueError(f"Unsupported strategy type: {strategy_type}")
+    return STRATEGY_MAP[strategy_type](broker, strategy_config)
+
+def start_market_streams(brokers, strategies, config, strategy_configs=()):
+    # Stream every allocated symbol on brokers with `stream: {enabled: true}`;
+    # strategies running in worker processes are given by their configs
+    for broker_name, broker in brokers.items():
+        stream_config = config['brokers'][broker_name].get('stream') or {}
+        if not stream_config.get('enabled'):
+            continue
+        symbols = set()
+        for strategy in strategies:
+            if strategy.broker is broker:
+                symbols.update(getattr(strategy, 'stock_allocations', {}))
+        for strategy_config in strategy_configs:
+            if strategy_config['broker'] == broker_name:
+                symbols.update(strategy_config.get('stock_allocations') or {})
+        if symbols:
+            broker.start_stream(symbols)
+
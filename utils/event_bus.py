@@ -0,0 +1,195 @@
+"""
+Per-broker event bus. Brokers publish quote, bar, fill and order status
+events; strategies that override on_quote, on_bar, on_fill or
+on_order_status are subscribed when they are created and receive the events
+for their broker on a dispatcher thread of their own.
+
+Each subscription has a bounded queue. Quotes are coalesced: while a quote
+for a symbol is waiting, a newer quote replaces it in place, so a strategy
+that falls behind sees the latest price rather than a backlog. When a queue
+is full the oldest waiting quote or bar is dropped; fills and order status
+events are never dropped.
+
+    events:
+      queue_size: 1000  # events waiting per strategy
+"""
+import threading
+import time
+import traceback
+from collections import deque
+
+DEFAULT_EVENT_CONFIG = {
+    'queue_size': 1000,
+}
+
+EVENT_TYPES = ('quote', 'bar', 'fill', 'order_status')
+# Market data can be dropped under backpressure, account events cannot
+DROPPABLE_EVENTS = ('quote', 'bar')
+
+
+class Event:
+    def __init__(self, type, symbol=None, data=None, strategy=None, timestamp=None):
+        self.type = type
+        self.symbol = symbol
+        self.data = data or {}
+        self.strategy = strategy  # owning strategy name (or names) for fills and order status
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def __repr__(self):
+        return f"Event({self.type!r}, {self.symbol!r}, {self.data!r})"
+
+
+class Subscription:
+    """One strategy's handlers, filters and bounded event queue."""
+
+    def __init__(self, strategy, handlers, symbols=None, queue_size=DEFAULT_EVENT_CONFIG['queue_size'], synchronous=False):
+        self.strategy = strategy
+        self.handlers = handlers
+        self.symbols = set(symbols) if symbols is not None else None
+        self.strategy_name = getattr(strategy, 'strategy_name', None)
+        self.queue_size = queue_size
+        self.synchronous = synchronous
+        self.stats = {'delivered': 0, 'coalesced': 0, 'dropped': 0, 'errors': 0}
+        self._queue = deque()
+        self._quotes = {}  # symbol -> latest quote waiting in the queue
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+        if not synchronous:
+            self._thread = threading.Thread(target=self._run, name=f"events-{self.strategy_name}", daemon=True)
+            self._thread.start()
+
+    def accepts(self, event):
+        if event.type not in self.handlers:
+            return False
+        if event.type in DROPPABLE_EVENTS:
+            return self.symbols is None or event.symbol in self.symbols
+        if isinstance(event.strategy, tuple):
+            # Netted orders belong to several strategies
+            return self.strategy_name in event.strategy
+        return event.strategy is None or event.strategy == self.strategy_name
+
+    def put(self, event):
+        if self.synchronous:
+            self._deliver(event)
+            return
+        with self._condition:
+            if self._closed:
+                return
+            if event.type == 'quote':
+                if event.symbol in self._quotes:
+                    self._quotes[event.symbol] = event
+                    self.stats['coalesced'] += 1
+                    return
+                self._quotes[event.symbol] = event
+            if len(self._queue) >= self.queue_size and not self._drop_oldest(event):
+                return
+            self._queue.append(event)
+            self._condition.notify()
+
+    def _drop_oldest(self, event):
+        # Make room by dropping the oldest quote or bar; returns False when
+        # the incoming event is the one dropped
+        for i, queued in enumerate(self._queue):
+            if queued.type in DROPPABLE_EVENTS:
+                del self._queue[i]
+                if queued.type == 'quote':
+                    self._quotes.pop(queued.symbol, None)
+                self.stats['dropped'] += 1
+                return True
+        if event.type in DROPPABLE_EVENTS:
+            if event.type == 'quote':
+                self._quotes.pop(event.symbol, None)
+            self.stats['dropped'] += 1
+            return False
+        return True
+
+    def pending(self):
+        with self._condition:
+            return len(self._queue)
+
+    def close(self, wait=False):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                event = self._queue.popleft()
+                if event.type == 'quote':
+                    # The queued slot delivers the newest quote for its symbol
+                    event = self._quotes.pop(event.symbol)
+            self._deliver(event)
+
+    def _deliver(self, event):
+        try:
+            self.handlers[event.type](event)
+            self.stats['delivered'] += 1
+        except Exception:
+            self.stats['errors'] += 1
+            traceback.print_exc()
+
+
+class EventBus:
+    """
+    Fans broker events out to subscribed strategies. With synchronous=True
+    handlers run inline in publish(), which keeps backtests deterministic.
+    """
+
+    def __init__(self, queue_size=DEFAULT_EVENT_CONFIG['queue_size'], synchronous=False):
+        self.queue_size = queue_size
+        self.synchronous = synchronous
+        self._subscriptions = []
+        self._wanted = frozenset()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config=None, synchronous=False):
+        options = dict(DEFAULT_EVENT_CONFIG)
+        options.update(config or {})
+        return cls(queue_size=options['queue_size'], synchronous=synchronous)
+
+    def subscribe(self, strategy, handlers, symbols=None):
+        """Deliver events to handlers ({event type: callable}); quotes and bars only for symbols, if given."""
+        unknown = set(handlers) - set(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Unsupported event types: {sorted(unknown)}")
+        subscription = Subscription(strategy, handlers, symbols=symbols, queue_size=self.queue_size, synchronous=self.synchronous)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+            self._wanted = self._wanted | set(handlers)
+        return subscription
+
+    def unsubscribe(self, strategy):
+        with self._lock:
+            removed = [subscription for subscription in self._subscriptions if subscription.strategy is strategy]
+            self._subscriptions = [subscription for subscription in self._subscriptions if subscription.strategy is not strategy]
+            self._wanted = frozenset(event_type for subscription in self._subscriptions for event_type in subscription.handlers)
+        for subscription in removed:
+            subscription.close()
+
+    def wants(self, event_type):
+        """Whether any subscriber handles event_type; publishers check this before building events."""
+        return event_type in self._wanted
+
+    def publish(self, event):
+        for subscription in self._subscriptions:
+            if subscription.accepts(event):
+                subscription.put(event)
+
+    def close(self):
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+            self._wanted = frozenset()
+        for subscription in subscriptions:
+            subscription.close()
+
+    def stats(self):
+        return {subscription.strategy_name: dict(subscription.stats, pending=subscription.pending()) for subscription in self._subscriptions}
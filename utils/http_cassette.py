@@ -0,0 +1,198 @@
+import atexit
+import gzip
+import json
+import threading
+import time
+import weakref
+from collections import defaultdict, deque
+from urllib.parse import parse_qsl, urlencode
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+
+# Response headers worth keeping; everything else (cookies, request ids, ...)
+# is dropped to keep cassettes small and free of session secrets
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+
+# JSON and form fields whose values are replaced before anything is written
+REDACTED_FIELDS = ('key', 'secret', 'api_key', 'secret_key', 'client_secret', 'password', 'token', 'access_token', 'refresh_token', 'session-token')
+REDACTED = '<redacted>'
+
+DEFAULT_CASSETTE_CONFIG = {
+    'mode': None,  # 'record' or 'replay'
+    'path': None,
+    'speed': 1.0,  # replay speed multiplier, 0 replays without any delay
+    'redact': REDACTED_FIELDS,
+}
+
+
+class CassetteMiss(ConnectionError):
+    """Raised on replay when a request was never recorded."""
+
+
+def _close_at_exit(reference):
+    cassette = reference()
+    if cassette is not None:
+        cassette.close()
+
+
+def _open(path, mode):
+    # .gz cassettes are compressed, anything else is plain JSON lines
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _redact_value(value, fields):
+    if isinstance(value, dict):
+        return {name: REDACTED if name.lower() in fields else _redact_value(item, fields) for name, item in value.items()}
+    if isinstance(value, list):
+        return [_redact_value(item, fields) for item in value]
+    return value
+
+
+def redact_body(text, fields):
+    """Replace the values of fields in a JSON or form encoded body."""
+    if not text or not fields:
+        return text
+    try:
+        value = json.loads(text)
+    except ValueError:
+        pass
+    else:
+        redacted = _redact_value(value, fields)
+        return text if redacted == value else json.dumps(redacted, separators=(',', ':'))
+    pairs = parse_qsl(text, keep_blank_values=True)
+    if pairs and any(name.lower() in fields for name, _ in pairs):
+        return urlencode([(name, REDACTED if name.lower() in fields else value) for name, value in pairs])
+    return text
+
+
+def _request_key(request, fields=()):
+    body = request.body
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    return request.method, request.url, redact_body(body, fields)
+
+
+class Cassette:
+    """
+    On-disk log of HTTP interactions, one JSON object per line holding the
+    request method, URL and body, the response status, headers and content,
+    and the recorded latency in seconds. Request headers are never written,
+    and the values of the redact fields are replaced in request bodies and
+    response content: credentials posted to login endpoints and the tokens
+    they return. Replayed requests are matched after the same redaction.
+    """
+
+    def __init__(self, path, mode, speed=1.0, sleep=time.sleep, redact=REDACTED_FIELDS):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.sleep = sleep
+        self.redact = frozenset(field.lower() for field in redact or ())
+        self._lock = threading.Lock()
+        self._file = None
+        self._interactions = defaultdict(deque)
+        if mode == 'record':
+            self._file = _open(path, 'w')
+            # A .gz cassette left open has no end marker and cannot be replayed
+            atexit.register(_close_at_exit, weakref.ref(self))
+        else:
+            with _open(path, 'r') as file:
+                for line in file:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        key = (interaction['method'], interaction['url'], interaction['body'])
+                        self._interactions[key].append(interaction)
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build a cassette from a broker's `cassette` section, or None when disabled."""
+        options = dict(DEFAULT_CASSETTE_CONFIG)
+        options.update(config or {})
+        if not options['mode']:
+            return None
+        return cls(options['path'], options['mode'], speed=options['speed'], redact=options['redact'])
+
+    def record(self, request, response, latency):
+        method, url, body = _request_key(request, self.redact)
+        interaction = {
+            'method': method,
+            'url': url,
+            'body': body,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'content': redact_body(response.content.decode('utf-8', 'replace'), self.redact),
+            'latency': round(latency, 6),
+        }
+        with self._lock:
+            if self._file is None:
+                # Closed at exit while requests were still in flight
+                return
+            self._file.write(json.dumps(interaction, separators=(',', ':')) + '\n')
+            self._file.flush()
+
+    def play(self, request):
+        """Pop the next recorded interaction for this request, waiting out its latency."""
+        key = _request_key(request, self.redact)
+        with self._lock:
+            queue = self._interactions.get(key)
+            if not queue:
+                raise CassetteMiss(f"No recorded response for {key[0]} {key[1]}", request=request)
+            interaction = queue.popleft()
+        if self.speed:
+            self.sleep(interaction['latency'] / self.speed)
+        return interaction
+
+    def remaining(self):
+        with self._lock:
+            return sum(len(queue) for queue in self._interactions.values())
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Transport adapter that records every request sent through the wrapped
+    adapter, or answers requests from a cassette without touching the network.
+    Streaming requests are passed straight through in record mode.
+    """
+
+    def __init__(self, cassette, adapter=None):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, stream=False, **kwargs):
+        if self.cassette.mode == 'replay':
+            return self._build_response(request, self.cassette.play(request))
+        start = time.perf_counter()
+        response = self.adapter.send(request, stream=stream, **kwargs)
+        if not stream:
+            self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def _build_response(self, request, interaction):
+        response = Response()
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response._content = interaction['content'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        if self.adapter is not None:
+            self.adapter.close()
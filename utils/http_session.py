@@ -0,0 +1,84 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.http_cassette import CassetteAdapter
+
+# Defaults for the pooled broker transport, overridable per broker with the
+# `http` section of a broker's YAML config
+DEFAULT_HTTP_CONFIG = {
+    'pool_size': 10,
+    'timeout': 10,
+    'max_retries': 3,
+    'backoff_factor': 0.3,
+    'backoff_jitter': 0.2,
+    'status_forcelist': [429, 500, 502, 503, 504],
+}
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to every request."""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+# Rate limiter priority used when a call site doesn't name one
+METHOD_PRIORITIES = {
+    'POST': 'order',
+    'PUT': 'cancel',
+    'DELETE': 'cancel',
+}
+
+
+class RateLimitedSession(requests.Session):
+    """Session that takes a token from the broker's rate limiter before every request."""
+
+    def __init__(self, rate_limiter=None):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def request(self, method, url, *args, priority=None, **kwargs):
+        # get/post/put/delete forward a priority= keyword through to here
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(priority or METHOD_PRIORITIES.get(method.upper(), 'status'))
+        return super().request(method, url, *args, **kwargs)
+
+
+def create_http_session(http_config=None, rate_limiter=None, cassette=None):
+    """
+    Build a keep-alive requests.Session backed by a connection pool that
+    retries idempotent requests with jittered exponential backoff.
+    POST requests (order placement) are never retried. With a cassette the
+    session records to it, or replays from it instead of using the network.
+    """
+    config = dict(DEFAULT_HTTP_CONFIG)
+    config.update(http_config or {})
+
+    retry = Retry(
+        total=config['max_retries'],
+        backoff_factor=config['backoff_factor'],
+        backoff_jitter=config['backoff_jitter'],
+        status_forcelist=config['status_forcelist'],
+        allowed_methods=frozenset(['HEAD', 'GET', 'PUT', 'DELETE', 'OPTIONS']),
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=config['pool_size'],
+        pool_maxsize=config['pool_size'],
+        max_retries=retry,
+        timeout=config['timeout'],
+    )
+    if cassette is not None:
+        adapter = CassetteAdapter(cassette, adapter)
+
+    session = RateLimitedSession(rate_limiter)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
@@ -0,0 +1,100 @@
+"""
+Lazy registries of broker and strategy factories. Built-in entries are
+'module:attribute' references that are imported the first time a config
+names them, so trade mode only imports the brokers and strategies it uses.
+
+Other packages add brokers and strategies through entry points:
+
+    [project.entry-points."soad.brokers"]
+    mybroker = "my_package.broker:MyBroker.from_config"
+
+or a config can point at them directly:
+
+    plugins:
+      paths: [./plugins]  # added to sys.path
+      brokers:
+        mybroker: "my_broker:MyBroker.from_config"
+      strategies:
+        momentum: "momentum:MomentumStrategy.from_config"
+
+Broker factories are called as factory(broker_config, engine) and strategy
+factories as factory(broker, strategy_config).
+"""
+import importlib
+import sys
+import threading
+from functools import lru_cache
+
+BROKER_ENTRY_POINTS = 'soad.brokers'
+STRATEGY_ENTRY_POINTS = 'soad.strategies'
+
+
+def load_reference(reference):
+    """Import 'package.module:attribute.path' and return the attribute."""
+    module_name, _, attribute = reference.partition(':')
+    value = importlib.import_module(module_name)
+    for name in filter(None, attribute.split('.')):
+        value = getattr(value, name)
+    return value
+
+
+@lru_cache(maxsize=None)
+def entry_points(group):
+    # Scanning installed distributions is slow, so only done on a registry
+    # miss and only once per group
+    from importlib import metadata
+    found = metadata.entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=group)
+    else:
+        found = found.get(group, [])
+    return {entry_point.name: entry_point for entry_point in found}
+
+
+class PluginRegistry(dict):
+    """
+    Maps names to factories. A value may be a callable or a 'module:attribute'
+    reference, which is imported and replaced by the callable on first lookup.
+    Names not registered are looked up among the `group` entry points.
+    """
+
+    def __init__(self, group, plugins=None):
+        super().__init__(plugins or {})
+        self.group = group
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if isinstance(value, str):
+            with self._lock:
+                value = super().__getitem__(name)
+                if isinstance(value, str):
+                    value = load_reference(value)
+                    self[name] = value
+        return value
+
+    def __missing__(self, name):
+        entry_point = entry_points(self.group).get(name)
+        if entry_point is None:
+            raise KeyError(name)
+        value = self[name] = entry_point.load()
+        return value
+
+    def __contains__(self, name):
+        return super().__contains__(name) or name in entry_points(self.group)
+
+    def register(self, name, factory):
+        """Register a factory or a 'module:attribute' reference under name."""
+        self[name] = factory
+
+
+def apply_plugin_config(plugins_config, brokers, strategies):
+    """Apply a config's `plugins` section to the broker and strategy registries."""
+    plugins_config = plugins_config or {}
+    for path in plugins_config.get('paths') or []:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    for name, reference in (plugins_config.get('brokers') or {}).items():
+        brokers.register(name, reference)
+    for name, reference in (plugins_config.get('strategies') or {}).items():
+        strategies.register(name, reference)
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_QUOTE_CACHE_CONFIG = {
+    'ttl': 5,  # seconds a quote stays fresh
+    'max_size': 1000,  # symbols kept before the least recently used is evicted
+}
+
+
+class QuoteCache:
+    """
+    Thread-safe TTL cache with LRU eviction. Each broker owns one keyed by
+    symbol for quotes, so every strategy trading on that broker shares it,
+    and one keyed by (symbol, expiration) for parsed options chains.
+    """
+
+    def __init__(self, ttl=DEFAULT_QUOTE_CACHE_CONFIG['ttl'], max_size=DEFAULT_QUOTE_CACHE_CONFIG['max_size'], clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._quotes = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config=None, defaults=DEFAULT_QUOTE_CACHE_CONFIG):
+        options = dict(defaults)
+        options.update(config or {})
+        return cls(ttl=options['ttl'], max_size=options['max_size'])
+
+    def get(self, symbol):
+        return self.get_many([symbol]).get(symbol)
+
+    def get_many(self, symbols):
+        """Return {symbol: quote} for the fresh entries among symbols."""
+        now = self.clock()
+        found = {}
+        with self._lock:
+            for symbol in symbols:
+                entry = self._quotes.get(symbol)
+                if entry is not None and now - entry[0] <= self.ttl:
+                    self._quotes.move_to_end(symbol)
+                    found[symbol] = entry[1]
+                    self.hits += 1
+                else:
+                    if entry is not None:
+                        del self._quotes[symbol]
+                    self.misses += 1
+        return found
+
+    def put(self, symbol, quote):
+        self.put_many({symbol: quote})
+
+    def put_many(self, quotes):
+        now = self.clock()
+        with self._lock:
+            for symbol, quote in quotes.items():
+                self._quotes[symbol] = (now, quote)
+                self._quotes.move_to_end(symbol)
+            while len(self._quotes) > self.max_size:
+                self._quotes.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            if symbol is None:
+                self._quotes.clear()
+            else:
+                self._quotes.pop(symbol, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._quotes),
+            }
+
+    def __len__(self):
+        return len(self._quotes)
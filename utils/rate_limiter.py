@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+# Request classes in the order they are served when the bucket is empty
+PRIORITIES = {
+    'order': 0,
+    'cancel': 1,
+    'status': 2,
+    'quote': 3,
+    'chain': 4,
+}
+
+DEFAULT_RATE_LIMIT_CONFIG = {
+    'requests_per_minute': None,  # None disables throttling but keeps the metrics
+    'burst': 10,
+}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request a broker makes. When the bucket is
+    empty callers queue instead of failing, and queued callers are released
+    in priority order (orders, cancels, status, quotes, chains), FIFO within
+    a class, so a quote burst cannot starve order placement.
+    """
+
+    def __init__(self, requests_per_minute=None, burst=DEFAULT_RATE_LIMIT_CONFIG['burst'], clock=time.monotonic):
+        self.rate = None if requests_per_minute is None else requests_per_minute / 60.0
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._metrics = {priority: {'requests': 0, 'throttled': 0, 'total_wait': 0.0, 'max_wait': 0.0} for priority in PRIORITIES}
+
+    @classmethod
+    def from_config(cls, config=None):
+        options = dict(DEFAULT_RATE_LIMIT_CONFIG)
+        options.update(config or {})
+        return cls(requests_per_minute=options['requests_per_minute'], burst=options['burst'])
+
+    def acquire(self, priority='status'):
+        """Block until a token is available for this priority; return the seconds waited."""
+        level = PRIORITIES[priority]
+        start = self.clock()
+        with self._condition:
+            if self.rate is not None:
+                ticket = (level, next(self._sequence))
+                heapq.heappush(self._waiters, ticket)
+                try:
+                    while True:
+                        self._refill()
+                        if self._waiters[0] == ticket and self.tokens >= 1:
+                            break
+                        # The head waits for the next token; everyone else waits for a grant
+                        timeout = (1 - self.tokens) / self.rate if self._waiters[0] == ticket else None
+                        self._condition.wait(timeout)
+                finally:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self.tokens -= 1
+                self._condition.notify_all()
+            waited = self.clock() - start
+            self._record(priority, waited)
+        return waited
+
+    async def acquire_async(self, priority='status'):
+        if self.rate is None:
+            return self.acquire(priority)
+        return await asyncio.to_thread(self.acquire, priority)
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _record(self, priority, waited):
+        metrics = self._metrics[priority]
+        metrics['requests'] += 1
+        if waited > 0.001:
+            metrics['throttled'] += 1
+        metrics['total_wait'] += waited
+        metrics['max_wait'] = max(metrics['max_wait'], waited)
+
+    def queued(self):
+        with self._condition:
+            return len(self._waiters)
+
+    def stats(self):
+        """Per priority request counts, throttled counts and wait times in seconds."""
+        with self._condition:
+            stats = {}
+            for priority, metrics in self._metrics.items():
+                stats[priority] = dict(metrics)
+                stats[priority]['avg_wait'] = metrics['total_wait'] / metrics['requests'] if metrics['requests'] else 0.0
+            return stats
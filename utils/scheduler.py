@@ -0,0 +1,195 @@
+import heapq
+import itertools
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+DEFAULT_SCHEDULER_CONFIG = {
+    'workers': 8,
+    'broker_concurrency': 2,  # rebalances allowed in flight per broker
+    'overrun': 'skip',  # what to do when a rebalance is due while the last one still runs
+}
+
+OVERRUN_POLICIES = ('skip', 'queue')
+
+
+def strategy_interval(strategy):
+    """Rebalance interval in seconds; rebalance_interval_seconds allows sub-second schedules."""
+    seconds = getattr(strategy, 'rebalance_interval_seconds', None)
+    if seconds is None:
+        seconds = strategy.rebalance_interval_minutes * 60
+    return seconds
+
+
+def rebalance_unit(strategy):
+    """Context for one rebalance: the strategy's unit of work when it has one."""
+    unit_of_work = getattr(strategy, 'unit_of_work', None)
+    return unit_of_work() if unit_of_work is not None else nullcontext()
+
+
+class ScheduledJob:
+    def __init__(self, strategy, interval, due):
+        self.strategy = strategy
+        self.interval = interval
+        self.due = due
+        self.running = False  # in flight or waiting for a broker slot
+        self.rerun_due = None  # set when the 'queue' policy holds a run back
+        self.stats = {'runs': 0, 'skipped': 0, 'failures': 0, 'total_lateness': 0.0, 'max_lateness': 0.0, 'last_duration': None}
+
+    @property
+    def broker(self):
+        return self.strategy.broker
+
+
+class StrategyScheduler:
+    """
+    Runs strategy rebalances on a bounded thread pool from a heap keyed on
+    each strategy's next due time, so intervals can be sub-second and a slow
+    strategy never delays the others.
+
+    At most broker_concurrency rebalances run per broker; due jobs beyond that
+    wait for a slot in due order. When a strategy comes due while its last
+    rebalance is still running, the overrun policy decides: 'skip' drops that
+    run, 'queue' runs once more as soon as the current one finishes. Schedules
+    are fixed-rate; runs missed while behind are not made up.
+
+    stats() reports runs, skips, failures and lateness (seconds between when a
+    rebalance was due and when it started) per strategy.
+    """
+
+    def __init__(self, strategies, workers=DEFAULT_SCHEDULER_CONFIG['workers'], broker_concurrency=DEFAULT_SCHEDULER_CONFIG['broker_concurrency'], overrun=DEFAULT_SCHEDULER_CONFIG['overrun'], clock=time.monotonic):
+        if overrun not in OVERRUN_POLICIES:
+            raise ValueError(f"Unsupported overrun policy: {overrun}")
+        self.clock = clock
+        self.broker_concurrency = broker_concurrency
+        self.overrun = overrun
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rebalance')
+        self.jobs = []
+        self._heap = []
+        self._sequence = itertools.count()
+        self._in_flight = {}
+        self._waiting = {}
+        self._condition = threading.Condition()
+        self._running = False
+        for strategy in strategies:
+            self.add(strategy)
+
+    @classmethod
+    def from_config(cls, strategies, config=None):
+        options = dict(DEFAULT_SCHEDULER_CONFIG)
+        options.update(config or {})
+        return cls(strategies, workers=options['workers'], broker_concurrency=options['broker_concurrency'], overrun=options['overrun'])
+
+    def add(self, strategy):
+        """Schedule strategy, first due now; safe to call while the scheduler runs."""
+        job = ScheduledJob(strategy, strategy_interval(strategy), self.clock())
+        if job.interval <= 0:
+            raise ValueError(f"Rebalance interval must be positive, got {job.interval}")
+        with self._condition:
+            self.jobs.append(job)
+            self._push(job)
+            self._condition.notify_all()
+        return job
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.due, next(self._sequence), job))
+
+    def run(self):
+        """Dispatch due rebalances until stop() is called."""
+        with self._condition:
+            self._running = True
+            while self._running:
+                now = self.clock()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+                    self._on_due(job, now)
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._condition.wait(timeout)
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name='strategy-scheduler', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self, wait=True):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self.executor.shutdown(wait=wait)
+
+    def _on_due(self, job, now):
+        due = job.due
+        # Next slot on the fixed-rate grid that is still in the future
+        missed = int((now - due) // job.interval) + 1
+        job.due = due + missed * job.interval
+        self._push(job)
+
+        if job.running:
+            if self.overrun == 'queue':
+                if job.rerun_due is None:
+                    job.rerun_due = due
+            else:
+                job.stats['skipped'] += 1
+            return
+        self._dispatch(job, due)
+
+    def _dispatch(self, job, due):
+        broker = job.broker
+        job.running = True
+        if self._in_flight.get(broker, 0) >= self.broker_concurrency:
+            self._waiting.setdefault(broker, deque()).append((job, due))
+            return
+        self._in_flight[broker] = self._in_flight.get(broker, 0) + 1
+        lateness = self.clock() - due
+        job.stats['runs'] += 1
+        job.stats['total_lateness'] += lateness
+        job.stats['max_lateness'] = max(job.stats['max_lateness'], lateness)
+        try:
+            self.executor.submit(self._execute, job)
+        except RuntimeError:
+            # Executor already shut down by stop()
+            self._in_flight[broker] -= 1
+            job.running = False
+
+    def _execute(self, job):
+        start = self.clock()
+        failed = False
+        try:
+            # Trades from one rebalance are written together
+            with rebalance_unit(job.strategy):
+                job.strategy.rebalance()
+        except Exception:
+            failed = True
+            traceback.print_exc()
+        self._finished(job, failed, self.clock() - start)
+
+    def _finished(self, job, failed, duration):
+        with self._condition:
+            broker = job.broker
+            job.running = False
+            job.stats['last_duration'] = duration
+            if failed:
+                job.stats['failures'] += 1
+            self._in_flight[broker] -= 1
+            waiting = self._waiting.setdefault(broker, deque())
+            if job.rerun_due is not None:
+                # Queued overruns wait their turn behind jobs already waiting
+                waiting.append((job, job.rerun_due))
+                job.running = True
+                job.rerun_due = None
+            while waiting and self._in_flight[broker] < self.broker_concurrency:
+                self._dispatch(*waiting.popleft())
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            report = {}
+            for index, job in enumerate(self.jobs):
+                name = f"{getattr(job.strategy, 'strategy_name', type(job.strategy).__name__)}#{index}"
+                stats = dict(job.stats)
+                stats['avg_lateness'] = stats['total_lateness'] / stats['runs'] if stats['runs'] else 0.0
+                report[name] = stats
+            return report
@@ -0,0 +1,113 @@
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from utils.config import create_strategy
+
+DEFAULT_STARTUP_CONFIG = {
+    'workers': 16,
+    'timeout': 60,  # seconds startup waits before leaving slow brokers and strategies out
+}
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+def startup(brokers, config, on_strategy=None):
+    """
+    Connect every broker and build every strategy concurrently. Each strategy
+    starts as soon as its own broker has connected, so a slow broker only
+    holds back its own strategies. Brokers or strategies that fail, or take
+    longer than `startup.timeout` seconds, are left out.
+
+    on_strategy(strategy) is called from a startup thread as each strategy is
+    built, so it can be scheduled without waiting for the other brokers.
+
+    Returns (connected brokers, strategies, report) where report is a list of
+    {'name', 'kind', 'seconds', 'error'} entries.
+    """
+    options = dict(DEFAULT_STARTUP_CONFIG)
+    options.update(config.get('startup') or {})
+    timeout = options['timeout']
+
+    executor = ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='startup')
+    strategy_configs = config.get('strategies', [])
+    builds = [Future() for _ in strategy_configs]
+    # Set once startup stops waiting; strategies built after that are left out
+    gave_up = False
+    ready_lock = threading.Lock()
+
+    def on_built(build, result):
+        strategy, error, _ = result
+        if on_strategy is not None and error is None:
+            with ready_lock:
+                if gave_up:
+                    return
+                try:
+                    on_strategy(strategy)
+                except Exception as e:
+                    traceback.print_exc()
+                    result = (None, e, result[2])
+        build.set_result(result)
+
+    def on_connected(broker_name, connect):
+        # Start this broker's strategies as soon as it is up, without tying
+        # up workers while other brokers are still connecting
+        _, error, _ = connect.result()
+        for strategy_config, build in zip(strategy_configs, builds):
+            if strategy_config['broker'] != broker_name:
+                continue
+            if error is not None:
+                build.set_result((None, RuntimeError(f"broker {broker_name} unavailable: {error}"), 0.0))
+                continue
+            try:
+                task = executor.submit(_timed, create_strategy, brokers, strategy_config)
+            except RuntimeError:
+                # Startup already gave up on this broker
+                continue
+            task.add_done_callback(lambda task, build=build: on_built(build, task.result()))
+
+    for strategy_config, build in zip(strategy_configs, builds):
+        if strategy_config['broker'] not in brokers:
+            build.set_result((None, KeyError(f"unknown broker {strategy_config['broker']}"), 0.0))
+
+    connects = {}
+    for name, broker in brokers.items():
+        connects[name] = executor.submit(_timed, broker.connect)
+        connects[name].add_done_callback(lambda connect, name=name: on_connected(name, connect))
+
+    wait(builds + list(connects.values()), timeout=timeout)
+    with ready_lock:
+        gave_up = True
+    # Anything still running is abandoned rather than waited on
+    executor.shutdown(wait=False)
+
+    report = []
+    connected = {}
+    for name, future in connects.items():
+        _, error, seconds = future.result() if future.done() else (None, TimeoutError('connect timed out'), timeout)
+        report.append({'name': name, 'kind': 'broker', 'seconds': seconds, 'error': error})
+        if error is None:
+            connected[name] = brokers[name]
+
+    strategies = []
+    for index, (strategy_config, future) in enumerate(zip(strategy_configs, builds)):
+        strategy, error, seconds = future.result() if future.done() else (None, TimeoutError('initialization timed out'), timeout)
+        name = strategy_config.get('name', f"{strategy_config['type']}#{index}@{strategy_config['broker']}")
+        report.append({'name': name, 'kind': 'strategy', 'seconds': seconds, 'error': error})
+        if error is None:
+            strategies.append(strategy)
+
+    return connected, strategies, report
+
+
+def print_startup_report(report):
+    print(f"{'kind':<9} {'name':<40} {'seconds':>8}  status")
+    for entry in report:
+        status = 'ok' if entry['error'] is None else f"failed: {entry['error']}"
+        print(f"{entry['kind']:<9} {entry['name']:<40} {entry['seconds']:>8.3f}  {status}")
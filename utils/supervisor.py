@@ -0,0 +1,365 @@
+"""
+Process-isolated strategies. With `isolation: {enabled: true}` the trading
+process keeps the brokers (HTTP sessions, rate limiters, quote caches,
+netting) and runs strategies in worker processes under a Supervisor. A
+strategy that leaks memory, spins the CPU or crashes only takes down its own
+worker, which is restarted with backoff.
+
+Workers trade through a BrokerProxy: broker calls (quotes, account info,
+positions, orders and their fills) are sent over a pipe to the supervisor,
+which runs them on the real broker. Database reads and writes made by the
+strategy itself go straight to the configured database, so isolation needs
+a database URL every process can open (a SQLite file or Postgres, not an
+in-memory SQLite).
+
+    isolation:
+      enabled: true
+      restart_delay: 1  # seconds before the first restart, doubling per crash
+      max_restart_delay: 60
+      max_restarts: 10  # give up on a worker after this many quick crashes in a row (null: never)
+      limits:  # applied to every worker
+        memory_mb: 512  # address space cap
+        cpu_seconds: 3600  # CPU time budget; a worker that spends it is restarted
+        nice: 5
+        cpus: [0, 1]  # CPU affinity
+      workers:  # per worker overrides of limits
+        momentum: {memory_mb: 1024}
+
+    strategies:
+      - type: constant_percentage
+        broker: tradier
+        worker: momentum  # strategies naming the same worker share a process
+        ...
+
+Strategies without a `worker` get a process of their own.
+"""
+import asyncio
+import itertools
+import os
+import pickle
+import threading
+import time
+import traceback
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from utils.config import create_strategy, register_plugins
+from utils.scheduler import StrategyScheduler
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+DEFAULT_ISOLATION_CONFIG = {
+    'enabled': False,
+    'restart_delay': 1.0,
+    'max_restart_delay': 60.0,
+    'max_restarts': 10,
+    'limits': {},
+    'workers': {},
+}
+
+DEFAULT_DATABASE_URL = 'sqlite:///default_trading_system.db'
+
+# Broker methods a worker may call on the supervisor's brokers
+PROXIED_METHODS = frozenset([
+    'get_account_info',
+    'invalidate_account_info',
+    'get_positions',
+    'get_quotes',
+    'get_quote',
+    'get_current_prices',
+    'get_current_price',
+    'get_options_chain',
+    'place_order',
+    'place_orders',
+    'get_order_status',
+    'cancel_order',
+    'has_bought_today',
+    'get_strategy_balance',
+    'ensure_strategy_balance',
+    'get_strategy_positions',
+    'now',
+])
+
+
+class RemoteBrokerError(RuntimeError):
+    """A broker call failed in the supervisor with an error that could not be sent back as is."""
+
+
+def apply_limits(limits):
+    """Apply memory_mb, cpu_seconds, nice and cpus limits to the current process."""
+    if limits.get('nice'):
+        os.nice(limits['nice'])
+    if limits.get('cpus') and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, limits['cpus'])
+    if resource is None:
+        return
+    if limits.get('memory_mb'):
+        size = int(limits['memory_mb'] * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (size, size))
+    if limits.get('cpu_seconds'):
+        seconds = int(limits['cpu_seconds'])
+        resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds))
+
+
+class WorkerChannel:
+    """
+    Worker end of the pipe. Calls from any thread are tagged with an id and
+    answered out of order, so one strategy's slow order does not hold up
+    another strategy's quotes.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.closed = threading.Event()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        threading.Thread(target=self._read, name='worker-channel', daemon=True).start()
+
+    def call(self, broker, method, args, kwargs):
+        future = Future()
+        with self._lock:
+            if self.closed.is_set():
+                raise ConnectionError('supervisor connection closed')
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.conn.send((request_id, broker, method, args, kwargs))
+        return future.result()
+
+    def _read(self):
+        try:
+            while True:
+                request_id, ok, value = self.conn.recv()
+                future = self._pending.pop(request_id)
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self.closed.set()
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(ConnectionError('supervisor connection closed'))
+
+
+class BrokerProxy:
+    """Worker side stand-in for a broker that lives in the supervisor process."""
+
+    def __init__(self, key, broker_name, channel, engine):
+        self.key = key
+        self.broker_name = broker_name
+        self.channel = channel
+        self.Session = sessionmaker(bind=engine)
+
+    def __getattr__(self, name):
+        if name.endswith('_async') and name[:-len('_async')] in PROXIED_METHODS:
+            call = getattr(self, name[:-len('_async')])
+
+            async def call_async(*args, **kwargs):
+                return await asyncio.to_thread(call, *args, **kwargs)
+            return call_async
+        if name not in PROXIED_METHODS:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+        return lambda *args, **kwargs: self.channel.call(self.key, name, args, kwargs)
+
+
+def worker_main(name, strategy_configs, broker_names, database_url, limits, scheduler_config, plugins_config, conn):
+    """Entry point of a worker process: build its strategies and run them until the supervisor goes away."""
+    apply_limits(limits)
+    register_plugins({'plugins': plugins_config})
+    channel = WorkerChannel(conn)
+    engine = create_engine(database_url)
+    brokers = {key: BrokerProxy(key, broker_name, channel, engine) for key, broker_name in broker_names.items()}
+    strategies = [create_strategy(brokers, strategy_config) for strategy_config in strategy_configs]
+    scheduler = StrategyScheduler.from_config(strategies, scheduler_config)
+    scheduler.start()
+    channel.closed.wait()
+    scheduler.stop(wait=False)
+
+
+class StrategyWorker:
+    def __init__(self, name, strategy_configs, limits):
+        self.name = name
+        self.strategy_configs = strategy_configs
+        self.limits = limits
+        self.process = None
+        self.conn = None
+        self.started_at = None
+        self.restart_at = None
+        self.restarts = 0
+        self.crashes = 0  # consecutive quick crashes, for backoff
+        self.last_exitcode = None
+        self.failed = False
+
+
+def strategy_name(strategy_config, index):
+    return strategy_config.get('name', f"{strategy_config['type']}#{index}@{strategy_config['broker']}")
+
+
+class Supervisor:
+    """
+    Runs groups of strategies in worker processes and serves their broker
+    calls from the brokers in this process. poll() restarts workers that
+    exit: the first restart waits restart_delay seconds and each further
+    crash doubles the wait up to max_restart_delay. A worker that stays up
+    for max_restart_delay seconds is considered healthy again and its
+    backoff resets. After max_restarts quick crashes in a row the worker is
+    left down; None restarts it forever. A worker that crashes now and then
+    after running healthily is always restarted.
+    """
+
+    def __init__(self, brokers, strategy_configs, database_url=DEFAULT_DATABASE_URL, limits=None, worker_limits=None, restart_delay=DEFAULT_ISOLATION_CONFIG['restart_delay'], max_restart_delay=DEFAULT_ISOLATION_CONFIG['max_restart_delay'], max_restarts=DEFAULT_ISOLATION_CONFIG['max_restarts'], scheduler_config=None, plugins_config=None, request_workers=8):
+        self.brokers = brokers
+        self.broker_names = {key: broker.broker_name for key, broker in brokers.items()}
+        self.database_url = database_url
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_restarts = max_restarts
+        self.scheduler_config = scheduler_config
+        self.plugins_config = plugins_config
+        self.executor = ThreadPoolExecutor(max_workers=request_workers, thread_name_prefix='supervisor')
+        # Spawned rather than forked: the parent holds sessions, locks and threads
+        self._context = multiprocessing.get_context('spawn')
+        self._stopped = threading.Event()
+
+        groups = {}
+        for index, strategy_config in enumerate(strategy_configs):
+            if strategy_config['broker'] not in brokers:
+                raise KeyError(f"unknown broker {strategy_config['broker']}")
+            groups.setdefault(strategy_config.get('worker', strategy_name(strategy_config, index)), []).append(strategy_config)
+        worker_limits = worker_limits or {}
+        self.workers = []
+        for name, configs in groups.items():
+            worker_options = dict(limits or {})
+            worker_options.update(worker_limits.get(name) or {})
+            self.workers.append(StrategyWorker(name, configs, worker_options))
+
+    @classmethod
+    def from_config(cls, brokers, config):
+        options = dict(DEFAULT_ISOLATION_CONFIG)
+        options.update(config.get('isolation') or {})
+        return cls(
+            brokers,
+            config.get('strategies', []),
+            database_url=(config.get('database') or {}).get('url', DEFAULT_DATABASE_URL),
+            limits=options['limits'],
+            worker_limits=options['workers'],
+            restart_delay=options['restart_delay'],
+            max_restart_delay=options['max_restart_delay'],
+            max_restarts=options['max_restarts'],
+            scheduler_config=config.get('scheduler'),
+            plugins_config=config.get('plugins'),
+        )
+
+    def start(self):
+        for worker in self.workers:
+            self._spawn(worker)
+
+    def run(self, interval=0.5):
+        """Start the workers and keep them running until stop() is called."""
+        self.start()
+        while not self._stopped.wait(interval):
+            self.poll()
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout)
+                if worker.process.is_alive():
+                    worker.process.kill()
+                    worker.process.join()
+            if worker.conn is not None:
+                worker.conn.close()
+        self.executor.shutdown(wait=False)
+
+    def poll(self):
+        """Notice exited workers and restart those whose backoff has elapsed."""
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.failed or worker.process is None or worker.process.is_alive() or self._stopped.is_set():
+                continue
+            if worker.restart_at is None:
+                worker.last_exitcode = worker.process.exitcode
+                if now - worker.started_at >= self.max_restart_delay:
+                    worker.crashes = 0
+                if self.max_restarts is not None and worker.crashes >= self.max_restarts:
+                    worker.failed = True
+                    print(f"worker {worker.name} exited with {worker.last_exitcode}; giving up after {worker.crashes} restarts in a row")
+                    continue
+                delay = min(self.restart_delay * 2 ** worker.crashes, self.max_restart_delay)
+                worker.crashes += 1
+                worker.restart_at = now + delay
+                print(f"worker {worker.name} exited with {worker.last_exitcode}; restarting in {delay:.1f}s")
+            elif now >= worker.restart_at:
+                worker.restarts += 1
+                self._spawn(worker)
+
+    def stats(self):
+        return {
+            worker.name: {
+                'pid': worker.process.pid if worker.process is not None else None,
+                'alive': worker.process is not None and worker.process.is_alive(),
+                'restarts': worker.restarts,
+                'last_exitcode': worker.last_exitcode,
+                'failed': worker.failed,
+                'strategies': len(worker.strategy_configs),
+            }
+            for worker in self.workers
+        }
+
+    def _spawn(self, worker):
+        if worker.conn is not None:
+            worker.conn.close()
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=worker_main,
+            args=(worker.name, worker.strategy_configs, self.broker_names, self.database_url, worker.limits, self.scheduler_config, self.plugins_config, child_conn),
+            name=f"strategy-worker-{worker.name}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker.process = process
+        worker.conn = conn
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        threading.Thread(target=self._serve, args=(worker, conn), name=f"serve-{worker.name}", daemon=True).start()
+
+    def _serve(self, worker, conn):
+        send_lock = threading.Lock()
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            self.executor.submit(self._handle, worker, conn, send_lock, request)
+
+    def _handle(self, worker, conn, send_lock, request):
+        request_id, broker, method, args, kwargs = request
+        try:
+            if method not in PROXIED_METHODS:
+                raise AttributeError(f"broker method {method!r} is not available to workers")
+            reply = (request_id, True, getattr(self.brokers[broker], method)(*args, **kwargs))
+        except Exception as e:
+            traceback.print_exc()
+            reply = (request_id, False, e)
+        with send_lock:
+            try:
+                try:
+                    conn.send(reply)
+                except (pickle.PicklingError, TypeError, AttributeError) as e:
+                    conn.send((request_id, False, RemoteBrokerError(f"{method} on worker {worker.name}: {reply[2]!r} ({e})")))
+            except OSError:
+                # The worker went away; poll() deals with it
+                pass